@@ -0,0 +1,50 @@
+"""Compares the size of a synthetic Number series dumped to CSV and to an
+archive, and times writing and reading the archive.
+
+    python benchmarks/archive.py --rows 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from synthetic import series
+
+from splight_cli.engine.manager import datalake_io
+from splight_cli.engine.manager.datalake_archive import Archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    dataframe = series(args.rows)
+    with tempfile.TemporaryDirectory() as directory:
+        sizes = {}
+        for name in ("dump.csv", "dump.sla"):
+            path = os.path.join(directory, name)
+            started = time.perf_counter()
+            with datalake_io.open_writer(path, "Number") as writer:
+                writer.write(dataframe)
+            elapsed = time.perf_counter() - started
+            sizes[name] = os.path.getsize(path)
+            print(f"{name}: {sizes[name] / 2**20:.1f} MiB in {elapsed:.1f} s")
+        print(f"archive {sizes['dump.csv'] / sizes['dump.sla']:.1f}x smaller")
+
+        started = time.perf_counter()
+        rows = sum(
+            len(block)
+            for block in Archive(os.path.join(directory, "dump.sla")).read()
+        )
+        elapsed = time.perf_counter() - started
+        assert rows == args.rows
+        print(
+            f"read {rows} points in {elapsed:.1f} s "
+            f"({elapsed / rows * 1e6:.2f} us per point)"
+        )
+
+
+if __name__ == "__main__":
+    main()
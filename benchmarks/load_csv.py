@@ -0,0 +1,68 @@
+"""Times reading a synthetic datalake CSV file the way load does, with
+the column types inferred, with the model types in pandas and with the
+pyarrow CSV reader.
+
+    python benchmarks/load_csv.py --rows 10000000 --chunksize 100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+import pandas as pd
+from synthetic import write_csv
+
+from splight_cli.engine.manager import datalake_io
+
+
+def inferred(path: str, chunksize: int) -> int:
+    """Reads as load did before the model types, converting the inferred
+    timestamp strings afterwards.
+    """
+    rows = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        chunk["timestamp"] = pd.to_datetime(chunk["timestamp"], utc=True)
+        rows += len(chunk)
+    return rows
+
+
+def typed(path: str, chunksize: int) -> int:
+    return sum(
+        len(chunk)
+        for chunk in datalake_io.read_chunks(
+            path, chunksize=chunksize, value_type="Number"
+        )
+    )
+
+
+def typed_pandas(path: str, chunksize: int) -> int:
+    with patch.object(datalake_io, "pa", None):
+        return typed(path, chunksize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    readers = {"inferred": inferred, "typed pandas": typed_pandas}
+    if datalake_io.pa is not None:
+        readers["typed pyarrow"] = typed
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "load.csv")
+        write_csv(path, args.rows)
+        size = os.path.getsize(path) / 2**20
+        print(f"{args.rows} rows, {size:.0f} MiB, chunks of {args.chunksize}")
+        for name, reader in readers.items():
+            started = time.perf_counter()
+            rows = reader(path, args.chunksize)
+            elapsed = time.perf_counter() - started
+            assert rows == args.rows
+            print(f"{name}: {elapsed:.1f} s ({rows / elapsed:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Times the merge of load --merge on overlapping time-sorted inputs read
+in chunks, one of them a full duplicate of another. The inputs are held
+in memory so only the merge is timed.
+
+    python benchmarks/merge.py --rows 1000000 --chunksize 100000
+"""
+
+import argparse
+import time
+
+import pandas as pd
+from synthetic import series
+
+from splight_cli.engine.manager.datalake_merge import SortedMerge
+
+
+def chunks(dataframe: pd.DataFrame, size: int):
+    return (
+        dataframe.iloc[start : start + size]
+        for start in range(0, len(dataframe), size)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    first = series(args.rows).reset_index()
+    # Overlaps the second half of the first input
+    second = series(args.rows, offset=args.rows // 2, seed=1).reset_index()
+    inputs = [first, second, first.copy()]
+
+    merge = SortedMerge(
+        [
+            (str(position), chunks(dataframe, args.chunksize))
+            for position, dataframe in enumerate(inputs)
+        ]
+    )
+    started = time.perf_counter()
+    for _ in merge:
+        pass
+    elapsed = time.perf_counter() - started
+    print(
+        f"{len(inputs)} inputs of {args.rows} rows in chunks of "
+        f"{args.chunksize}: {merge.rows} rows, {merge.duplicates} "
+        f"duplicates in {elapsed:.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
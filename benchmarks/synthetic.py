@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+ASSET = "2b3b5a1c-6f0e-4a53-9d0c-3e1f6c0a9b21"
+ATTRIBUTE = "7d9e2f4a-1b8c-4e6d-a5f3-0c2b9e8d7a16"
+START = pd.Timestamp("2024-01-01", tz="UTC")
+
+
+def series(
+    rows: int,
+    offset: int = 0,
+    attribute: str = ATTRIBUTE,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Returns a Number series a second apart from START plus offset
+    seconds, its values a random walk with two decimals like a sensor
+    reading. The same arguments always give the same series.
+    """
+    rng = np.random.default_rng([seed, offset])
+    return pd.DataFrame(
+        {
+            "asset": ASSET,
+            "attribute": attribute,
+            "output_format": "Number",
+            "value": np.round(20 + rng.normal(0, 0.1, rows).cumsum(), 2),
+        },
+        index=pd.date_range(
+            START + pd.Timedelta(seconds=offset),
+            periods=rows,
+            freq="s",
+            name="timestamp",
+        ),
+    )
+
+
+def write_csv(path: str, rows: int, chunk: int = 1_000_000):
+    """Writes a series of rows points to a datalake CSV file, as dump
+    does, a chunk at a time.
+    """
+    for offset in range(0, rows, chunk):
+        series(min(chunk, rows - offset), offset=offset).to_csv(
+            path, mode="a", header=offset == 0
+        )
@@ -19,6 +19,7 @@ DEFAULT_NAMESPACE = "NO_NAMESPACE"
 DEFAULT_COMPONENT_ID = "DEMO"
 
 CONFIG_FILE = os.path.join(SPLIGHT_PATH, "config")
+DATALAKE_CACHE_PATH = os.path.join(SPLIGHT_PATH, "datalake_cache")
 PYTHON_COMPONENT_FILE = "main.py"
 SPEC_FILE = "spec.json"
 INIT_FILE = "Initialization"
@@ -38,6 +39,8 @@ REQUIRED_DATALAKE_COLUMNS = {
     "value",
     "output_format",
 }
+# Maximum number of points returned by a single datalake request
+DATALAKE_PAGE_SIZE = 10000
 
 VALID_PARAMETER_VALUES = {
     "int": int,
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 import typer
 from rich.console import Console
@@ -6,8 +6,10 @@ from splight_lib.models import Boolean, Number, String
 
 from splight_cli.constants import error_style
 from splight_cli.engine.manager import (
+    DatalakeBatchManager,
     DatalakeManager,
     DatalakeManagerException,
+    DumpOptions,
 )
 
 datalake_app = typer.Typer(
@@ -23,6 +25,8 @@ MODEL_MAP = {
     "String": String,
     "Boolean": Boolean,
 }
+# Load type that routes each row by its output_format
+AUTO_TYPE = "auto"
 
 
 def _parse_filter_option(values):
@@ -42,11 +46,124 @@ def dump(
     asset: str = typer.Argument(..., help="Asset id to dump"),
     attribute: str = typer.Argument(..., help="Attribute id to dump"),
     path: str = typer.Option(
-        "./dump.csv", "--path", "-p", help="Path name to dump"
+        "./dump.csv",
+        "--path",
+        "-p",
+        help=(
+            "Path name to dump (.csv, .parquet, .feather, a .sqlite/.db "
+            "database, appended to if it exists, a .sla archive or a .npy "
+            "array of Number points). CSV files can be compressed with .gz, "
+            ".bz2, .xz or .zst"
+        ),
     ),
     filter: List[str] = typer.Option(
         None, "--filter", "-f", help="Filter to apply"
     ),
+    window: Optional[str] = typer.Option(
+        None,
+        "--window",
+        "-w",
+        help=(
+            "Fetch and write the range in time windows of the given size "
+            "eg. 1D, 6h. Requires a from_timestamp filter"
+        ),
+    ),
+    parallel: int = typer.Option(
+        1,
+        "--parallel",
+        help=(
+            "Number of concurrent queries. Without --window the range is "
+            "split in shards sized after a probe of the point density"
+        ),
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help=(
+            "Append only the points newer than the watermark stored next "
+            "to the file by the previous incremental dump"
+        ),
+    ),
+    cache: bool = typer.Option(
+        False,
+        "--cache",
+        help=(
+            "Serve the intervals fetched by previous cached dumps from a "
+            "local cache and fetch only the missing ones. Requires pyarrow"
+        ),
+    ),
+    cache_size: int = typer.Option(
+        1024,
+        "--cache-size",
+        help="Maximum size of the local cache in MB",
+    ),
+    resample: Optional[str] = typer.Option(
+        None,
+        "--resample",
+        "-r",
+        help=(
+            "Aggregate the points in intervals of the given size eg. 1min, "
+            "1h, and write only the aggregates"
+        ),
+    ),
+    agg: List[str] = typer.Option(
+        None,
+        "--agg",
+        help=(
+            "Aggregation of each resampled interval: mean, min, max, last "
+            "or count. Can be repeated, defaults to mean"
+        ),
+    ),
+    server_side: bool = typer.Option(
+        False,
+        "--server-side",
+        help=(
+            "Let the datalake aggregate the intervals so only the "
+            "aggregates are downloaded. Supports mean, min, max and count"
+        ),
+    ),
+    partition: bool = typer.Option(
+        False,
+        "--partition",
+        help=(
+            "Write a directory of Hive style partitions "
+            "asset=/attribute=/date= instead of a single file"
+        ),
+    ),
+    max_file_size: Optional[int] = typer.Option(
+        None,
+        "--max-file-size",
+        help=(
+            "Write a directory of files rolling over to a new file at this "
+            "size in MB. Can be combined with --partition"
+        ),
+    ),
+    format: str = typer.Option(
+        "csv",
+        "--format",
+        help=(
+            "File format of partitioned dumps: csv, parquet, feather, "
+            "sqlite, archive, npy or a compressed csv eg. csv.gz. Hive "
+            "partitions can not be written to sqlite"
+        ),
+    ),
+    sample: Optional[int] = typer.Option(
+        None,
+        "--sample",
+        help="Dump only a sample of this number of points",
+    ),
+    sample_mode: str = typer.Option(
+        "reservoir",
+        "--sample-mode",
+        help=(
+            "reservoir: uniform over the points, reading the whole range. "
+            "stratified: one point per equal sub-range of time, with one "
+            "small query per point. Requires a from_timestamp filter"
+        ),
+    ),
+    seed: Optional[int] = typer.Option(
+        None, "--seed", help="Random seed to repeat a sample"
+    ),
 ):
     if type not in MODEL_MAP:
         raise typer.BadParameter(f"Type {type} not supported")
@@ -57,7 +174,313 @@ def dump(
         model=MODEL_MAP[type],
     )
     try:
-        manager.dump(path=path, filters=filters)
+        manager.dump(
+            path=path,
+            filters=filters,
+            options=DumpOptions(
+                window=window,
+                parallel=parallel,
+                incremental=incremental,
+                cache_size=cache_size * 1024 * 1024 if cache else None,
+                resample=resample,
+                aggregations=agg,
+                server_side=server_side,
+                hive=partition,
+                max_file_size=(
+                    max_file_size * 1024 * 1024
+                    if max_file_size is not None
+                    else None
+                ),
+                file_format=format,
+                sample=sample,
+                sample_mode=sample_mode,
+                seed=seed,
+            ),
+        )
+    except DatalakeManagerException as exc:
+        console.print(exc, style=error_style)
+
+
+@datalake_app.command()
+def tail(
+    ctx: typer.Context,
+    type: str = typer.Argument(
+        ..., help="Data type to follow eg. Number, String, Boolean"
+    ),
+    asset: str = typer.Argument(..., help="Asset id to follow"),
+    attribute: str = typer.Argument(..., help="Attribute id to follow"),
+    since: Optional[str] = typer.Option(
+        None,
+        "--since",
+        "-s",
+        help=(
+            "Also print the points since this duration ago eg. 10min, or "
+            "since a timestamp. By default only new points are printed"
+        ),
+    ),
+    interval: float = typer.Option(
+        1.0, "--interval", help="Seconds between polls while data arrives"
+    ),
+    max_interval: float = typer.Option(
+        60.0,
+        "--max-interval",
+        help="Maximum seconds between polls when there is no new data",
+    ),
+    output: str = typer.Option(
+        "table", "--output", "-o", help="Output format: table or ndjson"
+    ),
+):
+    if type not in MODEL_MAP:
+        raise typer.BadParameter(f"Type {type} not supported")
+
+    manager = DatalakeManager(model=MODEL_MAP[type])
+    try:
+        manager.tail(
+            filters={"asset": asset, "attribute": attribute},
+            since=since,
+            interval=interval,
+            max_interval=max_interval,
+            output=output,
+        )
+    except DatalakeManagerException as exc:
+        console.print(exc, style=error_style)
+    except KeyboardInterrupt:
+        pass
+
+
+@datalake_app.command()
+def profile(
+    ctx: typer.Context,
+    type: str = typer.Argument(
+        ..., help="Data type to profile eg. Number, String, Boolean"
+    ),
+    asset: str = typer.Argument(..., help="Asset id to profile"),
+    attribute: str = typer.Argument(..., help="Attribute id to profile"),
+    filter: List[str] = typer.Option(
+        None, "--filter", "-f", help="Filter to apply"
+    ),
+    window: Optional[str] = typer.Option(
+        None,
+        "--window",
+        "-w",
+        help=(
+            "Fetch the range in time windows of the given size eg. 1D, so "
+            "only a window is held in memory. Requires a from_timestamp "
+            "filter"
+        ),
+    ),
+    parallel: int = typer.Option(
+        1, "--parallel", help="Number of concurrent queries"
+    ),
+    gap: Optional[str] = typer.Option(
+        None,
+        "--gap",
+        help=(
+            "Report intervals longer than this as gaps eg. 5min. Defaults "
+            "to 3 times the median interval of the first points"
+        ),
+    ),
+    flatline: int = typer.Option(
+        10,
+        "--flatline",
+        help="Report runs of at least this number of equal values",
+    ),
+    outlier: float = typer.Option(
+        4.0,
+        "--outlier",
+        help=(
+            "Report values more than this number of standard deviations "
+            "away from the mean of the previous --outlier-window values"
+        ),
+    ),
+    outlier_window: int = typer.Option(
+        100, "--outlier-window", help="Number of values to score against"
+    ),
+    output: str = typer.Option(
+        "table", "--output", "-o", help="Output format: table or json"
+    ),
+):
+    if type not in MODEL_MAP:
+        raise typer.BadParameter(f"Type {type} not supported")
+
+    filters = _parse_filter_option(filter)
+    filters.update({"asset": asset, "attribute": attribute})
+    manager = DatalakeManager(model=MODEL_MAP[type])
+    try:
+        manager.profile(
+            filters=filters,
+            window=window,
+            parallel=parallel,
+            gap=gap,
+            flatline=flatline,
+            outlier=outlier,
+            outlier_window=outlier_window,
+            output=output,
+        )
+    except DatalakeManagerException as exc:
+        console.print(exc, style=error_style)
+
+
+@datalake_app.command()
+def copy(
+    ctx: typer.Context,
+    type: str = typer.Argument(
+        ..., help="Data type to copy eg. Number, String, Boolean"
+    ),
+    asset: str = typer.Argument(..., help="Asset id to copy"),
+    attribute: str = typer.Argument(..., help="Attribute id to copy"),
+    target: str = typer.Option(
+        ..., "--target", "-t", help="Workspace to copy the points to"
+    ),
+    source: Optional[str] = typer.Option(
+        None,
+        "--source",
+        "-s",
+        help="Workspace to copy the points from, the current one by default",
+    ),
+    filter: List[str] = typer.Option(
+        None, "--filter", "-f", help="Filter to apply"
+    ),
+    window: Optional[str] = typer.Option(
+        None,
+        "--window",
+        "-w",
+        help=(
+            "Fetch the range in time windows of the given size eg. 1D, so "
+            "only the queued windows are held in memory. Requires a "
+            "from_timestamp filter"
+        ),
+    ),
+    parallel: int = typer.Option(
+        1, "--parallel", help="Number of concurrent queries"
+    ),
+    workers: int = typer.Option(
+        4, "--workers", help="Maximum number of concurrent uploads"
+    ),
+    queue_size: int = typer.Option(
+        8,
+        "--queue-size",
+        help="Number of batches read ahead of the uploads",
+    ),
+    remap: Optional[str] = typer.Option(
+        None,
+        "--remap",
+        help=(
+            "CSV or JSON table with source and target columns of asset "
+            "and attribute IDs to replace in the target workspace"
+        ),
+    ),
+):
+    if type not in MODEL_MAP:
+        raise typer.BadParameter(f"Type {type} not supported")
+
+    filters = _parse_filter_option(filter)
+    filters.update({"asset": asset, "attribute": attribute})
+    manager = DatalakeManager(model=MODEL_MAP[type])
+    try:
+        manager.copy(
+            target=target,
+            filters=filters,
+            source=source,
+            window=window,
+            parallel=parallel,
+            workers=workers,
+            queue_size=queue_size,
+            remap=remap,
+        )
+    except DatalakeManagerException as exc:
+        console.print(exc, style=error_style)
+
+
+@datalake_app.command()
+def dump_manifest(
+    ctx: typer.Context,
+    manifest: str = typer.Argument(
+        ..., help="CSV or JSON file with asset, attribute and type per series"
+    ),
+    path: str = typer.Option(
+        "./dump",
+        "--path",
+        "-p",
+        help=(
+            "Directory for one file per series, or file with --combine "
+            "or --wide"
+        ),
+    ),
+    filter: List[str] = typer.Option(
+        None, "--filter", "-f", help="Filter to apply to every series"
+    ),
+    window: Optional[str] = typer.Option(
+        None,
+        "--window",
+        "-w",
+        help="Fetch each series in time windows of the given size eg. 1D",
+    ),
+    workers: int = typer.Option(
+        8, "--workers", help="Number of series fetched concurrently"
+    ),
+    combine: bool = typer.Option(
+        False,
+        "--combine",
+        help="Write every series to a single long-format file",
+    ),
+    format: str = typer.Option(
+        "csv",
+        "--format",
+        help=(
+            "File format for one file per series: csv, parquet, feather, "
+            "sqlite, archive, npy or a compressed csv eg. csv.gz"
+        ),
+    ),
+    wide: bool = typer.Option(
+        False,
+        "--wide",
+        help=(
+            "Write a single file with one column per series aligned on the "
+            "time grid given by --grid"
+        ),
+    ),
+    grid: Optional[str] = typer.Option(
+        None,
+        "--grid",
+        help="Interval of the time grid of a wide file eg. 1min, 1h",
+    ),
+    tolerance: Optional[str] = typer.Option(
+        None,
+        "--tolerance",
+        help=(
+            "Leave empty the grid points whose last value is older than "
+            "this eg. 10min. By default values are carried forward"
+        ),
+    ),
+):
+    manager = DatalakeBatchManager(models=MODEL_MAP)
+    if wide:
+        if grid is None:
+            raise typer.BadParameter("--wide requires a --grid interval")
+        try:
+            manager.dump_wide(
+                manifest_path=manifest,
+                path=path,
+                filters=_parse_filter_option(filter),
+                grid=grid,
+                window=window,
+                workers=workers,
+                tolerance=tolerance,
+            )
+        except DatalakeManagerException as exc:
+            console.print(exc, style=error_style)
+        return
+    try:
+        manager.dump(
+            manifest_path=manifest,
+            path=path,
+            filters=_parse_filter_option(filter),
+            window=window,
+            workers=workers,
+            combine=combine,
+            file_format=format,
+        )
     except DatalakeManagerException as exc:
         console.print(exc, style=error_style)
 
@@ -66,10 +489,89 @@ def dump(
 def load(
     ctx: typer.Context,
     type: str = typer.Argument(
-        ..., help="Data type to dump eg. Number, String, Boolean"
+        ...,
+        help=(
+            "Data type to load eg. Number, String, Boolean, or auto to save "
+            "each row with the type of its output_format"
+        ),
+    ),
+    path: str = typer.Option(
+        ...,
+        "--path",
+        "-p",
+        help=(
+            "Path to file to load (.csv, .parquet, .feather, .sqlite/.db, "
+            ".sla or .npy), or a directory or glob pattern of files to load. "
+            "CSV files can be compressed with .gz, .bz2, .xz or .zst"
+        ),
+    ),
+    chunksize: Optional[int] = typer.Option(
+        None,
+        "--chunksize",
+        "-c",
+        help="Read and upload the file in batches of this number of rows",
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Skip the batches already saved by an interrupted load",
+    ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        help=(
+            "Maximum number of concurrent uploads. Concurrency adapts to "
+            "errors and failed uploads are retried with backoff"
+        ),
+    ),
+    dry_run: bool = typer.Option(
+        False,
+        "--dry-run",
+        help=(
+            "Validate the whole file and report the issues found without "
+            "uploading anything"
+        ),
+    ),
+    timestamp_format: Optional[str] = typer.Option(
+        None,
+        "--timestamp-format",
+        help=(
+            "strptime format of the CSV timestamps eg. %Y-%m-%dT%H:%M:%S%z. "
+            "Defaults to ISO 8601"
+        ),
+    ),
+    processes: Optional[int] = typer.Option(
+        None,
+        "--processes",
+        help=(
+            "Number of processes parsing files when loading many files. "
+            "Defaults to the number of CPUs"
+        ),
+    ),
+    merge: bool = typer.Option(
+        False,
+        "--merge",
+        help=(
+            "Merge files sorted by timestamp into a single stream uploaded "
+            "in timestamp order, dropping the points repeated across files"
+        ),
     ),
-    path: str = typer.Option(..., "--path", "-p", help="Path to file to load"),
 ):
+    if type == AUTO_TYPE:
+        if resume or dry_run or merge:
+            raise typer.BadParameter(
+                "--resume, --dry-run and --merge need a single type"
+            )
+        try:
+            DatalakeBatchManager(models=MODEL_MAP).load(
+                path=path,
+                chunksize=chunksize,
+                workers=workers,
+                timestamp_format=timestamp_format,
+            )
+        except DatalakeManagerException as exc:
+            console.print(exc, style=error_style)
+        return
     if type not in MODEL_MAP:
         raise typer.BadParameter(f"Type {type} not supported")
 
@@ -78,6 +580,15 @@ def load(
     )
 
     try:
-        manager.load(path=path)
+        manager.load(
+            path=path,
+            chunksize=chunksize,
+            resume=resume,
+            workers=workers,
+            dry_run=dry_run,
+            timestamp_format=timestamp_format,
+            processes=processes,
+            merge=merge,
+        )
     except DatalakeManagerException as exc:
         console.print(exc, style=error_style)
@@ -1,6 +1,8 @@
+from splight_cli.engine.manager.datalake_dump import DumpOptions
 from splight_cli.engine.manager.manager import (
     ComponentUpgradeManager,
     ComponentUpgradeManagerException,
+    DatalakeBatchManager,
     DatalakeManager,
     DatalakeManagerException,
     ResourceManager,
@@ -10,8 +12,10 @@ from splight_cli.engine.manager.manager import (
 __all__ = [
     ComponentUpgradeManager,
     ComponentUpgradeManagerException,
+    DatalakeBatchManager,
     DatalakeManager,
     DatalakeManagerException,
+    DumpOptions,
     ResourceManager,
     ResourceManagerException,
 ]
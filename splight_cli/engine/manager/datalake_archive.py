@@ -0,0 +1,404 @@
+"""Compact archive of Number series.
+
+An archive is a sequence of blocks of at most BLOCK_SIZE points of a
+single series followed by a JSON index and a fixed size trailer:
+
+    MAGIC | block | block | ... | index | index offset | MAGIC
+
+Each block holds two bit streams, encoded as in Facebook's Gorilla:
+
+* timestamps: the first one and the first delta in 64 bits, then the
+  delta of each delta with a variable length code. Timestamps are stored
+  in the coarsest unit (s, ms, us or ns) dividing every one of the block,
+  so regular series cost about one bit per point.
+* values: the bits of the first float, then the XOR of each float with
+  the previous one, storing only the meaningful bits between its leading
+  and trailing zeros.
+
+The index keeps, for every block, its series, offset, sizes and time
+range, so a sub-range is read decoding only the blocks overlapping it.
+Both codes are lossless, floats are kept bit by bit.
+
+Appending writes the new blocks after the trailer, followed by a new
+index of every block and its trailer. The previous index is never
+overwritten, so an interrupted append leaves the archive as it was
+before it, plus bytes after its trailer that readers ignore.
+"""
+
+import json
+import mmap
+import os
+import struct
+from typing import IO, Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from splight_cli.engine.manager.exceptions import InvalidArchive
+
+MAGIC = b"SPLARC1\n"
+VERSION = 1
+# Points per block, the unit decoded to read any point in it
+BLOCK_SIZE = 4096
+TRAILER = struct.Struct("<Q8s")
+# Columns identifying the series of a block, left out of Hive partitions
+SERIES_COLUMNS = ("asset", "attribute")
+# Candidate timestamp units in nanoseconds, coarsest first
+UNITS = (10**9, 10**6, 10**3, 1)
+# Payload widths of the delta of deltas codes 10, 110 and 1110, the
+# payload is the delta of deltas shifted to be non negative. Any other
+# one is written as 1111 followed by its 64 bits and a zero as a 0.
+DELTA_WIDTHS = (7, 9, 12)
+# Bits of the leading zeros and the length of a new XOR window
+LEADING_BITS = 5
+LENGTH_BITS = 6
+MAX_LEADING = (1 << LEADING_BITS) - 1
+
+
+def _pack_bits(values: np.ndarray, widths: np.ndarray) -> bytes:
+    """Packs the lowest widths[i] bits of each values[i], most significant
+    bit first, padding the last byte with zeros.
+    """
+    widths = widths.astype(np.int64)
+    total = int(widths.sum())
+    field = np.repeat(np.arange(len(widths)), widths)
+    starts = np.cumsum(widths) - widths
+    shifts = widths[field] - 1 - (np.arange(total) - starts[field])
+    bits = (values[field] >> shifts.astype(np.uint64)) & np.uint64(1)
+    return np.packbits(bits.astype(np.uint8)).tobytes()
+
+
+class _BitReader:
+    """Reads fields of up to 64 bits from a packed bit stream."""
+
+    def __init__(self, data: bytes):
+        # A zero word at the end lets reads span two words unchecked
+        padding = bytes(-len(data) % 8 + 8)
+        self._words = np.frombuffer(data + padding, dtype=">u8").tolist()
+        self._position = 0
+
+    def read(self, width: int) -> int:
+        if width == 0:
+            return 0
+        index, offset = divmod(self._position, 64)
+        self._position += width
+        end = offset + width
+        if end <= 64:
+            return (self._words[index] >> (64 - end)) & ((1 << width) - 1)
+        rest = end - 64
+        head = self._words[index] & ((1 << (64 - offset)) - 1)
+        return (head << rest) | (self._words[index + 1] >> (64 - rest))
+
+
+def _leading_zeros(words: np.ndarray) -> np.ndarray:
+    count = np.zeros(len(words), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        empty = (words >> np.uint64(64 - shift)) == 0
+        count += shift * empty
+        words = np.where(empty, words << np.uint64(shift), words)
+    return count
+
+
+def _trailing_zeros(words: np.ndarray) -> np.ndarray:
+    # The lowest set bit is a power of two, exact as a float
+    lowest = words & (~words + np.uint64(1))
+    return np.frexp(lowest.astype(np.float64))[1].astype(np.int64) - 1
+
+
+def _interleave(*columns: np.ndarray) -> np.ndarray:
+    return np.column_stack(columns).ravel()
+
+
+def _encode_timestamps(ticks: np.ndarray) -> bytes:
+    deltas = np.diff(ticks)
+    dods = np.diff(deltas)
+    controls = np.full(len(dods), 0b1111, dtype=np.uint64)
+    control_widths = np.full(len(dods), 4)
+    payloads = dods.view(np.uint64).copy()
+    payload_widths = np.full(len(dods), 64)
+    # Widest code first so each delta of deltas ends with the shortest
+    for size, width in reversed(list(enumerate(DELTA_WIDTHS, start=2))):
+        shifted = dods + ((1 << (width - 1)) - 1)
+        fits = (shifted >= 0) & (shifted < (1 << width))
+        controls[fits] = ((1 << size) - 1) ^ 1
+        control_widths[fits] = size
+        payloads[fits] = shifted[fits].astype(np.uint64)
+        payload_widths[fits] = width
+    zero = dods == 0
+    controls[zero] = 0
+    control_widths[zero] = 1
+    payload_widths[zero] = 0
+
+    head = np.concatenate([ticks[:1], deltas[:1]]).view(np.uint64)
+    return _pack_bits(
+        np.concatenate([head, _interleave(controls, payloads)]),
+        np.concatenate(
+            [
+                np.full(len(head), 64),
+                _interleave(control_widths, payload_widths),
+            ]
+        ),
+    )
+
+
+def _decode_timestamps(data: bytes, count: int) -> np.ndarray:
+    reader = _BitReader(data)
+    head = [reader.read(64) for _ in range(min(count, 2))]
+    dods = np.zeros(max(count - 2, 0), dtype=np.uint64)
+    for index in range(len(dods)):
+        if not reader.read(1):
+            continue
+        for width in DELTA_WIDTHS:
+            if not reader.read(1):
+                dod = reader.read(width) - ((1 << (width - 1)) - 1)
+                break
+        else:
+            dod = reader.read(64)
+        dods[index] = dod % (1 << 64)
+    # Sums wrap around as the differences of the encoder
+    ticks = np.array(head, dtype=np.uint64)
+    deltas = np.cumsum(np.concatenate([ticks[1:], dods]), dtype=np.uint64)
+    ticks = np.cumsum(np.concatenate([ticks[:1], deltas]), dtype=np.uint64)
+    return ticks.view(np.int64)
+
+
+def _encode_values(values: np.ndarray) -> bytes:
+    words = values.view(np.uint64)
+    xors = words[1:] ^ words[:-1]
+    leading = np.minimum(_leading_zeros(xors), MAX_LEADING)
+    trailing = _trailing_zeros(xors)
+
+    # A new window costs its header, reusing the previous one depends on
+    # every window before, so the choice is made point by point
+    windows = np.zeros(len(xors), dtype=bool)
+    window_leading = np.zeros(len(xors), dtype=np.int64)
+    window_trailing = np.zeros(len(xors), dtype=np.int64)
+    current = None
+    for index, (xor, lead, trail) in enumerate(
+        zip(xors.tolist(), leading.tolist(), trailing.tolist())
+    ):
+        if xor == 0:
+            continue
+        if current is None or lead < current[0] or trail < current[1]:
+            current = (lead, trail)
+            windows[index] = True
+        window_leading[index], window_trailing[index] = current
+
+    nonzero = xors != 0
+    lengths = np.where(nonzero, 64 - window_leading - window_trailing, 0)
+    controls = np.where(windows, 0b11, np.where(nonzero, 0b10, 0))
+    headers = (window_leading << LENGTH_BITS) | (lengths % 64)
+    payloads = xors >> np.where(nonzero, window_trailing, 0).astype(np.uint64)
+    return _pack_bits(
+        np.concatenate(
+            [
+                words[:1],
+                _interleave(
+                    controls.astype(np.uint64),
+                    headers.astype(np.uint64),
+                    payloads,
+                ),
+            ]
+        ),
+        np.concatenate(
+            [
+                np.full(1, 64),
+                _interleave(
+                    np.where(nonzero, 2, 1),
+                    np.where(windows, LEADING_BITS + LENGTH_BITS, 0),
+                    lengths,
+                ),
+            ]
+        ),
+    )
+
+
+def _decode_values(data: bytes, count: int) -> np.ndarray:
+    reader = _BitReader(data)
+    xors = np.zeros(count, dtype=np.uint64)
+    xors[0] = reader.read(64)
+    leading = trailing = 0
+    for index in range(1, count):
+        if not reader.read(1):
+            continue
+        if reader.read(1):
+            header = reader.read(LEADING_BITS + LENGTH_BITS)
+            leading = header >> LENGTH_BITS
+            # A length of 64 is written as 0
+            length = header & ((1 << LENGTH_BITS) - 1) or 64
+            trailing = 64 - leading - length
+        xors[index] = reader.read(64 - leading - trailing) << trailing
+    return np.bitwise_xor.accumulate(xors).view(np.float64)
+
+
+def encode_block(
+    timestamps: np.ndarray, values: np.ndarray
+) -> Tuple[bytes, Dict[str, int]]:
+    """Encodes timestamps in nanoseconds and float values, returning the
+    block and its entry in the index without series nor offset.
+    """
+    unit = next(unit for unit in UNITS if not (timestamps % unit).any())
+    encoded_timestamps = _encode_timestamps(timestamps // unit)
+    encoded_values = _encode_values(np.ascontiguousarray(values))
+    entry = {
+        "count": len(timestamps),
+        "unit": unit,
+        "timestamps": len(encoded_timestamps),
+        "values": len(encoded_values),
+        "start": int(timestamps.min()),
+        "end": int(timestamps.max()),
+    }
+    return encoded_timestamps + encoded_values, entry
+
+
+def decode_block(
+    data: bytes, entry: Dict[str, int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the timestamps in nanoseconds and the values of a block."""
+    split = entry["timestamps"]
+    timestamps = _decode_timestamps(data[:split], entry["count"])
+    values = _decode_values(data[split:], entry["count"])
+    return timestamps * entry["unit"], values
+
+
+def new_index() -> Dict[str, Any]:
+    return {"version": VERSION, "columns": None, "series": [], "blocks": []}
+
+
+def _parse_index(data: bytes, end: int, path: str) -> Dict[str, Any]:
+    """Returns the index of the trailer ending at end."""
+    offset, magic = TRAILER.unpack(data[end - TRAILER.size : end])
+    if magic != MAGIC or not len(MAGIC) <= offset <= end - TRAILER.size:
+        raise InvalidArchive(path, "truncated file")
+    try:
+        index = json.loads(data[offset : end - TRAILER.size])
+    except ValueError:
+        raise InvalidArchive(path, "corrupted index")
+    if not isinstance(index, dict):
+        raise InvalidArchive(path, "corrupted index")
+    if index.get("version") != VERSION:
+        raise InvalidArchive(
+            path, f"unsupported version {index.get('version')}"
+        )
+    return index
+
+
+def read_index(handle: IO[bytes], path: str) -> Tuple[Dict[str, Any], int]:
+    """Returns the last complete index of an archive and where its trailer
+    ends, which is where new blocks are appended.
+
+    When the file does not end with a trailer an append was interrupted,
+    the trailer before its blocks is searched for backwards.
+    """
+    handle.seek(0)
+    if handle.read(len(MAGIC)) != MAGIC:
+        raise InvalidArchive(path, "not an archive")
+    size = handle.seek(0, os.SEEK_END)
+    if size < len(MAGIC) + TRAILER.size:
+        raise InvalidArchive(path, "truncated file")
+    with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if data[size - len(MAGIC) : size] == MAGIC:
+            return _parse_index(data, size, path), size
+        end = data.rfind(MAGIC, len(MAGIC))
+        while end != -1:
+            end += len(MAGIC)
+            try:
+                return _parse_index(data, end, path), end
+            except InvalidArchive:
+                # Block bytes that happen to look like a trailer
+                end = data.rfind(MAGIC, len(MAGIC), end - 1)
+    raise InvalidArchive(path, "truncated file")
+
+
+def write_index(handle: IO[bytes], index: Dict[str, Any]):
+    """Writes the index and its trailer at the end of the archive, once
+    the blocks it points to are on disk.
+    """
+    handle.flush()
+    os.fsync(handle.fileno())
+    offset = handle.tell()
+    handle.write(json.dumps(index, separators=(",", ":")).encode())
+    handle.write(TRAILER.pack(offset, MAGIC))
+    handle.flush()
+    os.fsync(handle.fileno())
+
+
+class Archive:
+    """Reads the points of an archive, in blocks."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as handle:
+            self._index, _ = read_index(handle, path)
+        self.columns = self._index["columns"] or []
+
+    @property
+    def rows(self) -> int:
+        return sum(entry["count"] for entry in self._index["blocks"])
+
+    def read(
+        self,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        skip_rows: int = 0,
+    ) -> Iterator[pd.DataFrame]:
+        """Yields a dataframe per block with the points between start and
+        end inclusive, skipping the first skip_rows of them.
+
+        Blocks outside the range are not decoded, nor the ones skipped
+        whole when they are inside it.
+        """
+        start = None if start is None else pd.Timestamp(start).value
+        end = None if end is None else pd.Timestamp(end).value
+        with open(self.path, "rb") as handle:
+            for entry in self._index["blocks"]:
+                if (start is not None and entry["end"] < start) or (
+                    end is not None and entry["start"] > end
+                ):
+                    continue
+                inside = (start is None or entry["start"] >= start) and (
+                    end is None or entry["end"] <= end
+                )
+                if inside and skip_rows >= entry["count"]:
+                    skip_rows -= entry["count"]
+                    continue
+                handle.seek(entry["offset"])
+                timestamps, values = decode_block(
+                    handle.read(entry["timestamps"] + entry["values"]), entry
+                )
+                keep = np.ones(len(timestamps), dtype=bool)
+                if start is not None:
+                    keep &= timestamps >= start
+                if end is not None:
+                    keep &= timestamps <= end
+                selected = np.flatnonzero(keep)
+                keep[selected[:skip_rows]] = False
+                skip_rows -= min(skip_rows, len(selected))
+                timestamps, values = timestamps[keep], values[keep]
+                if len(timestamps):
+                    yield self._frame(entry, timestamps, values)
+
+    def empty(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "timestamp": pd.Series(dtype="datetime64[ns, UTC]"),
+                **{
+                    column: pd.Series(dtype=object)
+                    for column in (*self.columns, "output_format")
+                },
+                "value": pd.Series(dtype="float64"),
+            }
+        )
+
+    def _frame(
+        self, entry: Dict[str, int], timestamps: np.ndarray, values: np.ndarray
+    ) -> pd.DataFrame:
+        series = self._index["series"][entry["series"]]
+        dataframe = pd.DataFrame(
+            {"timestamp": pd.to_datetime(timestamps, unit="ns", utc=True)}
+        )
+        for column, value in zip(self.columns, series):
+            dataframe[column] = value
+        dataframe["output_format"] = "Number"
+        dataframe["value"] = values
+        return dataframe
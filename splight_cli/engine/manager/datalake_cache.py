@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+import pandas as pd
+
+from splight_cli.engine.manager import datalake_io
+from splight_cli.engine.manager.exceptions import MissingDependency
+
+INDEX_FILE = "index.json"
+PIECE_EXTENSION = ".parquet"
+# Pieces missing from the index are left by interrupted fetches once they
+# are this old, newer ones may belong to a fetch still running
+ORPHAN_AGE = 3600
+
+Segment = Tuple[pd.Timestamp, pd.Timestamp, Optional[Dict[str, Any]]]
+
+
+class DatalakeCache:
+    """On-disk cache of the time intervals already fetched for each series.
+
+    Every interval is stored as one or more Parquet files inside a
+    directory per series. The index keeps the intervals of each series,
+    the modification time of its directory is its last use, and series
+    are evicted in least recently used order when the cache exceeds
+    max_size bytes. Pieces of interrupted fetches are removed on start.
+    """
+
+    def __init__(self, path: str, workspace: str, max_size: int):
+        if datalake_io.pq is None:
+            raise MissingDependency("pyarrow", "datalake cache", extra="arrow")
+        self._path = path
+        self._workspace = workspace
+        self._max_size = max_size
+        os.makedirs(self._path, exist_ok=True)
+        self._index = self._read_index()
+        self._sweep()
+
+    def key(self, value_type: str, filters: Dict[str, Any]) -> str:
+        """Returns the key of the points matching the filters other than
+        the time range, so differently filtered fetches never share them.
+        """
+        query = json.dumps(
+            [self._workspace, value_type, filters], sort_keys=True, default=str
+        )
+        return hashlib.sha256(query.encode("utf-8")).hexdigest()[:32]
+
+    def plan(
+        self, key: str, start: pd.Timestamp, end: pd.Timestamp
+    ) -> List[Segment]:
+        """Splits the range in consecutive segments, each one served by a
+        cached interval or a gap (None) that has to be fetched. Segments
+        exclude their end except for the last one.
+        """
+        entry = self._index.get(key, {"intervals": []})
+        segments = []
+        cursor = start
+        for interval in sorted(
+            entry["intervals"], key=lambda item: pd.Timestamp(item["start"])
+        ):
+            interval_start = pd.Timestamp(interval["start"])
+            interval_end = pd.Timestamp(interval["end"])
+            if interval_end < cursor or interval_start > end:
+                continue
+            if interval_start > cursor:
+                segments.append((cursor, interval_start, None))
+                cursor = interval_start
+            segment_end = min(interval_end, end)
+            # A single point segment is only needed for the end of the range
+            if cursor < segment_end or segment_end == end:
+                segments.append((cursor, segment_end, interval))
+            cursor = segment_end
+            if cursor >= end:
+                break
+        if cursor < end:
+            segments.append((cursor, end, None))
+        return segments
+
+    def read(
+        self,
+        key: str,
+        interval: Dict[str, Any],
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        include_end: bool,
+    ) -> Iterator[pd.DataFrame]:
+        self._touch(key)
+        for name in interval["files"]:
+            table = datalake_io.pq.read_table(
+                os.path.join(self._path, key, name)
+            )
+            dataframe = table.to_pandas().set_index("timestamp")
+            upper = (
+                dataframe.index <= end
+                if include_end
+                else dataframe.index < end
+            )
+            dataframe = dataframe[(dataframe.index >= start) & upper]
+            if not dataframe.empty:
+                yield dataframe
+
+    def write_piece(
+        self, key: str, dataframe: pd.DataFrame, value_type: str
+    ) -> str:
+        """Stores part of an interval being fetched and returns its name."""
+        os.makedirs(os.path.join(self._path, key), exist_ok=True)
+        name = f"{uuid4().hex}{PIECE_EXTENSION}"
+        dataframe = datalake_io.normalize_dataframe(dataframe, value_type)
+        datalake_io.pq.write_table(
+            datalake_io.pa.Table.from_pandas(dataframe, preserve_index=False),
+            os.path.join(self._path, key, name),
+        )
+        return name
+
+    def add_interval(
+        self,
+        key: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        files: List[str],
+        series: Dict[str, str],
+    ):
+        entry = self._index.setdefault(
+            key, {"series": series, "intervals": [], "size": 0}
+        )
+        entry["intervals"].append(
+            {
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "files": files,
+            }
+        )
+        entry["size"] += sum(
+            os.path.getsize(os.path.join(self._path, key, name))
+            for name in files
+        )
+        self._touch(key)
+        self._evict(keep=key)
+        self._write_index()
+
+    def _touch(self, key: str):
+        # Kept out of the index so reads do not rewrite it
+        try:
+            os.utime(os.path.join(self._path, key))
+        except FileNotFoundError:
+            pass
+
+    def _last_used(self, key: str) -> float:
+        try:
+            return os.path.getmtime(os.path.join(self._path, key))
+        except FileNotFoundError:
+            return 0.0
+
+    def _evict(self, keep: str):
+        total = sum(entry["size"] for entry in self._index.values())
+        by_use = sorted(
+            self._index.items(), key=lambda item: self._last_used(item[0])
+        )
+        for key, entry in by_use:
+            if total <= self._max_size:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(os.path.join(self._path, key), ignore_errors=True)
+            del self._index[key]
+            total -= entry["size"]
+
+    def _sweep(self):
+        """Removes the pieces and series directories not in the index."""
+        expired = time.time() - ORPHAN_AGE
+        for key in os.listdir(self._path):
+            directory = os.path.join(self._path, key)
+            if not os.path.isdir(directory):
+                continue
+            entry = self._index.get(key, {"intervals": []})
+            referenced = {
+                name
+                for interval in entry["intervals"]
+                for name in interval["files"]
+            }
+            for name in os.listdir(directory):
+                piece = os.path.join(directory, name)
+                if (
+                    name.endswith(PIECE_EXTENSION)
+                    and name not in referenced
+                    and os.path.getmtime(piece) < expired
+                ):
+                    os.remove(piece)
+            if key not in self._index and not os.listdir(directory):
+                os.rmdir(directory)
+
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        path = os.path.join(self._path, INDEX_FILE)
+        if not os.path.isfile(path):
+            return {}
+        with open(path, "r") as fid:
+            return json.load(fid)
+
+    def _write_index(self):
+        path = os.path.join(self._path, INDEX_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as fid:
+            json.dump(self._index, fid, indent=2)
+        os.replace(tmp_path, path)
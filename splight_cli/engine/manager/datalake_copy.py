@@ -0,0 +1,197 @@
+import json
+import os
+from queue import Full, Queue
+from threading import Event, Thread
+from typing import Any, Dict, Iterable, Iterator, List, TypeVar
+
+import pandas as pd
+from splight_lib.client.datalake import DatalakeClientBuilder
+from splight_lib.client.datalake.common.abstract import AbstractDatalakeClient
+from splight_lib.config import (
+    SplightConfigError,
+    SplightConfigManager,
+    WorkspaceNotFoundError,
+)
+from splight_lib.models import SplightDatalakeBaseModel
+from splight_lib.settings import (
+    DatalakeClientType,
+    SplightAPIVersion,
+    api_settings,
+)
+
+from splight_cli.engine.manager.exceptions import (
+    InvalidManifest,
+    InvalidWorkspace,
+)
+
+T = TypeVar("T")
+
+# Keys of each entry of an ID remapping table
+REMAP_KEYS = ("source", "target")
+
+
+class WorkspaceDatalake:
+    """Datalake of a configured workspace read and written with its own
+    client, so several workspaces can be used at once.
+
+    The models always use the client of the current workspace, built from
+    the global settings on every request. The client is a sync one, so
+    failed requests raise instead of being logged by a buffer thread.
+    """
+
+    def __init__(self, client: AbstractDatalakeClient, name: str = ""):
+        self._client = client
+        self.name = name
+
+    @classmethod
+    def from_workspace(cls, name: str) -> "WorkspaceDatalake":
+        if api_settings.API_VERSION != SplightAPIVersion.V3:
+            raise InvalidWorkspace(
+                name,
+                f"API version {api_settings.API_VERSION.value} is not "
+                f"supported, datalake copies need {SplightAPIVersion.V3.value}",
+            )
+        try:
+            workspace = SplightConfigManager().get(name)
+        except WorkspaceNotFoundError:
+            raise InvalidWorkspace(name, "workspace not found")
+        except SplightConfigError as exc:
+            raise InvalidWorkspace(name, str(exc))
+        if not workspace.SPLIGHT_ACCESS_ID or not workspace.SPLIGHT_SECRET_KEY:
+            raise InvalidWorkspace(name, "credentials are not configured")
+        client = DatalakeClientBuilder.build(
+            version=api_settings.API_VERSION,
+            dl_client_type=DatalakeClientType.SYNC,
+            parameters={
+                "base_url": workspace.SPLIGHT_PLATFORM_API_HOST,
+                "access_id": workspace.SPLIGHT_ACCESS_ID,
+                "secret_key": workspace.SPLIGHT_SECRET_KEY,
+                "api_version": api_settings.API_VERSION,
+            },
+        )
+        return cls(client, name=name)
+
+    def get_dataframe(
+        self,
+        model: SplightDatalakeBaseModel,
+        asset: str,
+        attribute: str,
+        extra_pipeline: List[Dict[str, Any]] = [],
+        **params: Any,
+    ) -> pd.DataFrame:
+        """Same as the get_dataframe of the model, through this client."""
+        # Only exported by splight-lib with API version v3
+        from splight_lib.models import DataRequest, Trace
+
+        request = DataRequest[model](
+            from_timestamp=params.get("from_timestamp"),
+            to_timestamp=params.get("to_timestamp"),
+        )
+        trace = Trace.from_address(asset, attribute)
+        trace.pipeline.extend(extra_pipeline)
+        request.add_trace(trace)
+        response = self._client.get(request.model_dump(mode="json"))
+        dataframe = pd.DataFrame(
+            [
+                model(
+                    timestamp=item["timestamp"],
+                    value=item[trace.ref_id],
+                    asset=asset,
+                    attribute=attribute,
+                ).model_dump()
+                for item in response["results"]
+                if item.get(trace.ref_id) is not None
+            ]
+        )
+        if not dataframe.empty:
+            dataframe.index = dataframe["timestamp"]
+            dataframe.drop(columns="timestamp", inplace=True)
+        return dataframe
+
+    def save_dataframe(
+        self, model: SplightDatalakeBaseModel, dataframe: pd.DataFrame
+    ):
+        """Same as the save_dataframe of the model, through this client."""
+        records = [
+            model.model_validate(record).model_dump(mode="json")
+            for record in dataframe.to_dict("records")
+        ]
+        self._client.save(
+            {"collection": model._collection_name, "records": records}
+        )
+
+
+def read_remap(path: str) -> Dict[str, str]:
+    """Reads a CSV or JSON table of source and target IDs, used to
+    replace asset and attribute IDs between workspaces.
+    """
+    if not os.path.isfile(path):
+        raise InvalidManifest(path, "file not found")
+    if path.lower().endswith(".json"):
+        with open(path, "r") as fid:
+            entries = json.load(fid)
+        if isinstance(entries, dict):
+            entries = [
+                {"source": source, "target": target}
+                for source, target in entries.items()
+            ]
+        if not isinstance(entries, list):
+            raise InvalidManifest(path, "expected a list of IDs")
+    else:
+        entries = pd.read_csv(path, dtype=str).to_dict("records")
+    remap = {}
+    for entry in entries:
+        if not isinstance(entry, dict) or not all(
+            isinstance(entry.get(key), str) for key in REMAP_KEYS
+        ):
+            raise InvalidManifest(
+                path, f"every ID needs {', '.join(REMAP_KEYS)}"
+            )
+        remap[entry["source"]] = entry["target"]
+    return remap
+
+
+def prefetch(items: Iterable[T], maxsize: int) -> Iterator[T]:
+    """Yields the items produced by a background thread through a queue of
+    at most maxsize items, so producing the next ones overlaps with
+    consuming the previous ones while memory stays bounded.
+
+    Errors of the producer are raised by the consumer, and the producer
+    stops when the consumer does.
+    """
+    queue: Queue = Queue(maxsize=maxsize)
+    stopped = Event()
+    done = object()
+
+    def put(item: Any) -> bool:
+        while not stopped.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((None, item)):
+                    return
+        except Exception as exc:
+            put((exc, None))
+            return
+        put((None, done))
+
+    thread = Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            error, item = queue.get()
+            if error is not None:
+                raise error
+            if item is done:
+                break
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
@@ -0,0 +1,123 @@
+import os
+from typing import List, NamedTuple, Optional
+
+from splight_cli.engine.manager import datalake_io
+from splight_cli.engine.manager.datalake_sample import SAMPLE_MODES
+from splight_cli.engine.manager.exceptions import (
+    ExistingOutput,
+    InvalidDumpOptions,
+)
+
+# File written in a directory given to a single file dump
+DUMP_FILE_NAME = "splight_dump.csv"
+
+
+class DumpOptions(NamedTuple):
+    """How DatalakeManager.dump reads the points and writes them.
+
+    The points come from a sample of the range, from aggregates computed
+    by the datalake or from a fetch by windows, shards or through the
+    cache, resampled when resample is set. They are written to a single
+    file, or to a directory of files with hive or max_file_size. Sizes
+    are in bytes.
+    """
+
+    window: Optional[str] = None
+    parallel: int = 1
+    incremental: bool = False
+    cache_size: Optional[int] = None
+    resample: Optional[str] = None
+    aggregations: Optional[List[str]] = None
+    server_side: bool = False
+    hive: bool = False
+    max_file_size: Optional[int] = None
+    file_format: str = "csv"
+    sample: Optional[int] = None
+    sample_mode: str = "reservoir"
+    seed: Optional[int] = None
+
+    @property
+    def partitioned(self) -> bool:
+        return self.hive or self.max_file_size is not None
+
+    @property
+    def chunked(self) -> bool:
+        """Whether the points arrive in several chunks, reported as they
+        are written.
+        """
+        return (
+            self.window is not None
+            or self.parallel > 1
+            or self.cache_size is not None
+        )
+
+    def check(self):
+        """Raises InvalidDumpOptions for options that can not be combined."""
+        if self.resample is not None:
+            if self.incremental:
+                raise InvalidDumpOptions(
+                    "resampled dumps can not be incremental, the last "
+                    "interval of a dump may still be incomplete"
+                )
+            if self.server_side and self.chunked:
+                raise InvalidDumpOptions(
+                    "server side aggregation fetches the whole range at "
+                    "once, it can not be combined with --window, "
+                    "--parallel or --cache"
+                )
+        elif self.server_side:
+            raise InvalidDumpOptions(
+                "server side aggregation requires a resample interval"
+            )
+        if self.sample is not None:
+            if self.sample <= 0:
+                raise InvalidDumpOptions(
+                    "sample size must be a positive number of points"
+                )
+            if self.sample_mode not in SAMPLE_MODES:
+                raise InvalidDumpOptions(
+                    f"sample mode {self.sample_mode} not supported, use one "
+                    f"of {', '.join(SAMPLE_MODES)}"
+                )
+            if self.resample is not None or self.incremental:
+                raise InvalidDumpOptions(
+                    "sampled dumps can not be resampled nor incremental"
+                )
+        if self.max_file_size is not None and self.max_file_size <= 0:
+            raise InvalidDumpOptions("maximum file size must be positive")
+        if self.hive and self.file_format == datalake_io.SQLITE_FORMAT:
+            raise InvalidDumpOptions(
+                "hive partitions leave asset and attribute out of the "
+                "files, sqlite tables are keyed on them"
+            )
+
+
+def dump_path(path: str, options: DumpOptions) -> str:
+    """Returns the file or directory a dump is written to.
+
+    Raises ExistingOutput rather than overwrite a previous dump, unless
+    the dump is incremental or to a database holding many series.
+    """
+    if options.partitioned:
+        path = os.path.normpath(path)
+        if os.path.isfile(path):
+            raise InvalidDumpOptions(
+                f"{path} is a file, partitioned dumps are written to a "
+                "directory"
+            )
+        if (
+            os.path.isdir(path)
+            and os.listdir(path)
+            and not options.incremental
+        ):
+            raise ExistingOutput(path, directory=True)
+        return path
+    if (
+        os.path.exists(path)
+        and not options.incremental
+        and not datalake_io.is_database(path)
+    ):
+        raise ExistingOutput(path)
+    if os.path.isdir(path):
+        return os.path.join(path, DUMP_FILE_NAME)
+    return path
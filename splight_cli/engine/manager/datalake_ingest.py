@@ -0,0 +1,178 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+from rich.table import Table
+
+from splight_cli.constants import REQUIRED_DATALAKE_COLUMNS
+from splight_cli.engine.manager import datalake_io
+from splight_cli.engine.manager.datalake_validation import check_batch
+from splight_cli.engine.manager.exceptions import (
+    ChangedFile,
+    InvalidDatalakeFile,
+    MissingDependency,
+    UnsupportedFileFormat,
+)
+
+# Row offset and number of rows of a batch
+BatchRange = Tuple[int, int]
+
+
+def committed_batches(manifest: Dict[str, Any]) -> Dict[BatchRange, str]:
+    """Returns the checksum of each batch saved by a previous load."""
+    return {
+        (batch["offset"], batch["rows"]): batch["checksum"]
+        for batch in manifest["batches"]
+    }
+
+
+def resume_offset(committed: Dict[BatchRange, str]) -> int:
+    """Returns the row a resumed load reads the file from: the start of the
+    last batch of the committed prefix, checked against the file before
+    the rest is loaded. The rows before it are skipped without parsing.
+    """
+    rows = dict(committed.keys())
+    offset = boundary = 0
+    while rows.get(offset):
+        boundary = offset
+        offset += rows[offset]
+    return boundary
+
+
+def is_committed(
+    path: str,
+    committed: Dict[BatchRange, str],
+    offset: int,
+    dataframe: pd.DataFrame,
+) -> bool:
+    """Tells whether the batch at offset was saved by a previous load,
+    failing when the rows saved differ from the ones now in the file.
+    """
+    checksum = committed.get((offset, len(dataframe)))
+    if checksum is None:
+        return False
+    if checksum != datalake_io.batch_checksum(dataframe):
+        raise ChangedFile(path, f"the batch at row {offset} differs")
+    return True
+
+
+class ParsedFile(NamedTuple):
+    path: str
+    rows: int
+    batches: List[Tuple[int, pd.DataFrame]]
+    error: Optional[str]
+
+
+def parse_file(
+    path: str,
+    value_type: str,
+    chunksize: Optional[int],
+    committed: Dict[BatchRange, str],
+    timestamp_format: Optional[str] = None,
+) -> ParsedFile:
+    """Reads and validates a file in a worker process, returning its
+    batches not yet committed with their row offset.
+
+    Errors are returned instead of raised so a bad file is reported
+    without stopping the files parsed by the other workers.
+    """
+    try:
+        columns = datalake_io.read_columns(path)
+        missing = REQUIRED_DATALAKE_COLUMNS - set(columns)
+        if missing:
+            return ParsedFile(
+                path, 0, [], f"Missing columns {', '.join(sorted(missing))}"
+            )
+        batches = []
+        offset = resume_offset(committed)
+        for dataframe in datalake_io.read_chunks(
+            path,
+            chunksize=chunksize,
+            skip_rows=offset,
+            value_type=value_type,
+            timestamp_format=timestamp_format,
+        ):
+            rows = len(dataframe)
+            issues = check_batch(dataframe, value_type)
+            invalid = [
+                f"{count} {issue}" for issue, count in issues.items() if count
+            ]
+            if invalid:
+                return ParsedFile(
+                    path,
+                    0,
+                    [],
+                    f"Invalid values in the batch at row {offset}: "
+                    f"{', '.join(invalid)}",
+                )
+            if rows and not is_committed(path, committed, offset, dataframe):
+                batches.append((offset, dataframe))
+            offset += rows
+    except (
+        UnsupportedFileFormat,
+        MissingDependency,
+        InvalidDatalakeFile,
+        ChangedFile,
+        # Unparsable values, including undecodable text
+        ValueError,
+        OSError,
+    ) as exc:
+        return ParsedFile(path, 0, [], str(exc))
+    return ParsedFile(path, offset, batches, None)
+
+
+class LoadReport:
+    """Tracks the status of each file of a multi-file load."""
+
+    LOADED = "loaded"
+    VALID = "valid"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+    PENDING = "pending"
+
+    def __init__(self, paths: List[str]):
+        self._files: Dict[str, Dict[str, str]] = {
+            path: {"rows": "", "status": self.PENDING, "detail": ""}
+            for path in paths
+        }
+
+    def set(self, path: str, status: str, rows: int = None, detail: str = ""):
+        entry = self._files[path]
+        entry["status"] = status
+        entry["detail"] = detail
+        if rows is not None:
+            entry["rows"] = str(rows)
+
+    def count(self, status: str) -> int:
+        return sum(entry["status"] == status for entry in self._files.values())
+
+    def as_table(self) -> Table:
+        counts = [
+            f"{self.count(status)} {status}"
+            for status in (
+                self.LOADED,
+                self.VALID,
+                self.SKIPPED,
+                self.FAILED,
+                self.PENDING,
+            )
+            if self.count(status)
+        ]
+        table = Table(title=f"{', '.join(counts)} of {len(self._files)} files")
+        table.add_column("File")
+        table.add_column("Rows", justify="right")
+        table.add_column("Status")
+        table.add_column("Detail")
+        styles = {
+            self.LOADED: "green",
+            self.VALID: "green",
+            self.FAILED: "red",
+        }
+        for path, entry in self._files.items():
+            table.add_row(
+                path,
+                entry["rows"],
+                entry["status"],
+                entry["detail"],
+                style=styles.get(entry["status"]),
+            )
+        return table
@@ -0,0 +1,1157 @@
+import bz2
+import glob
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import sqlite3
+import struct
+from contextlib import closing
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Type
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from splight_cli.engine.manager import datalake_archive
+from splight_cli.engine.manager.exceptions import (
+    InvalidArchive,
+    InvalidArrayFile,
+    InvalidDatalakeFile,
+    InvalidManifest,
+    MissingDependency,
+    UnsupportedFileFormat,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pa_csv = None
+    pq = None
+
+try:
+    import pyzstd
+except ImportError:
+    pyzstd = None
+
+CSV_FORMAT = "csv"
+PARQUET_FORMAT = "parquet"
+FEATHER_FORMAT = "feather"
+SQLITE_FORMAT = "sqlite"
+ARCHIVE_FORMAT = "archive"
+NPY_FORMAT = "npy"
+
+FILE_FORMATS = {
+    ".csv": CSV_FORMAT,
+    ".parquet": PARQUET_FORMAT,
+    ".pq": PARQUET_FORMAT,
+    ".feather": FEATHER_FORMAT,
+    ".arrow": FEATHER_FORMAT,
+    ".sqlite": SQLITE_FORMAT,
+    ".sqlite3": SQLITE_FORMAT,
+    ".db": SQLITE_FORMAT,
+    ".sla": ARCHIVE_FORMAT,
+    ".npy": NPY_FORMAT,
+}
+# Formats that do not need pyarrow
+NATIVE_FORMATS = (CSV_FORMAT, SQLITE_FORMAT, ARCHIVE_FORMAT, NPY_FORMAT)
+# Formats that can hold values of different types
+MIXED_FORMATS = (CSV_FORMAT, SQLITE_FORMAT)
+# Compressions supported for CSV files
+COMPRESSIONS = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+}
+CSV_EXTENSIONS = [".csv"] + [f".csv{extension}" for extension in COMPRESSIONS]
+EXTENSIONS = {
+    PARQUET_FORMAT: ".parquet",
+    FEATHER_FORMAT: ".feather",
+    SQLITE_FORMAT: ".sqlite",
+    ARCHIVE_FORMAT: ".sla",
+    NPY_FORMAT: ".npy",
+    **{extension[1:]: extension for extension in CSV_EXTENSIONS},
+}
+MANIFEST_KEYS = ("asset", "attribute", "type")
+SQLITE_TABLE = "datalake"
+# Fixed width text timestamps sort in time order in SQLite
+SQLITE_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f+00:00"
+STRING_COLUMNS = ("asset", "attribute", "output_format")
+# Records of .npy dumps, 16 bytes long so both fields stay aligned
+NPY_DTYPE = np.dtype([("timestamp", "<i8"), ("value", "<f8")])
+# Size of the .npy header, fixed so the row count can be rewritten
+NPY_HEADER_SIZE = 128
+
+# pandas dtype of the value column for each datalake model
+VALUE_DTYPES = {
+    "Number": "float64",
+    "String": "string",
+    "Boolean": "bool",
+}
+
+
+def get_compression(path: str) -> Tuple[str, Optional[str]]:
+    """Returns the path without the compression extension and the
+    compression of the file, if any.
+    """
+    root, extension = os.path.splitext(path)
+    if extension.lower() in COMPRESSIONS:
+        return root, COMPRESSIONS[extension.lower()]
+    return path, None
+
+
+def get_file_format(path: str) -> str:
+    root, compression = get_compression(path)
+    _, extension = os.path.splitext(root.lower())
+    file_format = FILE_FORMATS.get(extension)
+    if file_format is None or (
+        compression is not None and file_format != CSV_FORMAT
+    ):
+        raise UnsupportedFileFormat(
+            path, list(FILE_FORMATS) + CSV_EXTENSIONS[1:]
+        )
+    if file_format not in NATIVE_FORMATS and pa is None:
+        raise MissingDependency("pyarrow", file_format, extra="arrow")
+    if compression == "zstd" and pyzstd is None:
+        raise MissingDependency("pyzstd", compression)
+    return file_format
+
+
+def has_data_extension(path: str) -> bool:
+    root, compression = get_compression(path)
+    _, extension = os.path.splitext(root.lower())
+    file_format = FILE_FORMATS.get(extension)
+    return file_format is not None and (
+        compression is None or file_format == CSV_FORMAT
+    )
+
+
+def expand_paths(path: str) -> List[str]:
+    """Returns the data files in a directory or matching a glob pattern,
+    sorted by name. Any other path is returned as is.
+    """
+    if os.path.isdir(path):
+        paths = [os.path.join(path, name) for name in os.listdir(path)]
+    elif glob.escape(path) != path:
+        paths = glob.glob(path, recursive=True)
+    else:
+        return [path]
+    return sorted(
+        item
+        for item in paths
+        if os.path.isfile(item) and has_data_extension(item)
+    )
+
+
+def is_database(path: str) -> bool:
+    try:
+        return get_file_format(path) == SQLITE_FORMAT
+    except (UnsupportedFileFormat, MissingDependency):
+        return False
+
+
+def open_text(path: str, mode: str = "r") -> IO[str]:
+    """Opens a text file, compressed or not, as a stream."""
+    _, compression = get_compression(path)
+    if compression == "gzip":
+        return gzip.open(path, f"{mode}t", newline="")
+    if compression == "bz2":
+        return bz2.open(path, f"{mode}t", newline="")
+    if compression == "xz":
+        return lzma.open(path, f"{mode}t", newline="")
+    if compression == "zstd":
+        return pyzstd.open(path, f"{mode}t", newline="")
+    return open(path, mode, newline="")
+
+
+def open_binary(path: str) -> IO[bytes]:
+    """Opens a file for reading, decompressing it as a stream."""
+    _, compression = get_compression(path)
+    openers = {
+        "gzip": gzip.open,
+        "bz2": bz2.open,
+        "xz": lzma.open,
+        "zstd": lambda path, mode: pyzstd.open(path, mode),
+    }
+    return openers.get(compression, open)(path, "rb")
+
+
+def _arrow_value_type(value_type: str) -> "pa.DataType":
+    return {
+        "Number": pa.float64(),
+        "String": pa.string(),
+        "Boolean": pa.bool_(),
+    }[value_type]
+
+
+def _arrow_schema(
+    dataframe: pd.DataFrame,
+    value_type: str,
+    column_types: Optional[Dict[str, str]] = None,
+) -> "pa.Schema":
+    column_types = column_types or {}
+    fields = []
+    for column in dataframe.columns:
+        if column in column_types:
+            fields.append(
+                pa.field(column, _arrow_value_type(column_types[column]))
+            )
+        elif column == "timestamp":
+            fields.append(pa.field(column, pa.timestamp("ns", tz="UTC")))
+        elif column in ("value", "value_min", "value_max", "value_last"):
+            fields.append(pa.field(column, _arrow_value_type(value_type)))
+        elif column == "value_mean":
+            fields.append(pa.field(column, pa.float64()))
+        elif column == "count":
+            fields.append(pa.field(column, pa.int64()))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+def normalize_dataframe(
+    dataframe: pd.DataFrame, value_type: str
+) -> pd.DataFrame:
+    """Returns the dataframe with the timestamp as a UTC column and the value
+    column casted to the dtype of the datalake model.
+    """
+    if "timestamp" not in dataframe.columns:
+        dataframe = dataframe.rename_axis("timestamp").reset_index()
+    dataframe = dataframe.copy()
+    dataframe["timestamp"] = pd.to_datetime(dataframe["timestamp"], utc=True)
+    if "value" in dataframe.columns:
+        dataframe["value"] = dataframe["value"].astype(
+            VALUE_DTYPES[value_type]
+        )
+    return dataframe
+
+
+class DatalakeWriter:
+    """Appends dataframes indexed by timestamp to a file.
+
+    Writers are created with `open_writer` and are meant to be used as
+    context managers so the file is always closed. Columns other than the
+    datalake ones can be typed with the model type in column_types.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        value_type: str,
+        append: bool = False,
+        column_types: Optional[Dict[str, str]] = None,
+    ):
+        self.path = path
+        self.value_type = value_type
+        self.append = append
+        self.column_types = column_types
+        self.rows = 0
+
+    def write(self, dataframe: pd.DataFrame):
+        if dataframe.empty:
+            return
+        self._write(dataframe)
+        self.rows += len(dataframe)
+
+    def _write(self, dataframe: pd.DataFrame):
+        raise NotImplementedError
+
+    def flush(self) -> bool:
+        """Makes the rows written so far durable, returning whether it
+        could. Formats only complete once closed can not be flushed.
+        """
+        return False
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _fsync(path: str):
+    descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class CSVWriter(DatalakeWriter):
+    """Appends to a CSV file, keeping compressed files open so each
+    dataframe is written to the same compressed stream.
+
+    Flushing ends the compressed stream, the next dataframe starts a new
+    one as readers decompress concatenated streams as a single file.
+    """
+
+    def __init__(self, path: str, value_type: str, **kwargs):
+        super().__init__(path, value_type, **kwargs)
+        self._compression = get_compression(path)[1]
+        self._handle = None
+
+    def _write(self, dataframe: pd.DataFrame):
+        header = self.rows == 0 and not self.append
+        if self._compression is None:
+            dataframe.to_csv(
+                self.path, mode="a", header=header, index_label="timestamp"
+            )
+            return
+        if self._handle is None:
+            self._handle = open_text(self.path, "a")
+        dataframe.to_csv(self._handle, header=header, index_label="timestamp")
+
+    def flush(self) -> bool:
+        self.close()
+        if os.path.exists(self.path):
+            _fsync(self.path)
+        return True
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class ArrowWriter(DatalakeWriter):
+    """Streams record batches with a schema fixed by the first dataframe."""
+
+    def __init__(
+        self,
+        path: str,
+        value_type: str,
+        append: bool = False,
+        column_types: Optional[Dict[str, str]] = None,
+    ):
+        if append:
+            raise UnsupportedFileFormat(path, CSV_EXTENSIONS, "appending")
+        super().__init__(path, value_type, column_types=column_types)
+        self._schema = None
+        self._writer = None
+
+    def _write(self, dataframe: pd.DataFrame):
+        dataframe = normalize_dataframe(dataframe, self.value_type)
+        if self._writer is None:
+            self._schema = _arrow_schema(
+                dataframe, self.value_type, self.column_types
+            )
+            self._writer = self._create_writer()
+        table = pa.Table.from_pandas(
+            dataframe, schema=self._schema, preserve_index=False
+        )
+        self._writer.write_table(table)
+
+    def _create_writer(self):
+        raise NotImplementedError
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class ParquetWriter(ArrowWriter):
+    def _create_writer(self):
+        return pq.ParquetWriter(self.path, self._schema)
+
+
+class FeatherWriter(ArrowWriter):
+    def _create_writer(self):
+        return pa.ipc.new_file(self.path, self._schema)
+
+
+class SQLiteWriter(DatalakeWriter):
+    """Inserts the rows in a table of a SQLite database with a unique index
+    on asset, attribute and timestamp.
+
+    Each dataframe is inserted with executemany in a single transaction.
+    Existing databases are appended to, replacing the points already in
+    them, and columns missing from the table are added to it.
+    """
+
+    def __init__(self, path: str, value_type: str, **kwargs):
+        super().__init__(path, value_type, **kwargs)
+        if self.column_types:
+            raise InvalidDatalakeFile(
+                path, "wide tables can not be written to a database"
+            )
+        # Combined dumps write from many threads, serialized by a lock
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {SQLITE_TABLE} ("
+                "timestamp TEXT NOT NULL, asset TEXT NOT NULL, "
+                "attribute TEXT NOT NULL, output_format TEXT, value)"
+            )
+            self._connection.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {SQLITE_TABLE}_point "
+                f"ON {SQLITE_TABLE} (asset, attribute, timestamp)"
+            )
+        self._columns = _sqlite_columns(self._connection)
+
+    def _write(self, dataframe: pd.DataFrame):
+        if "timestamp" not in dataframe.columns:
+            dataframe = dataframe.rename_axis("timestamp").reset_index()
+        dataframe = dataframe.copy()
+        dataframe["timestamp"] = pd.to_datetime(
+            dataframe["timestamp"], utc=True
+        ).dt.strftime(SQLITE_TIMESTAMP_FORMAT)
+        if "value" in dataframe.columns and "output_format" in dataframe:
+            # Booleans are stored as text so they read back as in CSV files
+            booleans = dataframe["output_format"] == "Boolean"
+            if booleans.any():
+                dataframe["value"] = dataframe["value"].astype(object)
+                dataframe.loc[booleans, "value"] = (
+                    dataframe.loc[booleans, "value"].astype(str).str.lower()
+                )
+        columns = list(dataframe.columns)
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        rows = (
+            dataframe.astype(object)
+            .where(dataframe.notna(), None)
+            .itertuples(index=False, name=None)
+        )
+        with self._connection:
+            for column in columns:
+                if column not in self._columns:
+                    self._connection.execute(
+                        f'ALTER TABLE {SQLITE_TABLE} ADD COLUMN "{column}"'
+                    )
+                    self._columns.append(column)
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO {SQLITE_TABLE} ({quoted}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                rows,
+            )
+
+    def flush(self) -> bool:
+        # Each dataframe is committed in its own transaction
+        return True
+
+    def close(self):
+        self._connection.close()
+
+
+class ArchiveWriter(DatalakeWriter):
+    """Writes Number series to an archive of compressed blocks, see
+    datalake_archive.
+
+    Points are buffered per series until they fill a block, the last
+    block of each series is written on close along with the index.
+    Appending writes the new blocks and index after the previous ones.
+    """
+
+    def __init__(self, path: str, value_type: str, **kwargs):
+        super().__init__(path, value_type, **kwargs)
+        if value_type != "Number":
+            raise InvalidArchive(path, "only Number series can be archived")
+        if self.column_types:
+            raise InvalidArchive(path, "wide tables can not be archived")
+        if self.append:
+            self._handle = open(path, "r+b")
+            self._index, end = datalake_archive.read_index(self._handle, path)
+            # Drop the blocks of an interrupted append, never the index
+            self._handle.truncate(end)
+            self._handle.seek(end)
+        else:
+            self._handle = open(path, "wb")
+            self._handle.write(datalake_archive.MAGIC)
+            self._index = datalake_archive.new_index()
+        self._series = {
+            tuple(series): position
+            for position, series in enumerate(self._index["series"])
+        }
+        self._pending: Dict[Tuple, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _write(self, dataframe: pd.DataFrame):
+        if "timestamp" in dataframe.columns:
+            dataframe = dataframe.set_index("timestamp")
+        columns = [
+            column
+            for column in datalake_archive.SERIES_COLUMNS
+            if column in dataframe.columns
+        ]
+        extra = set(dataframe.columns) - {*columns, "output_format", "value"}
+        if "value" not in dataframe.columns or extra:
+            raise InvalidArchive(
+                self.path, "only raw points with a value can be archived"
+            )
+        if self._index["columns"] is None:
+            self._index["columns"] = columns
+        elif self._index["columns"] != columns:
+            raise InvalidArchive(
+                self.path, f"expected the columns {self._index['columns']}"
+            )
+        timestamps = pd.to_datetime(dataframe.index, utc=True)
+        dataframe = pd.DataFrame(
+            {
+                **{column: dataframe[column].to_numpy() for column in columns},
+                "timestamp": timestamps.as_unit("ns").asi8,
+                "value": dataframe["value"].to_numpy(dtype="float64"),
+            }
+        )
+        groups = (
+            dataframe.groupby(columns, sort=False, dropna=False)
+            if columns
+            else [((), dataframe)]
+        )
+        for key, points in groups:
+            self._add(
+                key if isinstance(key, tuple) else (key,),
+                points["timestamp"].to_numpy(),
+                points["value"].to_numpy(),
+            )
+
+    def _add(self, key: Tuple, timestamps: np.ndarray, values: np.ndarray):
+        if key in self._pending:
+            pending_timestamps, pending_values = self._pending[key]
+            timestamps = np.concatenate([pending_timestamps, timestamps])
+            values = np.concatenate([pending_values, values])
+        size = datalake_archive.BLOCK_SIZE
+        full = len(timestamps) - len(timestamps) % size
+        for start in range(0, full, size):
+            self._write_block(
+                key,
+                timestamps[start : start + size],
+                values[start : start + size],
+            )
+        self._pending[key] = (timestamps[full:], values[full:])
+
+    def _write_block(
+        self, key: Tuple, timestamps: np.ndarray, values: np.ndarray
+    ):
+        if key not in self._series:
+            self._series[key] = len(self._index["series"])
+            self._index["series"].append(list(key))
+        block, entry = datalake_archive.encode_block(timestamps, values)
+        entry["series"] = self._series[key]
+        entry["offset"] = self._handle.tell()
+        self._handle.write(block)
+        self._index["blocks"].append(entry)
+
+    def close(self):
+        if self._handle is None:
+            return
+        for key, (timestamps, values) in self._pending.items():
+            if len(timestamps):
+                self._write_block(key, timestamps, values)
+        self._pending = {}
+        datalake_archive.write_index(self._handle, self._index)
+        self._handle.close()
+        self._handle = None
+
+
+def _npy_header(rows: int) -> bytes:
+    header = repr(
+        {"descr": NPY_DTYPE.descr, "fortran_order": False, "shape": (rows,)}
+    ).encode("latin1")
+    magic = np.lib.format.magic(1, 0)
+    # Padded with spaces up to a newline, as numpy does
+    length = NPY_HEADER_SIZE - len(magic) - 2
+    return magic + struct.pack("<H", length) + header.ljust(length - 1) + b"\n"
+
+
+def _read_npy_rows(handle: IO[bytes], path: str) -> int:
+    """Returns the number of rows of a .npy dump, checking it was written
+    by NpyWriter.
+    """
+    handle.seek(0)
+    try:
+        np.lib.format.read_magic(handle)
+        shape, _, dtype = np.lib.format.read_array_header_1_0(handle)
+    except ValueError:
+        raise InvalidArrayFile(path, "not a .npy file")
+    if dtype != NPY_DTYPE or handle.tell() != NPY_HEADER_SIZE:
+        raise InvalidArrayFile(path, "not a datalake dump")
+    return shape[0]
+
+
+def npy_metadata_path(path: str) -> str:
+    return f"{path}.json"
+
+
+class NpyWriter(DatalakeWriter):
+    """Writes a Number series as a .npy array of timestamps in nanoseconds
+    since the epoch and float values, with its asset and attribute in a
+    JSON file next to it. The array can be opened with
+    np.load(path, mmap_mode="r") without parsing nor copying it.
+
+    The header has a fixed size and is rewritten on flush and close with
+    the number of rows, so appending only adds records at the end.
+    """
+
+    def __init__(self, path: str, value_type: str, **kwargs):
+        super().__init__(path, value_type, **kwargs)
+        if value_type != "Number":
+            raise InvalidArrayFile(
+                path, "only Number series can be dumped as arrays"
+            )
+        if self.column_types:
+            raise InvalidArrayFile(path, "wide tables can not be dumped")
+        if self.append:
+            self._metadata = _read_json(npy_metadata_path(path))
+            self._handle = open(path, "r+b")
+            self._total = _read_npy_rows(self._handle, path)
+            # Drop the records of an interrupted write not in the header
+            self._handle.truncate(
+                NPY_HEADER_SIZE + self._total * NPY_DTYPE.itemsize
+            )
+            self._handle.seek(0, os.SEEK_END)
+        else:
+            self._metadata = {}
+            self._handle = open(path, "wb")
+            self._handle.write(_npy_header(0))
+            self._total = 0
+
+    def _write(self, dataframe: pd.DataFrame):
+        if "timestamp" in dataframe.columns:
+            dataframe = dataframe.set_index("timestamp")
+        columns = [
+            column
+            for column in datalake_archive.SERIES_COLUMNS
+            if column in dataframe.columns
+        ]
+        extra = set(dataframe.columns) - {*columns, "output_format", "value"}
+        if "value" not in dataframe.columns or extra:
+            raise InvalidArrayFile(
+                self.path, "only raw points with a value can be dumped"
+            )
+        for column in columns:
+            values = dataframe[column].unique()
+            if len(values) > 1 or (
+                self._metadata.setdefault(column, values[0]) != values[0]
+            ):
+                raise InvalidArrayFile(
+                    self.path, "an array holds a single series"
+                )
+        records = np.empty(len(dataframe), dtype=NPY_DTYPE)
+        records["timestamp"] = (
+            pd.to_datetime(dataframe.index, utc=True).as_unit("ns").asi8
+        )
+        records["value"] = dataframe["value"].to_numpy(dtype="float64")
+        self._handle.write(records.tobytes())
+        self._total += len(records)
+
+    def flush(self) -> bool:
+        self._handle.seek(0)
+        self._handle.write(_npy_header(self._total))
+        self._handle.seek(0, os.SEEK_END)
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._write_metadata()
+        return True
+
+    def close(self):
+        if self._handle is None:
+            return
+        self._handle.seek(0)
+        self._handle.write(_npy_header(self._total))
+        self._handle.close()
+        self._handle = None
+        self._write_metadata()
+
+    def _write_metadata(self):
+        _write_json(
+            npy_metadata_path(self.path),
+            {
+                **self._metadata,
+                "output_format": self.value_type,
+                "rows": self._total,
+            },
+        )
+
+
+def _sqlite_columns(connection: sqlite3.Connection) -> List[str]:
+    return [
+        row[1]
+        for row in connection.execute(f"PRAGMA table_info({SQLITE_TABLE})")
+    ]
+
+
+WRITERS: Dict[str, Type[DatalakeWriter]] = {
+    CSV_FORMAT: CSVWriter,
+    PARQUET_FORMAT: ParquetWriter,
+    FEATHER_FORMAT: FeatherWriter,
+    SQLITE_FORMAT: SQLiteWriter,
+    ARCHIVE_FORMAT: ArchiveWriter,
+    NPY_FORMAT: NpyWriter,
+}
+
+
+def open_writer(
+    path: str,
+    value_type: str,
+    append: bool = False,
+    column_types: Optional[Dict[str, str]] = None,
+) -> DatalakeWriter:
+    return WRITERS[get_file_format(path)](
+        path, value_type, append=append, column_types=column_types
+    )
+
+
+class PartitionedWriter(DatalakeWriter):
+    """Writes a directory of files instead of a single one.
+
+    With hive the rows go to asset=/attribute=/date= partitions, leaving
+    asset and attribute out of the files as Hive readers take them from
+    the path. With max_file_size each partition rolls over to a new part
+    file once the current one reaches that size in bytes. Parts are
+    numbered after the ones already in the partition, so appending never
+    overwrites a previous dump.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        value_type: str,
+        file_format: str = "csv",
+        hive: bool = False,
+        max_file_size: Optional[int] = None,
+    ):
+        super().__init__(path, value_type)
+        self._extension = EXTENSIONS[file_format]
+        self._hive = hive
+        self._max_file_size = max_file_size
+        self._partition = None
+        self._writer = None
+        # Fail early on a format whose dependencies are missing
+        get_file_format(f"part{self._extension}")
+
+    def _write(self, dataframe: pd.DataFrame):
+        if not self._hive:
+            self._write_part(self.path, dataframe)
+            return
+        timestamps = pd.to_datetime(dataframe.index, utc=True)
+        keys = [
+            dataframe["asset"].to_numpy(),
+            dataframe["attribute"].to_numpy(),
+            timestamps.strftime("%Y-%m-%d"),
+        ]
+        for (asset, attribute, date), part in dataframe.groupby(
+            keys, sort=False
+        ):
+            partition = os.path.join(
+                self.path,
+                f"asset={quote(str(asset), safe='')}",
+                f"attribute={quote(str(attribute), safe='')}",
+                f"date={date}",
+            )
+            self._write_part(
+                partition, part.drop(columns=["asset", "attribute"])
+            )
+
+    def _write_part(self, partition: str, dataframe: pd.DataFrame):
+        if partition != self._partition:
+            self.close()
+            self._partition = partition
+        if self._writer is None:
+            os.makedirs(partition, exist_ok=True)
+            parts = [
+                name
+                for name in os.listdir(partition)
+                if name.startswith("part-")
+            ]
+            self._writer = open_writer(
+                os.path.join(
+                    partition, f"part-{len(parts):05d}{self._extension}"
+                ),
+                self.value_type,
+            )
+        self._writer.write(dataframe)
+        if (
+            self._max_file_size is not None
+            and os.path.getsize(self._writer.path) >= self._max_file_size
+        ):
+            self.close()
+
+    def flush(self) -> bool:
+        # Parts already closed are complete
+        return self._writer is None or self._writer.flush()
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def open_partitioned_writer(
+    path: str,
+    value_type: str,
+    file_format: str = "csv",
+    hive: bool = False,
+    max_file_size: Optional[int] = None,
+) -> PartitionedWriter:
+    if file_format not in EXTENSIONS:
+        raise UnsupportedFileFormat(
+            path, list(FILE_FORMATS) + CSV_EXTENSIONS[1:]
+        )
+    return PartitionedWriter(
+        path,
+        value_type,
+        file_format=file_format,
+        hive=hive,
+        max_file_size=max_file_size,
+    )
+
+
+def watermark_path(path: str) -> str:
+    return f"{path}.watermark.json"
+
+
+def upload_manifest_path(path: str) -> str:
+    return f"{path}.upload.json"
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "r") as fid:
+        return json.load(fid)
+
+
+def _write_json(path: str, content: Dict[str, Any]):
+    # Replacing the file keeps the previous content if the write fails
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as fid:
+        json.dump(content, fid, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_watermarks(path: str) -> Dict[str, str]:
+    """Reads the last exported timestamp of each series dumped to path."""
+    return _read_json(watermark_path(path))
+
+
+def write_watermarks(path: str, watermarks: Dict[str, str]):
+    _write_json(watermark_path(path), watermarks)
+
+
+def read_upload_manifest(path: str) -> Dict[str, Any]:
+    """Reads the batches of the file in path already saved in the
+    datalake.
+    """
+    return _read_json(upload_manifest_path(path))
+
+
+def write_upload_manifest(path: str, manifest: Dict[str, Any]):
+    _write_json(upload_manifest_path(path), manifest)
+
+
+def read_columns(path: str) -> List[str]:
+    """Reads the column names of a datalake file without its content."""
+    file_format = get_file_format(path)
+    if file_format == CSV_FORMAT:
+        with open_text(path) as source:
+            return list(pd.read_csv(source, nrows=0).columns)
+    if file_format == PARQUET_FORMAT:
+        return pq.read_schema(path).names
+    if file_format == SQLITE_FORMAT:
+        with closing(sqlite3.connect(path)) as connection:
+            return _sqlite_columns(connection)
+    if file_format == ARCHIVE_FORMAT:
+        archive = datalake_archive.Archive(path)
+        return ["timestamp", *archive.columns, "output_format", "value"]
+    if file_format == NPY_FORMAT:
+        metadata = _read_json(npy_metadata_path(path))
+        columns = [
+            column
+            for column in datalake_archive.SERIES_COLUMNS
+            if column in metadata
+        ]
+        return ["timestamp", *columns, "output_format", "value"]
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def _read_typed_csv(
+    path: str,
+    chunksize: Optional[int],
+    skip_rows: int,
+    value_type: str,
+    timestamp_format: Optional[str],
+) -> Iterator[pd.DataFrame]:
+    """Reads a CSV file with the column types of the datalake model instead
+    of inferring them, using the pyarrow streaming reader when available.
+    """
+    if pa is not None:
+        # Timestamps are read as strings, a timestamp column type rejects
+        # the ones without a zone offset
+        column_types = {
+            column: pa.string() for column in (*STRING_COLUMNS, "timestamp")
+        } | {"value": _arrow_value_type(value_type)}
+        with open_binary(path) as source:
+            reader = pa_csv.open_csv(
+                source,
+                read_options=pa_csv.ReadOptions(
+                    skip_rows_after_names=skip_rows
+                ),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=column_types
+                ),
+            )
+            if chunksize is None:
+                yield _typed_frame(reader.read_all(), timestamp_format)
+                return
+            for table in _rebatch(reader, chunksize):
+                yield _typed_frame(table, timestamp_format)
+        return
+
+    # Timestamps are converted after reading, parse_dates in read_csv is
+    # several times slower than to_datetime on the whole column
+    dtypes = {column: object for column in STRING_COLUMNS}
+    dtypes["value"] = VALUE_DTYPES[value_type]
+    with open_text(path) as source:
+        chunks = pd.read_csv(
+            source,
+            dtype=dtypes,
+            skiprows=range(1, skip_rows + 1) if skip_rows else None,
+            chunksize=chunksize,
+        )
+        for chunk in [chunks] if chunksize is None else chunks:
+            chunk["timestamp"] = parse_timestamps(
+                chunk["timestamp"], timestamp_format
+            )
+            yield chunk
+
+
+def parse_timestamps(
+    timestamps: pd.Series, timestamp_format: Optional[str]
+) -> pd.Series:
+    """Parses timestamps as UTC, the ones without a zone offset included."""
+    return pd.to_datetime(
+        timestamps, format=timestamp_format or "ISO8601", utc=True
+    )
+
+
+def _typed_frame(
+    table: "pa.Table", timestamp_format: Optional[str]
+) -> pd.DataFrame:
+    """Converts a table read with string timestamps. ISO 8601 timestamps
+    with a zone offset are parsed by pyarrow, any other ones by pandas.
+    """
+    index = table.schema.get_field_index("timestamp")
+    if timestamp_format is None:
+        try:
+            timestamps = table.column(index).cast(pa.timestamp("ns", tz="UTC"))
+        except pa.ArrowInvalid:
+            pass
+        else:
+            return table.set_column(index, "timestamp", timestamps).to_pandas()
+    dataframe = table.to_pandas()
+    dataframe["timestamp"] = parse_timestamps(
+        dataframe["timestamp"], timestamp_format
+    )
+    return dataframe
+
+
+def _rebatch(
+    reader: "pa.RecordBatchReader", chunksize: int
+) -> Iterator["pa.Table"]:
+    """Groups the record batches of a reader in tables of chunksize rows."""
+    pending = []
+    rows = 0
+    for batch in reader:
+        pending.append(batch)
+        rows += batch.num_rows
+        while rows >= chunksize:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunksize)
+            rest = table.slice(chunksize)
+            pending = rest.to_batches()
+            rows = rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(pending)
+
+
+def _read_sqlite(
+    path: str,
+    chunksize: Optional[int],
+    skip_rows: int,
+    value_type: Optional[str],
+) -> Iterator[pd.DataFrame]:
+    """Reads the datalake table of a SQLite database in index order, with
+    the timestamps and values parsed when a value_type is given.
+    """
+    query = (
+        f"SELECT * FROM {SQLITE_TABLE} "
+        "ORDER BY asset, attribute, timestamp LIMIT -1 OFFSET ?"
+    )
+    with closing(sqlite3.connect(path)) as connection:
+        chunks = pd.read_sql_query(
+            query, connection, params=(skip_rows,), chunksize=chunksize
+        )
+        for chunk in [chunks] if chunksize is None else chunks:
+            if value_type is not None:
+                chunk["timestamp"] = pd.to_datetime(
+                    chunk["timestamp"], format="ISO8601", utc=True
+                )
+                value = chunk["value"]
+                if value_type == "Boolean":
+                    value = value.astype(str).str.lower() == "true"
+                chunk["value"] = value.astype(VALUE_DTYPES[value_type])
+            yield chunk
+
+
+def _read_archive(
+    path: str, chunksize: Optional[int], skip_rows: int
+) -> Iterator[pd.DataFrame]:
+    """Reads the blocks of an archive in batches of chunksize rows,
+    skipping the blocks before skip_rows without decoding them.
+    """
+    archive = datalake_archive.Archive(path)
+    blocks = archive.read(skip_rows=skip_rows)
+    if chunksize is None:
+        blocks = list(blocks)
+        yield (
+            pd.concat(blocks, ignore_index=True) if blocks else archive.empty()
+        )
+        return
+    pending = []
+    rows = 0
+    for block in blocks:
+        pending.append(block)
+        rows += len(block)
+        while rows >= chunksize:
+            merged = pd.concat(pending, ignore_index=True)
+            yield merged.iloc[:chunksize]
+            pending = [merged.iloc[chunksize:].reset_index(drop=True)]
+            rows -= chunksize
+    if rows:
+        yield pd.concat(pending, ignore_index=True)
+
+
+def _read_npy(
+    path: str, chunksize: Optional[int], skip_rows: int
+) -> Iterator[pd.DataFrame]:
+    """Reads a .npy dump memory mapped, in batches of chunksize rows."""
+    with open(path, "rb") as handle:
+        _read_npy_rows(handle, path)
+    records = np.load(path, mmap_mode="r")
+    metadata = _read_json(npy_metadata_path(path))
+    series = {
+        column: metadata[column]
+        for column in datalake_archive.SERIES_COLUMNS
+        if column in metadata
+    }
+    if chunksize is None:
+        starts, step = [skip_rows], len(records)
+    else:
+        starts, step = range(skip_rows, len(records), chunksize), chunksize
+    for start in starts:
+        chunk = records[start : start + step]
+        yield pd.DataFrame(
+            {
+                "timestamp": pd.to_datetime(
+                    chunk["timestamp"], unit="ns", utc=True
+                ),
+                **series,
+                "output_format": metadata.get("output_format", "Number"),
+                "value": np.array(chunk["value"]),
+            }
+        )
+
+
+def read_chunks(
+    path: str,
+    chunksize: Optional[int] = None,
+    skip_rows: int = 0,
+    value_type: Optional[str] = None,
+    timestamp_format: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """Yields the content of a datalake file as dataframes with a timestamp
+    column, in batches of chunksize rows or all at once, starting after the
+    first skip_rows rows.
+
+    CSV columns are parsed with the types of the given datalake model, or
+    inferred when no value_type is given.
+    """
+    file_format = get_file_format(path)
+    if file_format == CSV_FORMAT and value_type is not None:
+        yield from _read_typed_csv(
+            path, chunksize, skip_rows, value_type, timestamp_format
+        )
+    elif file_format == CSV_FORMAT:
+        skiprows = range(1, skip_rows + 1) if skip_rows else None
+        with open_text(path) as source:
+            if chunksize is None:
+                yield pd.read_csv(source, skiprows=skiprows)
+            else:
+                yield from pd.read_csv(
+                    source, chunksize=chunksize, skiprows=skiprows
+                )
+    elif file_format == SQLITE_FORMAT:
+        yield from _read_sqlite(path, chunksize, skip_rows, value_type)
+    elif file_format == ARCHIVE_FORMAT:
+        yield from _read_archive(path, chunksize, skip_rows)
+    elif file_format == NPY_FORMAT:
+        yield from _read_npy(path, chunksize, skip_rows)
+    elif file_format == PARQUET_FORMAT:
+        parquet_file = pq.ParquetFile(path)
+        row_groups = []
+        for index in range(parquet_file.num_row_groups):
+            group_rows = parquet_file.metadata.row_group(index).num_rows
+            if not row_groups and skip_rows >= group_rows:
+                skip_rows -= group_rows
+            else:
+                row_groups.append(index)
+        if chunksize is None:
+            table = parquet_file.read_row_groups(row_groups)
+            yield table.slice(skip_rows).to_pandas()
+        else:
+            for batch in parquet_file.iter_batches(
+                batch_size=chunksize, row_groups=row_groups
+            ):
+                if skip_rows >= batch.num_rows:
+                    skip_rows -= batch.num_rows
+                    continue
+                yield batch.slice(skip_rows).to_pandas()
+                skip_rows = 0
+    else:
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all().slice(skip_rows)
+            if chunksize is None:
+                yield table.to_pandas()
+            else:
+                for batch in table.to_batches(max_chunksize=chunksize):
+                    yield batch.to_pandas()
+
+
+def batch_checksum(dataframe: pd.DataFrame) -> str:
+    hashes = pd.util.hash_pandas_object(dataframe, index=False)
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+
+
+def file_fingerprint(path: str) -> Dict[str, int]:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def read_manifest(path: str) -> List[Dict[str, str]]:
+    """Reads the series listed in a CSV or JSON manifest with asset,
+    attribute and type for each one.
+    """
+    if not os.path.isfile(path):
+        raise InvalidManifest(path, "file not found")
+    if path.lower().endswith(".json"):
+        with open(path, "r") as fid:
+            series = json.load(fid)
+        if not isinstance(series, list):
+            raise InvalidManifest(path, "expected a list of series")
+    else:
+        series = pd.read_csv(path, dtype=str).to_dict("records")
+    for item in series:
+        if not isinstance(item, dict) or not all(
+            isinstance(item.get(key), str) for key in MANIFEST_KEYS
+        ):
+            raise InvalidManifest(
+                path, f"every series needs {', '.join(MANIFEST_KEYS)}"
+            )
+    return [{key: item[key] for key in MANIFEST_KEYS} for item in series]
@@ -0,0 +1,102 @@
+import heapq
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from splight_cli.engine.manager.exceptions import UnsortedFile
+
+KEY_COLUMNS = ["timestamp", "asset", "attribute"]
+
+
+class SortedMerge:
+    """Merges inputs sorted by timestamp into a single sorted stream,
+    dropping the rows whose timestamp, asset and attribute were already
+    seen. When the same point is in many inputs the first one wins.
+
+    Only the current chunk of each input is held in memory. A heap keeps
+    the inputs ordered by the last timestamp of their chunk: every row up
+    to the smallest of them can be emitted, since no input can still hold
+    an earlier one, and the inputs whose chunk ends there are refilled.
+    """
+
+    def __init__(self, sources: List[Tuple[str, Iterator[pd.DataFrame]]]):
+        self._sources = sources
+        self._buffers: Dict[int, pd.DataFrame] = {}
+        self._offsets = [0] * len(sources)
+        self._last: List[Optional[pd.Timestamp]] = [None] * len(sources)
+        self._heap: List[Tuple[pd.Timestamp, int]] = []
+        self._emitted: Optional[pd.Timestamp] = None
+        self._emitted_keys: Set[Tuple[str, str]] = set()
+        self.rows = 0
+        self.duplicates = 0
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        for index in range(len(self._sources)):
+            self._refill(index)
+        while self._heap:
+            bound = self._heap[0][0]
+            pieces = []
+            for index in sorted(self._buffers):
+                buffer = self._buffers[index]
+                end = buffer["timestamp"].searchsorted(bound, side="right")
+                pieces.append(buffer.iloc[:end])
+                self._buffers[index] = buffer.iloc[end:]
+            drained = []
+            while self._heap and self._heap[0][0] == bound:
+                _, index = heapq.heappop(self._heap)
+                del self._buffers[index]
+                drained.append(index)
+            for index in drained:
+                self._refill(index)
+            merged = self._deduplicate(
+                pd.concat(pieces, ignore_index=True).sort_values(
+                    "timestamp", kind="stable", ignore_index=True
+                )
+            )
+            if not merged.empty:
+                self.rows += len(merged)
+                yield merged
+
+    def _refill(self, index: int):
+        path, chunks = self._sources[index]
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            timestamp = chunk["timestamp"]
+            previous = self._last[index]
+            if not timestamp.is_monotonic_increasing or (
+                previous is not None and timestamp.iloc[0] < previous
+            ):
+                unsorted = timestamp.diff().lt(pd.Timedelta(0))
+                row = (
+                    int(unsorted.to_numpy().argmax()) if unsorted.any() else 0
+                )
+                raise UnsortedFile(path, self._offsets[index] + row)
+            self._offsets[index] += len(chunk)
+            self._last[index] = timestamp.iloc[-1]
+            self._buffers[index] = chunk.reset_index(drop=True)
+            heapq.heappush(self._heap, (timestamp.iloc[-1], index))
+            return
+
+    def _deduplicate(self, merged: pd.DataFrame) -> pd.DataFrame:
+        """Drops the repeated points of a merged batch, including the ones
+        already emitted with the last timestamp of the previous batch.
+        """
+        repeated = merged.duplicated(subset=KEY_COLUMNS)
+        if self._emitted_keys:
+            at_emitted = merged.index[merged["timestamp"] == self._emitted]
+            for row in at_emitted:
+                key = (merged.at[row, "asset"], merged.at[row, "attribute"])
+                if key in self._emitted_keys:
+                    repeated.at[row] = True
+        self.duplicates += int(repeated.sum())
+        merged = merged[~repeated].reset_index(drop=True)
+        if not merged.empty:
+            last = merged["timestamp"].iloc[-1]
+            at_last = merged[merged["timestamp"] == last]
+            keys = set(zip(at_last["asset"], at_last["attribute"]))
+            if last == self._emitted:
+                self._emitted_keys |= keys
+            else:
+                self._emitted, self._emitted_keys = last, keys
+        return merged
@@ -0,0 +1,344 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from rich.table import Table
+
+# Intervals between consecutive points are counted in buckets below these
+# upper bounds, the last bucket holds the longer ones
+INTERVAL_BUCKETS = (
+    ("< 1s", pd.Timedelta(seconds=1)),
+    ("< 10s", pd.Timedelta(seconds=10)),
+    ("< 1min", pd.Timedelta(minutes=1)),
+    ("< 10min", pd.Timedelta(minutes=10)),
+    ("< 1h", pd.Timedelta(hours=1)),
+    ("< 6h", pd.Timedelta(hours=6)),
+    ("< 1d", pd.Timedelta(days=1)),
+)
+LAST_BUCKET = ">= 1d"
+# Distinct intervals tracked to find the most frequent one
+TRACKED_INTERVALS = 64
+# Largest gaps listed in the report
+TOP_GAPS = 5
+
+
+def _duration(nanoseconds: Optional[float]) -> Optional[str]:
+    if nanoseconds is None:
+        return None
+    return str(pd.Timedelta(int(round(nanoseconds)), unit="ns"))
+
+
+def _timestamp(nanoseconds: Optional[int]) -> Optional[str]:
+    if nanoseconds is None:
+        return None
+    return pd.Timestamp(nanoseconds, unit="ns", tz="UTC").isoformat()
+
+
+class SeriesProfile:
+    """Data quality statistics of a series, computed over the chunks of a
+    fetch with vectorized operations and constant memory.
+
+    Chunks are expected sorted by timestamp, as fetch yields them. The
+    datalake keeps points ordered by timestamp, so there is no arrival
+    order to check.
+
+    Only a fixed amount of state is kept between chunks: the last point
+    carries the intervals, duplicates and flat runs across chunk borders,
+    moments are merged with Chan's parallel formulas, the most frequent
+    interval is estimated with a Misra-Gries summary and outliers are
+    scored against the previous outlier_window values.
+
+    Gaps are the intervals longer than gap, which defaults to gap_factor
+    times the median interval of the first chunk. Flatlines are runs of
+    at least flatline equal values. Outliers are values more than outlier
+    standard deviations away from the mean of the previous outlier_window
+    values.
+    """
+
+    def __init__(
+        self,
+        gap: Optional[pd.Timedelta] = None,
+        gap_factor: float = 3.0,
+        flatline: int = 10,
+        outlier: float = 4.0,
+        outlier_window: int = 100,
+    ):
+        self._gap = None if gap is None else gap.value
+        self._gap_factor = gap_factor
+        self._flatline = flatline
+        self._outlier = outlier
+        self._outlier_window = outlier_window
+        self._edges = np.array(
+            [bound.value for _, bound in INTERVAL_BUCKETS], dtype=np.int64
+        )
+
+        self.rows = 0
+        self.nulls = 0
+        self.duplicates = 0
+        self.gaps = 0
+        self.flatlines = 0
+        self.outliers = 0
+        self.histogram = np.zeros(len(INTERVAL_BUCKETS) + 1, dtype=np.int64)
+        self._last: Optional[int] = None
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._interval_count = 0
+        self._interval_sum = 0
+        self._intervals: Dict[int, int] = {}
+        # (duration, start) of the largest gaps
+        self._top_gaps: List[Tuple[int, int]] = []
+        # Run of equal values still open at the end of the last chunk
+        self._run: Optional[Tuple[Any, int, int, int]] = None
+        # (length, start, end) of the longest flat run
+        self._longest_run: Optional[Tuple[int, int, int]] = None
+        self._numeric = True
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min: Optional[float] = None
+        self._max: Optional[float] = None
+        self._history = np.empty(0)
+
+    def add(self, dataframe: pd.DataFrame):
+        if dataframe.empty:
+            return
+        timestamps = (
+            pd.to_datetime(dataframe.index, utc=True).as_unit("ns").asi8
+        )
+        values = dataframe["value"]
+        self.rows += len(dataframe)
+        self.nulls += int(values.isna().sum())
+        low, high = int(timestamps.min()), int(timestamps.max())
+        self._start = low if self._start is None else min(self._start, low)
+        self._end = high if self._end is None else max(self._end, high)
+        self._add_intervals(timestamps)
+        self._add_runs(values, timestamps)
+        self._numeric = (
+            self._numeric
+            and pd.api.types.is_numeric_dtype(values)
+            and not pd.api.types.is_bool_dtype(values)
+        )
+        if self._numeric:
+            self._add_moments(values.to_numpy(dtype="float64"))
+        self._last = int(timestamps[-1])
+
+    def _add_intervals(self, timestamps: np.ndarray):
+        if self._last is not None:
+            timestamps = np.concatenate([[self._last], timestamps])
+        deltas = np.diff(timestamps)
+        self.duplicates += int((deltas == 0).sum())
+        positive = deltas > 0
+        intervals = deltas[positive]
+        if not len(intervals):
+            return
+        self._interval_count += len(intervals)
+        self._interval_sum += int(intervals.sum())
+        self.histogram += np.bincount(
+            np.searchsorted(self._edges, intervals, side="right"),
+            minlength=len(self.histogram),
+        )
+
+        # Merged Misra-Gries summaries keep every interval more frequent
+        # than 1 / TRACKED_INTERVALS of the total
+        uniques, counts = np.unique(intervals, return_counts=True)
+        for interval, count in zip(uniques.tolist(), counts.tolist()):
+            self._intervals[interval] = (
+                self._intervals.get(interval, 0) + count
+            )
+        if len(self._intervals) > TRACKED_INTERVALS:
+            threshold = sorted(self._intervals.values(), reverse=True)[
+                TRACKED_INTERVALS
+            ]
+            self._intervals = {
+                interval: count - threshold
+                for interval, count in self._intervals.items()
+                if count > threshold
+            }
+
+        if self._gap is None:
+            self._gap = int(self._gap_factor * np.median(intervals))
+        gaps = intervals > self._gap
+        self.gaps += int(gaps.sum())
+        if gaps.any():
+            starts = timestamps[:-1][positive][gaps]
+            durations = intervals[gaps]
+            largest = np.argsort(durations)[-TOP_GAPS:]
+            self._top_gaps = sorted(
+                self._top_gaps
+                + list(
+                    zip(durations[largest].tolist(), starts[largest].tolist())
+                ),
+                reverse=True,
+            )[:TOP_GAPS]
+
+    def _add_runs(self, values: pd.Series, timestamps: np.ndarray):
+        values = values.reset_index(drop=True)
+        # Nulls are never equal, so they break runs
+        changes = values.ne(values.shift()).fillna(True).to_numpy(dtype=bool)
+        changes[0] = True
+        starts = np.flatnonzero(changes)
+        lengths = np.diff(np.append(starts, len(values)))
+        run_starts = timestamps[starts]
+        run_ends = timestamps[starts + lengths - 1]
+        if self._run is not None:
+            value, length, start, end = self._run
+            if self._same(value, values.iloc[0]):
+                lengths[0] += length
+                run_starts[0] = start
+            else:
+                self._close_run(length, start, end)
+        # Every run but the last one is complete
+        for position in np.flatnonzero(lengths[:-1] >= self._flatline):
+            self._close_run(
+                int(lengths[position]),
+                int(run_starts[position]),
+                int(run_ends[position]),
+            )
+        self._run = (
+            values.iloc[-1],
+            int(lengths[-1]),
+            int(run_starts[-1]),
+            int(run_ends[-1]),
+        )
+
+    @staticmethod
+    def _same(first: Any, second: Any) -> bool:
+        if pd.isna(first) or pd.isna(second):
+            return False
+        return bool(first == second)
+
+    def _close_run(self, length: int, start: int, end: int):
+        if length < self._flatline:
+            return
+        self.flatlines += 1
+        if self._longest_run is None or length > self._longest_run[0]:
+            self._longest_run = (length, start, end)
+
+    def _add_moments(self, values: np.ndarray):
+        history = np.concatenate([self._history, values])
+        # Scores against the previous values only, so an outlier does not
+        # hide itself by raising the deviation of its own window
+        rolling = pd.Series(history).rolling(
+            self._outlier_window, min_periods=self._outlier_window
+        )
+        mean = rolling.mean().shift(1).to_numpy()[len(self._history) :]
+        std = rolling.std().shift(1).to_numpy()[len(self._history) :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.abs(values - mean) / std
+        self.outliers += int(((std > 0) & (scores > self._outlier)).sum())
+        self._history = history[-self._outlier_window :]
+
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        count = len(values)
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = self._count + count
+        delta = mean - self._mean
+        self._mean += delta * count / total
+        self._m2 += m2 + delta**2 * self._count * count / total
+        self._count = total
+        low, high = float(values.min()), float(values.max())
+        self._min = low if self._min is None else min(self._min, low)
+        self._max = high if self._max is None else max(self._max, high)
+
+    def as_dict(self) -> Dict[str, Any]:
+        flatlines, longest = self.flatlines, self._longest_run
+        # The run open at the end of the series is complete
+        if self._run is not None and self._run[1] >= self._flatline:
+            flatlines += 1
+            if longest is None or self._run[1] > longest[0]:
+                longest = self._run[1:]
+        nominal = (
+            max(self._intervals.items(), key=lambda item: item[1])
+            if self._intervals
+            else None
+        )
+        std = (
+            float(np.sqrt(self._m2 / (self._count - 1)))
+            if self._count > 1
+            else None
+        )
+        labels = [label for label, _ in INTERVAL_BUCKETS] + [LAST_BUCKET]
+        return {
+            "rows": self.rows,
+            "nulls": self.nulls,
+            "start": _timestamp(self._start),
+            "end": _timestamp(self._end),
+            "duplicates": self.duplicates,
+            "nominal_interval": _duration(nominal[0] if nominal else None),
+            # A lower bound, the summary undercounts by design
+            "nominal_share": (
+                round(nominal[1] / self._interval_count, 4)
+                if nominal
+                else None
+            ),
+            "sampling_rate_hz": 1e9 / nominal[0] if nominal else None,
+            "mean_interval": _duration(
+                self._interval_sum / self._interval_count
+                if self._interval_count
+                else None
+            ),
+            "intervals": dict(zip(labels, self.histogram.tolist())),
+            "gap_threshold": _duration(self._gap),
+            "gaps": self.gaps,
+            "largest_gaps": [
+                {"start": _timestamp(start), "duration": _duration(duration)}
+                for duration, start in self._top_gaps
+            ],
+            "flatlines": flatlines,
+            "longest_flatline": (
+                {
+                    "points": longest[0],
+                    "start": _timestamp(longest[1]),
+                    "end": _timestamp(longest[2]),
+                }
+                if longest
+                else None
+            ),
+            "outliers": self.outliers if self._numeric else None,
+            "min": self._min,
+            "max": self._max,
+            "mean": self._mean if self._count else None,
+            "std": std,
+        }
+
+    def as_tables(self, title: str) -> List[Table]:
+        report = self.as_dict()
+        summary = Table(title=f"{title}: {self.rows} points")
+        summary.add_column("Statistic")
+        summary.add_column("Value", justify="right")
+        warnings = {"nulls", "duplicates", "gaps", "outliers"}
+        for key, value in report.items():
+            if key in ("intervals", "largest_gaps", "longest_flatline"):
+                continue
+            if key == "flatlines" and report["longest_flatline"]:
+                longest = report["longest_flatline"]
+                value = (
+                    f"{value}, longest {longest['points']} points from "
+                    f"{longest['start']}"
+                )
+            summary.add_row(
+                key.replace("_", " "),
+                "-" if value is None else str(value),
+                style="yellow" if key in warnings and value else None,
+            )
+
+        intervals = Table(title="Intervals between points")
+        intervals.add_column("Interval")
+        intervals.add_column("Count", justify="right")
+        intervals.add_column("")
+        largest = max(report["intervals"].values()) or 1
+        for label, count in report["intervals"].items():
+            intervals.add_row(label, str(count), "#" * (30 * count // largest))
+
+        gaps = Table(title=f"Largest gaps over {report['gap_threshold']}")
+        gaps.add_column("Start")
+        gaps.add_column("Duration", justify="right")
+        for gap in report["largest_gaps"]:
+            gaps.add_row(gap["start"], gap["duration"])
+        tables = [summary, intervals]
+        if report["gaps"]:
+            tables.append(gaps)
+        return tables
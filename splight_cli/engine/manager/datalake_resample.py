@@ -0,0 +1,149 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+AGGREGATIONS = ("mean", "min", "max", "last", "count")
+# Aggregations that make sense for String and Boolean values
+NON_NUMERIC_AGGREGATIONS = ("last", "count")
+# Group accumulators of the datalake pipeline, last is left out since the
+# order of the points reaching the group stage is not guaranteed
+SERVER_ACCUMULATORS = {
+    "mean": {"$avg": "$value"},
+    "min": {"$min": "$value"},
+    "max": {"$max": "$value"},
+    "count": {"$sum": 1},
+}
+# Intervals are counted from this instant both in the datalake and by the
+# Resampler, so the two paths bin points alike. $dateTrunc is not used as
+# it counts bins from 2000-01-01, which multi-day intervals don't divide
+ANCHOR = pd.Timestamp("1970-01-01", tz="UTC")
+MILLISECOND = pd.Timedelta(milliseconds=1)
+GROUP_COLUMNS = ["asset", "attribute"]
+
+
+def column_name(aggregation: str, aggregations: List[str]) -> str:
+    """Returns the column of an aggregation in the resampled dataframe.
+
+    The value column keeps its name when it is aggregated in one way, so
+    the file can be loaded back to the datalake.
+    """
+    if aggregation == "count":
+        return "count"
+    values = [item for item in aggregations if item != "count"]
+    return "value" if len(values) == 1 else f"value_{aggregation}"
+
+
+def bin_starts(
+    index: pd.DatetimeIndex,
+    interval: pd.Timedelta,
+    anchor: pd.Timestamp = ANCHOR,
+) -> pd.DatetimeIndex:
+    """Returns the start of the interval of each timestamp, counting the
+    intervals from anchor.
+    """
+    return anchor + ((index - anchor) // interval) * interval
+
+
+def server_pipeline(
+    interval: pd.Timedelta,
+    aggregation: str,
+    anchor: pd.Timestamp = ANCHOR,
+) -> Optional[List[Dict[str, Any]]]:
+    """Returns the pipeline steps that aggregate the points of a series in
+    the datalake in intervals counted from anchor, or None if the
+    aggregation can not be done there.
+    """
+    if aggregation not in SERVER_ACCUMULATORS:
+        return None
+    # The datalake stores timestamps in milliseconds
+    if interval % MILLISECOND != pd.Timedelta(0):
+        return None
+    size = interval // MILLISECOND
+    origin = (anchor - pd.Timestamp(0, tz="UTC")) // MILLISECOND
+    # Points before the anchor would be binned to the interval after them
+    offset = {"$subtract": [{"$toLong": "$timestamp"}, origin]}
+    return [
+        {
+            "$addFields": {
+                "timestamp": {
+                    "$toDate": {
+                        "$add": [
+                            origin,
+                            {"$subtract": [offset, {"$mod": [offset, size]}]},
+                        ]
+                    }
+                }
+            }
+        },
+        {
+            "$group": {
+                "_id": "$timestamp",
+                "value": SERVER_ACCUMULATORS[aggregation],
+                "timestamp": {"$first": "$timestamp"},
+            }
+        },
+    ]
+
+
+class Resampler:
+    """Aggregates the points of chunks sorted by timestamp in fixed
+    intervals counted from anchor, as the datalake does.
+
+    The points of the last interval of a chunk are held back until a
+    later chunk starts a new interval, so an interval split across chunks
+    is aggregated as a whole. Call flush after the last chunk.
+    """
+
+    def __init__(
+        self,
+        interval: pd.Timedelta,
+        aggregations: List[str],
+        anchor: pd.Timestamp = ANCHOR,
+    ):
+        self._interval = interval
+        self._anchor = anchor
+        self._aggregations = aggregations
+        self._columns = {
+            aggregation: column_name(aggregation, aggregations)
+            for aggregation in aggregations
+        }
+        self._carry: Optional[pd.DataFrame] = None
+
+    def feed(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        """Returns the aggregates of the intervals completed by the chunk."""
+        if dataframe.empty:
+            return self._aggregate(None)
+        if self._carry is not None:
+            dataframe = pd.concat([self._carry, dataframe])
+        bins = bin_starts(dataframe.index, self._interval, self._anchor)
+        last = bins == bins[-1]
+        self._carry = dataframe[last]
+        return self._aggregate(dataframe[~last])
+
+    def flush(self) -> pd.DataFrame:
+        """Returns the aggregates of the interval held back."""
+        carry, self._carry = self._carry, None
+        return self._aggregate(carry)
+
+    def resample(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        for dataframe in chunks:
+            yield self.feed(dataframe)
+        yield self.flush()
+
+    def _aggregate(self, dataframe: Optional[pd.DataFrame]) -> pd.DataFrame:
+        if dataframe is None or dataframe.empty:
+            return pd.DataFrame()
+        keys = [
+            bin_starts(dataframe.index, self._interval, self._anchor).rename(
+                "timestamp"
+            ),
+            *(dataframe[column] for column in GROUP_COLUMNS),
+        ]
+        grouped = dataframe.groupby(keys, sort=True)
+        result = grouped["value"].agg(self._aggregations)
+        result = result.rename(columns=self._columns)
+        if "output_format" in dataframe.columns:
+            result["output_format"] = grouped["output_format"].first()
+        return result.reset_index(GROUP_COLUMNS)
@@ -0,0 +1,60 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_MODES = ("reservoir", "stratified")
+
+
+class Reservoir:
+    """Uniform sample without replacement of the rows of a stream of
+    chunks.
+
+    Every row gets a random key and the reservoir keeps the rows with the
+    smallest keys, which is a uniform sample of the rows seen so far. Only
+    the reservoir and the current chunk are held in memory.
+    """
+
+    def __init__(self, size: int, seed: Optional[int] = None):
+        self._size = size
+        self._rng = np.random.default_rng(seed)
+        self._rows: Optional[pd.DataFrame] = None
+        self._keys = np.empty(0)
+        self.seen = 0
+
+    def add(self, dataframe: pd.DataFrame):
+        if dataframe.empty:
+            return
+        self.seen += len(dataframe)
+        keys = self._rng.random(len(dataframe))
+        if self._rows is None:
+            rows, all_keys = dataframe, keys
+        else:
+            rows = pd.concat([self._rows, dataframe])
+            all_keys = np.concatenate([self._keys, keys])
+        if len(rows) > self._size:
+            keep = np.argpartition(all_keys, self._size - 1)[: self._size]
+            rows, all_keys = rows.iloc[keep], all_keys[keep]
+        self._rows, self._keys = rows, all_keys
+
+    def sample(self) -> pd.DataFrame:
+        if self._rows is None:
+            return pd.DataFrame()
+        return self._rows.sort_index(kind="stable")
+
+
+def strata(
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    size: int,
+    seed: Optional[int] = None,
+) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """Splits the range in size strata of the same duration and returns,
+    for each one, its start and a random instant inside it.
+    """
+    rng = np.random.default_rng(seed)
+    width = (end - start) / size
+    return [
+        (start + width * index, start + width * (index + offset))
+        for index, offset in enumerate(rng.random(size))
+    ]
@@ -0,0 +1,114 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Condition
+from typing import Callable, Iterable, Iterator, Optional, Tuple, Union
+
+import pandas as pd
+from splight_lib.settings import DatalakeClientType, datalake_settings
+
+from splight_cli.engine.manager.exceptions import UploadError
+
+# Batches are identified by their row offset, along with their file when
+# uploading many files
+BatchKey = Union[int, Tuple[str, int]]
+Batch = Tuple[BatchKey, pd.DataFrame]
+
+
+@contextmanager
+def sync_datalake_client() -> Iterator[None]:
+    """Makes the models save through a sync datalake client.
+
+    The default buffered client queues the records and sends them from a
+    background thread that only logs its errors, so a save would return
+    before the records are stored and failures could not be retried nor
+    kept out of the upload manifest.
+    """
+    client_type = datalake_settings.DL_CLIENT_TYPE
+    datalake_settings.DL_CLIENT_TYPE = DatalakeClientType.SYNC
+    try:
+        yield
+    finally:
+        datalake_settings.DL_CLIENT_TYPE = client_type
+
+
+class AdaptiveUploader:
+    """Uploads batches with a pool of workers whose concurrency adapts in
+    AIMD fashion: the number of batches in flight grows by one after a
+    window of successful uploads and is halved on every failed attempt.
+
+    Failed attempts are retried with jittered exponential backoff. Once a
+    batch runs out of retries no new batches are submitted and the error
+    is raised after the batches in flight finish.
+    """
+
+    def __init__(
+        self,
+        save: Callable[[pd.DataFrame], None],
+        max_workers: int,
+        on_commit: Optional[Callable[[BatchKey, pd.DataFrame], None]] = None,
+        retries: int = 4,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        self._save = save
+        self._max_workers = max_workers
+        self._on_commit = on_commit
+        self._retries = retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._condition = Condition()
+        self._in_flight = 0
+        self._error = None
+        self.limit = 1.0
+
+    def upload(self, batches: Iterable[Batch]):
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for offset, dataframe in batches:
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._error is not None
+                        or self._in_flight < int(self.limit)
+                    )
+                    if self._error is not None:
+                        break
+                    self._in_flight += 1
+                executor.submit(self._upload, offset, dataframe)
+        if self._error is not None:
+            key, error = self._error
+            if isinstance(key, tuple):
+                path, offset = key
+                raise UploadError(offset, error, path=path)
+            raise UploadError(key, error)
+
+    def _upload(self, offset: BatchKey, dataframe: pd.DataFrame):
+        for attempt in range(self._retries + 1):
+            try:
+                self._save(dataframe)
+            except Exception as exc:
+                with self._condition:
+                    self.limit = max(1.0, self.limit / 2)
+                if attempt == self._retries:
+                    with self._condition:
+                        self._error = self._error or (offset, exc)
+                        self._in_flight -= 1
+                        self._condition.notify_all()
+                    return
+                delay = min(self._backoff * 2**attempt, self._max_backoff)
+                time.sleep(delay * random.uniform(0.5, 1.5))
+            else:
+                break
+
+        with self._condition:
+            self.limit = min(
+                float(self._max_workers), self.limit + 1 / self.limit
+            )
+            try:
+                if self._on_commit is not None:
+                    self._on_commit(offset, dataframe)
+            except Exception as exc:
+                self._error = self._error or (offset, exc)
+            finally:
+                self._in_flight -= 1
+                self._condition.notify_all()
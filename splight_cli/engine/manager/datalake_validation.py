@@ -0,0 +1,74 @@
+from typing import Dict
+
+import pandas as pd
+from rich.table import Table
+
+from splight_cli.constants import REQUIRED_DATALAKE_COLUMNS
+
+BOOLEAN_VALUES = {"true", "false"}
+
+
+def check_batch(dataframe: pd.DataFrame, value_type: str) -> Dict[str, int]:
+    """Counts the rows of a batch that would be rejected by the datalake,
+    grouped by issue.
+    """
+    issues = {
+        f"null {column}": int(dataframe[column].isna().sum())
+        for column in sorted(REQUIRED_DATALAKE_COLUMNS)
+    }
+
+    timestamp = dataframe["timestamp"]
+    if pd.api.types.is_datetime64_any_dtype(timestamp):
+        issues["unparsable timestamp"] = 0
+    else:
+        parsed = pd.to_datetime(timestamp, errors="coerce", utc=True)
+        issues["unparsable timestamp"] = int(
+            (parsed.isna() & timestamp.notna()).sum()
+        )
+
+    value = dataframe["value"]
+    if value_type == "Number" and not pd.api.types.is_numeric_dtype(value):
+        invalid = pd.to_numeric(value, errors="coerce").isna() & value.notna()
+    elif value_type == "Boolean" and not pd.api.types.is_bool_dtype(value):
+        invalid = value.notna() & ~value.astype(str).str.lower().isin(
+            BOOLEAN_VALUES
+        )
+    else:
+        invalid = pd.Series(False, index=value.index)
+    issues[f"non {value_type} value"] = int(invalid.sum())
+
+    output_format = dataframe["output_format"]
+    issues["other output_format"] = int(
+        (output_format.notna() & (output_format != value_type)).sum()
+    )
+    return issues
+
+
+class ValidationReport:
+    """Accumulates the issues found in the batches of a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self.batches = 0
+        self.issues: Dict[str, int] = {}
+
+    def add(self, rows: int, issues: Dict[str, int]):
+        self.rows += rows
+        self.batches += 1
+        for issue, count in issues.items():
+            self.issues[issue] = self.issues.get(issue, 0) + count
+
+    @property
+    def valid(self) -> bool:
+        return not any(self.issues.values())
+
+    def as_table(self) -> Table:
+        table = Table(
+            title=f"{self.path}: {self.rows} rows in {self.batches} batches"
+        )
+        table.add_column("Check")
+        table.add_column("Invalid rows", justify="right")
+        for issue, count in self.issues.items():
+            table.add_row(issue, str(count), style="red" if count else None)
+        return table
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, List
 
 
 class InvalidComponentId(Exception):
@@ -55,3 +55,140 @@ class HubComponentNotFound(Exception):
 
     def __str__(self) -> str:
         return self._msg
+
+
+class UnsupportedFileFormat(Exception):
+    """Exception raised when a datalake file has an unknown extension."""
+
+    def __init__(
+        self, path: str, extensions: List[str], operation: str = "datalake"
+    ):
+        self._msg = (
+            f"File {path} has an unsupported format for {operation}. "
+            f"Supported extensions are {', '.join(extensions)}."
+        )
+
+    def __str__(self) -> str:
+        return self._msg
+
+
+class MissingDependency(Exception):
+    """Exception raised when an optional dependency is not installed."""
+
+    def __init__(self, package: str, feature: str, extra: str = None):
+        requirement = package if extra is None else f"splight-cli[{extra}]"
+        self._msg = (
+            f"Package {package} is required for {feature} support. "
+            f"Install it with 'pip install {requirement}'."
+        )
+
+    def __str__(self) -> str:
+        return self._msg
+
+
+class InvalidManifest(Exception):
+    """Exception raised when a manifest of datalake series is invalid."""
+
+    def __init__(self, path: str, reason: str):
+        self._msg = f"Invalid manifest {path}: {reason}."
+
+    def __str__(self) -> str:
+        return self._msg
+
+
+class InvalidWorkspace(Exception):
+    """Exception raised when the datalake of a workspace is unreachable."""
+
+    def __init__(self, name: str, reason: str):
+        self._msg = f"Invalid workspace {name}: {reason}."
+
+    def __str__(self) -> str:
+        return self._msg
+
+
+class UploadError(Exception):
+    """Exception raised when a batch could not be saved in the datalake."""
+
+    def __init__(self, offset: int, error: Exception, path: str = None):
+        location = f" of {path}" if path else ""
+        self._msg = (
+            f"Failed to save the batch at row {offset}{location}: {error}"
+        )
+
+    def __str__(self) -> str:
+        return self._msg
+
+
+class UnsortedFile(Exception):
+    """Exception raised when a file to merge is not sorted by timestamp."""
+
+    def __init__(self, path: str, row: int):
+        self._msg = (
+            f"File {path} is not sorted by timestamp at row {row}, only "
+            "sorted files can be merged."
+        )
+
+    def __str__(self) -> str:
+        return self._msg
+
+
+class ChangedFile(Exception):
+    """Exception raised when a file changed since its interrupted load."""
+
+    def __init__(self, path: str, reason: str):
+        self._msg = (
+            f"File {path} changed since the interrupted load: {reason}."
+        )
+
+    def __str__(self) -> str:
+        return self._msg
+
+
+class InvalidDatalakeFile(Exception):
+    """Exception raised when a datalake file can not be read or written."""
+
+    kind = "file"
+
+    def __init__(self, path: str, reason: str):
+        self._msg = f"Invalid {self.kind} {path}: {reason}."
+
+    def __str__(self) -> str:
+        return self._msg
+
+
+class InvalidArchive(InvalidDatalakeFile):
+    """Exception raised when a datalake archive can not be read or
+    written.
+    """
+
+    kind = "archive"
+
+
+class InvalidArrayFile(InvalidDatalakeFile):
+    """Exception raised when a .npy dump can not be read or written."""
+
+    kind = "array file"
+
+
+class InvalidDumpOptions(Exception):
+    """Exception raised when the options of a dump can not be combined."""
+
+    def __init__(self, reason: str):
+        self._msg = f"Invalid dump options: {reason}."
+
+    def __str__(self) -> str:
+        return self._msg
+
+
+class ExistingOutput(Exception):
+    """Exception raised when a dump would overwrite a previous one."""
+
+    def __init__(self, path: str, directory: bool = False):
+        self._msg = (
+            f"Directory {path} is not empty."
+            if directory
+            else f"File {path} already exists."
+        )
+
+    def __str__(self) -> str:
+        return self._msg
@@ -1,12 +1,35 @@
 import json
+import multiprocessing
 import os
 import shutil
-from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional, Type, Union
+import time
+from collections import deque
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from itertools import islice
+from threading import Lock
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 import pandas as pd
 from pydantic import BaseModel
 from rich.console import Console
+from rich.markup import escape
 from rich.table import Table
 from splight_lib.models import (
     Component,
@@ -21,24 +44,87 @@ from splight_lib.models import (
     SplightDatabaseBaseModel,
     SplightDatalakeBaseModel,
 )
+from splight_lib.settings import workspace_settings
 
 from splight_cli.component.exceptions import InvalidCSVColumns
 from splight_cli.constants import (
+    DATALAKE_CACHE_PATH,
+    DATALAKE_PAGE_SIZE,
     REQUIRED_DATALAKE_COLUMNS,
+    error_style,
     success_style,
     warning_style,
 )
+from splight_cli.engine.manager import datalake_io
+from splight_cli.engine.manager.datalake_cache import DatalakeCache
+from splight_cli.engine.manager.datalake_copy import (
+    WorkspaceDatalake,
+    prefetch,
+    read_remap,
+)
+from splight_cli.engine.manager.datalake_dump import DumpOptions, dump_path
+from splight_cli.engine.manager.datalake_ingest import (
+    BatchRange,
+    LoadReport,
+    ParsedFile,
+    committed_batches,
+    is_committed,
+    parse_file,
+    resume_offset,
+)
+from splight_cli.engine.manager.datalake_merge import SortedMerge
+from splight_cli.engine.manager.datalake_profile import SeriesProfile
+from splight_cli.engine.manager.datalake_resample import (
+    AGGREGATIONS,
+    NON_NUMERIC_AGGREGATIONS,
+    Resampler,
+    column_name,
+    server_pipeline,
+)
+from splight_cli.engine.manager.datalake_sample import Reservoir, strata
+from splight_cli.engine.manager.datalake_upload import (
+    AdaptiveUploader,
+    sync_datalake_client,
+)
+from splight_cli.engine.manager.datalake_validation import (
+    ValidationReport,
+    check_batch,
+)
 from splight_cli.engine.manager.exceptions import (
+    ChangedFile,
     ComponentCreateError,
+    ExistingOutput,
     HubComponentNotFound,
     InvalidComponentId,
+    InvalidDatalakeFile,
+    InvalidDumpOptions,
+    InvalidManifest,
+    InvalidWorkspace,
+    MissingDependency,
+    UnsortedFile,
+    UnsupportedFileFormat,
     UpdateParametersError,
+    UploadError,
     VersionUpdateError,
 )
 from splight_cli.utils.input import prompt_data_address_value, prompt_param
 
 SplightModel = Type[SplightDatabaseBaseModel]
 
+# Legacy range filters accepted in place of the datalake ones
+TIMESTAMP_FILTER_ALIASES = {
+    "timestamp__gte": "from_timestamp",
+    "timestamp__lte": "to_timestamp",
+}
+# Keep only the newest or oldest point in the datalake, which ignores
+# limits
+LAST_POINT_PIPELINE = [{"$sort": {"timestamp": -1}}, {"$limit": 1}]
+FIRST_POINT_PIPELINE = [{"$sort": {"timestamp": 1}}, {"$limit": 1}]
+# Fraction of the probed page span used as shard size
+SHARD_PAGE_FILL = 0.8
+TAIL_OUTPUTS = ("table", "ndjson")
+PROFILE_OUTPUTS = ("table", "json")
+
 
 class ResourceManagerException(Exception):
     pass
@@ -167,40 +253,1267 @@ class DatalakeManager:
     def __init__(
         self,
         model: SplightDatalakeBaseModel,
+        datalake: Optional[WorkspaceDatalake] = None,
     ):
         self._model = model
+        # Datalake of another workspace, the current one when missing
+        self._datalake = datalake
         self._console = Console()
 
-    def dump(self, path, filters):
-        if os.path.exists(path):
-            raise Exception(f"File {path} already exists")
-        if os.path.isdir(path):
-            path = os.path.join(path, "splight_dump.csv")
-        elif not path.endswith(".csv"):
-            raise Exception("Only CSV files are supported")
-
-        dataframe = self._model.get_dataframe(**self._get_filters(filters))
-        dataframe.to_csv(path)
+    def dump(
+        self,
+        path: str,
+        filters: Dict[str, str],
+        options: DumpOptions = DumpOptions(),
+    ):
+        """Writes the points matching the filters to path, read and written
+        as set in options.
+        """
+        try:
+            options.check()
+            path = dump_path(path, options)
+        except (InvalidDumpOptions, ExistingOutput) as exc:
+            raise DatalakeManagerException(str(exc))
+        interval, aggregations = None, None
+        if options.resample is not None:
+            interval = self._to_timedelta(options.resample)
+            aggregations = self._check_aggregations(
+                options.aggregations or ["mean"],
+                interval,
+                options.server_side,
+            )
+
+        append = options.incremental and os.path.exists(path)
+        filters = filters.copy()
+        watermark_key = f"{filters.get('asset')}/{filters.get('attribute')}"
+        watermarks = (
+            datalake_io.read_watermarks(path) if options.incremental else {}
+        )
+        watermark = None
+        if append:
+            if watermark_key not in watermarks:
+                raise DatalakeManagerException(
+                    f"No watermark for {watermark_key} found next to {path}"
+                )
+            watermark = self._to_utc(watermarks[watermark_key])
+            start = self._get_filters(filters).get("from_timestamp")
+            if start is None or self._to_utc(start) < watermark:
+                filters["from_timestamp"] = watermark.to_pydatetime()
+
+        writer, cache = self._open_dump(path, options, append)
+        frames = self._dump_frames(
+            filters, options, interval, aggregations, cache
+        )
+        with writer:
+            for dataframe in frames:
+                if dataframe.empty:
+                    continue
+                timestamps = pd.to_datetime(dataframe.index, utc=True)
+                if watermark is not None:
+                    dataframe = dataframe[timestamps > watermark]
+                    timestamps = timestamps[timestamps > watermark]
+                    if dataframe.empty:
+                        continue
+                try:
+                    writer.write(dataframe)
+                except InvalidDatalakeFile as exc:
+                    # Archives and arrays only take Number points
+                    raise DatalakeManagerException(str(exc))
+                if options.incremental:
+                    watermarks[watermark_key] = timestamps.max().isoformat()
+                    # Only once the rows can not be lost, or a resumed
+                    # dump would skip them
+                    if writer.flush():
+                        datalake_io.write_watermarks(path, watermarks)
+                if options.chunked:
+                    self._console.print(
+                        f"Dumped {writer.rows} rows up to "
+                        f"{dataframe.index.max()}"
+                    )
+        if options.incremental and writer.rows:
+            # Buffering writers only hold all the rows once closed
+            datalake_io.write_watermarks(path, watermarks)
+        if append and writer.rows == 0:
+            self._console.print(
+                f"No new points since {watermark}", style=warning_style
+            )
+            return
         self._console.print(
             f"Succesfully dumpped {self._model.__name__}'s in {path}",
             style=success_style,
         )
 
-    def load(self, path: str):
-        if not os.path.isfile(path):
-            raise Exception("File not found")
-        if not path.endswith(".csv"):
-            raise Exception("Only CSV files are supported")
+    def _open_dump(
+        self, path: str, options: DumpOptions, append: bool
+    ) -> Tuple[datalake_io.DatalakeWriter, Optional[DatalakeCache]]:
+        """Returns the writer of a dump and the cache it reads through."""
+        try:
+            if options.partitioned:
+                writer = datalake_io.open_partitioned_writer(
+                    path,
+                    self._model.__name__,
+                    file_format=options.file_format,
+                    hive=options.hive,
+                    max_file_size=options.max_file_size,
+                )
+            else:
+                writer = datalake_io.open_writer(
+                    path, self._model.__name__, append=append
+                )
+            cache = None
+            if options.cache_size is not None:
+                cache = DatalakeCache(
+                    DATALAKE_CACHE_PATH,
+                    workspace=(
+                        f"{workspace_settings.SPLIGHT_PLATFORM_API_HOST}|"
+                        f"{workspace_settings.SPLIGHT_ACCESS_ID}"
+                    ),
+                    max_size=options.cache_size,
+                )
+        except (
+            UnsupportedFileFormat,
+            MissingDependency,
+            InvalidDatalakeFile,
+        ) as exc:
+            raise DatalakeManagerException(str(exc))
+        return writer, cache
+
+    def _dump_frames(
+        self,
+        filters: Dict[str, str],
+        options: DumpOptions,
+        interval: Optional[pd.Timedelta],
+        aggregations: Optional[List[str]],
+        cache: Optional[DatalakeCache],
+    ) -> Iterable[pd.DataFrame]:
+        """Returns the chunks of a dump: a sample, the aggregates computed
+        by the datalake or the fetched points, resampled if asked to.
+        """
+        if options.sample is not None:
+            return [
+                self._sample(
+                    filters,
+                    options.sample,
+                    options.sample_mode,
+                    options.window,
+                    options.parallel,
+                    cache,
+                    options.seed,
+                )
+            ]
+        if options.server_side:
+            return self._fetch_aggregated(filters, interval, aggregations)
+        frames = self.fetch(
+            filters,
+            window=options.window,
+            parallel=options.parallel,
+            cache=cache,
+        )
+        if interval is not None:
+            frames = Resampler(interval, aggregations).resample(frames)
+        return frames
 
-        dataframe = pd.read_csv(path)
-        self._validate_csv(dataframe)
-        dataframe = dataframe.set_index("timestamp")
-        self._model.save_dataframe(dataframe)
+    def _sample(
+        self,
+        filters: Dict[str, str],
+        size: int,
+        mode: str,
+        window: Optional[str],
+        parallel: int,
+        cache: Optional[DatalakeCache],
+        seed: Optional[int],
+    ) -> pd.DataFrame:
+        """Returns a sample of the points in the filtered range.
+
+        A reservoir sample is uniform over the points but streams through
+        all of them. A stratified sample probes one point per sub-range of
+        the same duration: the last one at or before a random instant of
+        the sub-range, so it costs one small query per point and samples
+        uniformly in time rather than over the points.
+        """
+        if mode == "reservoir":
+            reservoir = Reservoir(size, seed=seed)
+            for dataframe in self.fetch(
+                filters, window=window, parallel=parallel, cache=cache
+            ):
+                reservoir.add(dataframe)
+            self._console.print(
+                f"Sampled {min(size, reservoir.seen)} of {reservoir.seen} "
+                "points"
+            )
+            return reservoir.sample()
+
+        filters = self._get_filters(filters)
+        start, end = self._pop_time_range(filters)
+
+        def probe(bounds):
+            return self._get_last_point(*bounds, filters)
+
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            probes = [
+                dataframe
+                for dataframe in executor.map(
+                    probe, strata(start, end, size, seed=seed)
+                )
+                if not dataframe.empty
+            ]
+        if not probes:
+            return pd.DataFrame()
+        return pd.concat(probes).sort_index()
+
+    def profile(
+        self,
+        filters: Dict[str, str],
+        window: Optional[str] = None,
+        parallel: int = 1,
+        gap: Optional[str] = None,
+        flatline: int = 10,
+        outlier: float = 4.0,
+        outlier_window: int = 100,
+        output: str = "table",
+    ) -> Dict[str, Any]:
+        """Prints data quality statistics of the filtered series, computed
+        chunk by chunk as it is fetched so the series is never held in
+        memory as a whole, and returns them.
+        """
+        if output not in PROFILE_OUTPUTS:
+            raise DatalakeManagerException(
+                f"Output {output} not supported, use one of "
+                f"{', '.join(PROFILE_OUTPUTS)}"
+            )
+        if flatline < 2 or outlier <= 0 or outlier_window < 2:
+            raise DatalakeManagerException(
+                "Flatlines need at least 2 points, outliers a positive "
+                "threshold and a window of at least 2 points"
+            )
+        profile = SeriesProfile(
+            gap=None if gap is None else self._to_timedelta(gap),
+            flatline=flatline,
+            outlier=outlier,
+            outlier_window=outlier_window,
+        )
+        for dataframe in self.fetch(filters, window=window, parallel=parallel):
+            profile.add(dataframe)
+            if window is not None or parallel > 1:
+                self._console.print(
+                    f"Profiled {profile.rows} points up to "
+                    f"{dataframe.index.max()}"
+                )
+        report = profile.as_dict()
+        if output == "json":
+            self._console.print(
+                json.dumps(report),
+                markup=False,
+                highlight=False,
+                soft_wrap=True,
+            )
+        else:
+            name = f"{filters.get('asset')}/{filters.get('attribute')}"
+            for table in profile.as_tables(name):
+                self._console.print(table)
+        return report
+
+    def copy(
+        self,
+        target: str,
+        filters: Dict[str, str],
+        source: Optional[str] = None,
+        window: Optional[str] = None,
+        parallel: int = 1,
+        workers: int = 4,
+        queue_size: int = 8,
+        remap: Optional[str] = None,
+    ) -> int:
+        """Copies the filtered series from the source workspace, the
+        current one by default, to the target one and returns the number
+        of points copied.
+
+        Pages are fetched by a reader thread into a queue of at most
+        queue_size batches while workers save the previous ones, so
+        reading overlaps with writing and nothing is written to disk.
+        Asset and attribute IDs found in the remap table are replaced by
+        their target IDs.
+        """
+        if workers <= 0 or queue_size <= 0:
+            raise DatalakeManagerException(
+                "Number of workers and queue size must be positive"
+            )
+        try:
+            ids = {} if remap is None else read_remap(remap)
+            reader = DatalakeManager(
+                self._model,
+                datalake=(
+                    self._datalake
+                    if source is None
+                    else WorkspaceDatalake.from_workspace(source)
+                ),
+            )
+            writer = DatalakeManager(
+                self._model, datalake=WorkspaceDatalake.from_workspace(target)
+            )
+        except (InvalidManifest, InvalidWorkspace) as exc:
+            raise DatalakeManagerException(str(exc))
+
+        def batches() -> Iterator[Tuple[int, pd.DataFrame]]:
+            offset = 0
+            for dataframe in reader.fetch(filters, window, parallel):
+                dataframe = dataframe.rename_axis("timestamp").reset_index()
+                if ids:
+                    columns = ["asset", "attribute"]
+                    dataframe[columns] = dataframe[columns].replace(ids)
+                # Shards denser than expected hold more than a page
+                for start in range(0, len(dataframe), DATALAKE_PAGE_SIZE):
+                    batch = dataframe.iloc[start : start + DATALAKE_PAGE_SIZE]
+                    yield offset, batch
+                    offset += len(batch)
+
+        started = time.monotonic()
+        copied = 0
+
+        def commit(offset: int, dataframe: pd.DataFrame):
+            nonlocal copied
+            copied += len(dataframe)
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self._console.print(
+                f"Copied {copied} rows ({copied / elapsed:.0f} rows/s) with "
+                f"{int(uploader.limit)} uploads in flight"
+            )
+
+        uploader = AdaptiveUploader(
+            writer._save_batch, max_workers=workers, on_commit=commit
+        )
+        try:
+            uploader.upload(prefetch(batches(), queue_size))
+        except UploadError as exc:
+            raise DatalakeManagerException(str(exc))
+        self._console.print(
+            f"Succesfully copied {copied} rows to workspace {target}",
+            style=success_style,
+        )
+        return copied
+
+    def tail(
+        self,
+        filters: Dict[str, str],
+        since: Optional[str] = None,
+        interval: float = 1.0,
+        max_interval: float = 60.0,
+        output: str = "table",
+        max_polls: Optional[int] = None,
+    ):
+        """Polls the series for points newer than a watermark and prints
+        only the new ones.
+
+        Each poll fetches every point since the watermark, paging only if
+        they do not fit in a page. The wait between polls doubles after
+        each poll without new points, up to max_interval, and goes back to
+        interval once new points arrive.
+        """
+        if output not in TAIL_OUTPUTS:
+            raise DatalakeManagerException(
+                f"Output {output} not supported, use one of "
+                f"{', '.join(TAIL_OUTPUTS)}"
+            )
+        if interval <= 0 or max_interval < interval:
+            raise DatalakeManagerException(
+                "Poll interval must be positive and not above the maximum"
+            )
+        filters = self._get_filters(filters)
+        filters.pop("to_timestamp", None)
+        watermark = self._tail_start(
+            since, filters.pop("from_timestamp", None)
+        )
+        wait = interval
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            polls += 1
+            now = pd.Timestamp.now(tz="UTC")
+            dataframe = self._fetch_range(watermark, now, filters)
+            if not dataframe.empty:
+                # The datalake range includes its start, the watermark was
+                # already printed
+                dataframe = dataframe[dataframe.index > watermark]
+            if dataframe.empty:
+                wait = min(wait * 2, max_interval)
+            else:
+                watermark = dataframe.index.max()
+                wait = interval
+                self._print_points(dataframe, output)
+            if max_polls is None or polls < max_polls:
+                time.sleep(wait)
+
+    def _tail_start(
+        self, since: Optional[str], from_timestamp: Optional[Any]
+    ) -> pd.Timestamp:
+        now = pd.Timestamp.now(tz="UTC")
+        if since is None:
+            return self._to_utc(from_timestamp) if from_timestamp else now
+        try:
+            return now - self._to_timedelta(since)
+        except DatalakeManagerException:
+            pass
+        try:
+            return self._to_utc(since)
+        except ValueError:
+            raise DatalakeManagerException(
+                f"Invalid start {since}, use a duration eg. 10min or a "
+                "timestamp"
+            )
+
+    def _print_points(self, dataframe: pd.DataFrame, output: str):
+        columns = [
+            column
+            for column in ["asset", "attribute", "value"]
+            if column in dataframe.columns
+        ]
+        if output == "ndjson":
+            for timestamp, row in dataframe[columns].iterrows():
+                self._console.print(
+                    json.dumps(
+                        {"timestamp": timestamp.isoformat(), **row.to_dict()},
+                        default=str,
+                    ),
+                    markup=False,
+                    highlight=False,
+                    soft_wrap=True,
+                )
+            return
+        table = Table("timestamp", *columns)
+        for timestamp, row in dataframe[columns].iterrows():
+            # String values are shown as they are, not as markup
+            table.add_row(
+                timestamp.isoformat(),
+                *(escape(str(value)) for value in row.tolist()),
+            )
+        self._console.print(table)
+
+    def _check_aggregations(
+        self,
+        aggregations: List[str],
+        interval: pd.Timedelta,
+        server_side: bool,
+    ) -> List[str]:
+        supported = (
+            AGGREGATIONS
+            if self._model.__name__ == "Number"
+            else NON_NUMERIC_AGGREGATIONS
+        )
+        aggregations = list(dict.fromkeys(aggregations))
+        for aggregation in aggregations:
+            if aggregation not in supported:
+                raise DatalakeManagerException(
+                    f"Aggregation {aggregation} is not supported for "
+                    f"{self._model.__name__}, use one of "
+                    f"{', '.join(supported)}"
+                )
+            if server_side and server_pipeline(interval, aggregation) is None:
+                raise DatalakeManagerException(
+                    f"Aggregation {aggregation} every {interval} can not be "
+                    "done by the datalake"
+                )
+        return aggregations
+
+    def _fetch_aggregated(
+        self,
+        filters: Dict[str, str],
+        interval: pd.Timedelta,
+        aggregations: List[str],
+    ) -> Iterator[pd.DataFrame]:
+        """Yields the series aggregated by the datalake, one query per
+        aggregation.
+        """
+        filters = self._get_filters(filters)
+        start, end = self._pop_time_range(filters)
+        columns = {}
+        dataframe = pd.DataFrame()
+        for aggregation in aggregations:
+            buckets = self._fetch_buckets(
+                start,
+                end,
+                {
+                    **filters,
+                    "extra_pipeline": server_pipeline(interval, aggregation),
+                },
+            )
+            if buckets.empty:
+                continue
+            dataframe = buckets
+            columns[column_name(aggregation, aggregations)] = buckets["value"]
+        if not columns:
+            yield pd.DataFrame()
+            return
+        result = pd.DataFrame(columns).sort_index()
+        for column in ["output_format", "attribute", "asset"]:
+            if column in dataframe.columns:
+                result.insert(0, column, dataframe[column].iloc[0])
+        yield result
+
+    def _fetch_buckets(
+        self,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        filters: Dict[str, Any],
+    ) -> pd.DataFrame:
+        """Retrieves the aggregated intervals between start and end paging
+        backwards. Unlike raw points, each interval is complete in the page
+        where it appears, so the next page ends right before it.
+        """
+        pages = []
+        while end >= start:
+            dataframe = self._get_page(start, end, filters)
+            if dataframe.empty:
+                break
+            pages.append(dataframe)
+            if len(dataframe) < DATALAKE_PAGE_SIZE:
+                break
+            end = dataframe.index.min() - pd.Timedelta(microseconds=1)
+        if not pages:
+            return pd.DataFrame()
+        return pd.concat(pages).sort_index()
+
+    @sync_datalake_client()
+    def load(
+        self,
+        path: str,
+        chunksize: Optional[int] = None,
+        resume: bool = False,
+        workers: int = 1,
+        dry_run: bool = False,
+        timestamp_format: Optional[str] = None,
+        processes: Optional[int] = None,
+        merge: bool = False,
+    ):
+        if chunksize is not None and chunksize <= 0:
+            raise DatalakeManagerException(
+                "Chunk size must be a positive number of rows"
+            )
+        if workers <= 0:
+            raise DatalakeManagerException(
+                "Number of workers must be positive"
+            )
+        if processes is not None and processes <= 0:
+            raise DatalakeManagerException(
+                "Number of processes must be positive"
+            )
+        paths = (
+            [path] if os.path.isfile(path) else datalake_io.expand_paths(path)
+        )
+        if paths == [path] and not os.path.isfile(path):
+            raise DatalakeManagerException(f"File {path} not found")
+        if not paths:
+            raise DatalakeManagerException(
+                f"No datalake files found in {path}"
+            )
+        if merge and not dry_run:
+            if resume or workers > 1:
+                raise DatalakeManagerException(
+                    "Merged loads upload their batches in order, they can "
+                    "not be resumed nor use concurrent uploads"
+                )
+            self._merge_files(paths, chunksize, timestamp_format)
+            return
+        if paths != [path]:
+            self._load_files(
+                paths,
+                chunksize=chunksize,
+                resume=resume,
+                workers=workers,
+                dry_run=dry_run,
+                timestamp_format=timestamp_format,
+                processes=processes,
+            )
+            return
+
+        try:
+            self._validate_columns(datalake_io.read_columns(path))
+        except (
+            UnsupportedFileFormat,
+            MissingDependency,
+            InvalidDatalakeFile,
+        ) as exc:
+            raise DatalakeManagerException(str(exc))
+        if dry_run:
+            self._validate_file(path, chunksize)
+            return
+
+        manifest = self._start_upload_manifest(path, resume, chunksize)
+        if manifest["complete"]:
+            self._console.print(
+                f"File {path} was already loaded", style=warning_style
+            )
+            return
+        # The file is read again from the last batch of the saved prefix,
+        # checked against the file along with any later batch saved
+        committed = committed_batches(manifest)
+        if committed:
+            self._console.print(
+                f"Resuming load, {sum(rows for _, rows in committed)} rows "
+                "were already saved"
+            )
+
+        started = time.monotonic()
+        loaded = 0
+
+        def commit(offset: int, dataframe: pd.DataFrame):
+            nonlocal loaded
+            manifest["batches"].append(
+                {
+                    "offset": offset,
+                    "rows": len(dataframe),
+                    "checksum": datalake_io.batch_checksum(dataframe),
+                }
+            )
+            datalake_io.write_upload_manifest(path, manifest)
+            loaded += len(dataframe)
+            if chunksize is not None:
+                elapsed = max(time.monotonic() - started, 1e-6)
+                self._console.print(
+                    f"Loaded {loaded} rows ({loaded / elapsed:.0f} rows/s)"
+                    + (
+                        f" with {int(uploader.limit)} uploads in flight"
+                        if workers > 1
+                        else ""
+                    )
+                )
+
+        try:
+            batches = self._iter_batches(
+                path, chunksize, committed, timestamp_format
+            )
+            if workers == 1:
+                for offset, dataframe in batches:
+                    self._save_batch(dataframe)
+                    commit(offset, dataframe)
+            else:
+                uploader = AdaptiveUploader(
+                    self._save_batch, max_workers=workers, on_commit=commit
+                )
+                uploader.upload(batches)
+        except (
+            UnsupportedFileFormat,
+            MissingDependency,
+            InvalidDatalakeFile,
+            UploadError,
+        ) as exc:
+            raise DatalakeManagerException(str(exc))
+        manifest["complete"] = True
+        datalake_io.write_upload_manifest(path, manifest)
         self._console.print(
             f"Succesfully loaded {path} in {self._model.__name__}",
             style=success_style,
         )
 
+    def _merge_files(
+        self,
+        paths: List[str],
+        chunksize: Optional[int],
+        timestamp_format: Optional[str],
+    ):
+        """Loads files sorted by timestamp as a single stream merged in
+        timestamp order, without the points repeated across files.
+        """
+        sources = []
+        try:
+            for path in paths:
+                self._validate_columns(datalake_io.read_columns(path))
+                batches = self._iter_batches(
+                    path, chunksize, {}, timestamp_format
+                )
+                sources.append((path, (dataframe for _, dataframe in batches)))
+            merge = SortedMerge(sources)
+            for dataframe in merge:
+                self._save_batch(dataframe)
+                if chunksize is not None:
+                    self._console.print(
+                        f"Loaded {merge.rows} rows, dropped "
+                        f"{merge.duplicates} duplicates"
+                    )
+        except (
+            UnsupportedFileFormat,
+            MissingDependency,
+            InvalidDatalakeFile,
+            UnsortedFile,
+        ) as exc:
+            raise DatalakeManagerException(str(exc))
+        self._console.print(
+            f"Succesfully loaded {merge.rows} rows from {len(paths)} files "
+            f"in {self._model.__name__}, dropped {merge.duplicates} "
+            "duplicates",
+            style=success_style,
+        )
+
+    def _load_files(
+        self,
+        paths: List[str],
+        chunksize: Optional[int],
+        resume: bool,
+        workers: int,
+        dry_run: bool,
+        timestamp_format: Optional[str],
+        processes: Optional[int],
+    ):
+        """Loads many files parsing and validating them in a process pool,
+        while their batches go through a single upload stage. A file that
+        fails is reported and does not stop the others.
+        """
+        report = LoadReport(paths)
+        manifests = {}
+        pending = {}
+        for path in paths:
+            if dry_run:
+                continue
+            # Files never started are loaded from scratch when resuming
+            started = os.path.exists(datalake_io.upload_manifest_path(path))
+            try:
+                manifest = self._start_upload_manifest(
+                    path, resume and started, chunksize
+                )
+            except DatalakeManagerException as exc:
+                report.set(path, LoadReport.FAILED, detail=str(exc))
+                continue
+            if manifest["complete"]:
+                report.set(path, LoadReport.SKIPPED, detail="already loaded")
+                continue
+            manifests[path] = manifest
+
+        def finish(path: str):
+            manifests[path]["complete"] = True
+            datalake_io.write_upload_manifest(path, manifests[path])
+            report.set(path, LoadReport.LOADED)
+
+        def commit(key: Tuple[str, int], dataframe: pd.DataFrame):
+            path, offset = key
+            manifests[path]["batches"].append(
+                {
+                    "offset": offset,
+                    "rows": len(dataframe),
+                    "checksum": datalake_io.batch_checksum(dataframe),
+                }
+            )
+            datalake_io.write_upload_manifest(path, manifests[path])
+            pending[path] -= 1
+            if not pending[path]:
+                finish(path)
+
+        def parsed_batches() -> Iterator[Tuple[Tuple[str, int], pd.DataFrame]]:
+            for parsed in self._parse_files(
+                paths if dry_run else list(manifests),
+                chunksize,
+                manifests,
+                timestamp_format,
+                processes,
+            ):
+                if parsed.error is not None:
+                    report.set(
+                        parsed.path,
+                        LoadReport.FAILED,
+                        detail=parsed.error,
+                    )
+                    continue
+                report.set(parsed.path, LoadReport.PENDING, rows=parsed.rows)
+                if dry_run:
+                    report.set(parsed.path, LoadReport.VALID)
+                    continue
+                pending[parsed.path] = len(parsed.batches)
+                if not parsed.batches:
+                    finish(parsed.path)
+                for offset, dataframe in parsed.batches:
+                    yield (parsed.path, offset), dataframe
+
+        uploader = AdaptiveUploader(
+            self._save_batch, max_workers=workers, on_commit=commit
+        )
+        try:
+            uploader.upload(parsed_batches())
+        except UploadError as exc:
+            self._console.print(report.as_table())
+            raise DatalakeManagerException(str(exc))
+        self._console.print(report.as_table())
+        if report.count(LoadReport.FAILED):
+            self._console.print(
+                f"{report.count(LoadReport.FAILED)} files "
+                + (
+                    "are not valid for"
+                    if dry_run
+                    else "could not be loaded in"
+                )
+                + f" {self._model.__name__}",
+                style=error_style,
+            )
+        elif dry_run:
+            self._console.print(
+                f"All files are valid for {self._model.__name__}",
+                style=success_style,
+            )
+        else:
+            self._console.print(
+                f"Succesfully loaded {len(paths)} files in "
+                f"{self._model.__name__}",
+                style=success_style,
+            )
+
+    def _parse_files(
+        self,
+        paths: List[str],
+        chunksize: Optional[int],
+        manifests: Dict[str, Dict[str, Any]],
+        timestamp_format: Optional[str],
+        processes: Optional[int],
+    ) -> Iterator[ParsedFile]:
+        """Parses the files in a process pool and yields them in order,
+        keeping only a few parsed files ahead of the upload in memory.
+        """
+        if not paths:
+            return
+        processes = processes or os.cpu_count() or 1
+        paths = iter(paths)
+        # Forking while the upload threads run could copy their locks held
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            ahead = 2 * processes
+
+            def submit(path: str):
+                manifest = manifests.get(path, {"batches": []})
+                return executor.submit(
+                    parse_file,
+                    path,
+                    self._model.__name__,
+                    chunksize,
+                    committed_batches(manifest),
+                    timestamp_format,
+                )
+
+            queued = deque(submit(path) for path in islice(paths, ahead))
+            while queued:
+                parsed = queued.popleft().result()
+                for path in islice(paths, 1):
+                    queued.append(submit(path))
+                yield parsed
+
+    def _iter_batches(
+        self,
+        path: str,
+        chunksize: Optional[int],
+        committed: Dict[BatchRange, str],
+        timestamp_format: Optional[str] = None,
+    ) -> Iterator[Tuple[int, pd.DataFrame]]:
+        """Yields the validated batches of the file with their row offset,
+        leaving out the batches already committed.
+        """
+        offset = resume_offset(committed)
+        chunks = datalake_io.read_chunks(
+            path,
+            chunksize=chunksize,
+            skip_rows=offset,
+            value_type=self._model.__name__,
+            timestamp_format=timestamp_format,
+        )
+        while True:
+            try:
+                dataframe = next(chunks)
+            except StopIteration:
+                return
+            except ValueError as exc:
+                raise DatalakeManagerException(
+                    f"Could not parse the batch at row {offset} of {path}: "
+                    f"{exc}. Use --dry-run to find the invalid rows"
+                )
+            rows = len(dataframe)
+            try:
+                saved = is_committed(path, committed, offset, dataframe)
+            except ChangedFile as exc:
+                raise DatalakeManagerException(str(exc))
+            if rows and not saved:
+                issues = check_batch(dataframe, self._model.__name__)
+                if any(issues.values()):
+                    report = ValidationReport(path)
+                    report.add(rows, issues)
+                    self._console.print(report.as_table())
+                    raise DatalakeManagerException(
+                        f"Invalid values in the batch at row {offset}, "
+                        "nothing was saved from it"
+                    )
+                yield offset, dataframe
+            offset += rows
+
+    def _validate_file(self, path: str, chunksize: Optional[int]):
+        report = ValidationReport(path)
+        try:
+            for dataframe in datalake_io.read_chunks(
+                path, chunksize=chunksize
+            ):
+                report.add(
+                    len(dataframe),
+                    check_batch(dataframe, self._model.__name__),
+                )
+        except (
+            UnsupportedFileFormat,
+            MissingDependency,
+            InvalidDatalakeFile,
+        ) as exc:
+            raise DatalakeManagerException(str(exc))
+        self._console.print(report.as_table())
+        if report.valid:
+            self._console.print(
+                f"File {path} is valid for {self._model.__name__}",
+                style=success_style,
+            )
+        else:
+            self._console.print(
+                f"File {path} has invalid rows for {self._model.__name__}",
+                style=error_style,
+            )
+
+    def _start_upload_manifest(
+        self, path: str, resume: bool, chunksize: Optional[int]
+    ):
+        """Returns the upload manifest to continue when resuming, or a new
+        one that replaces any previous manifest.
+        """
+        fingerprint = datalake_io.file_fingerprint(path)
+        if resume:
+            manifest = datalake_io.read_upload_manifest(path)
+            if not manifest:
+                raise DatalakeManagerException(
+                    f"No upload manifest found to resume loading {path}"
+                )
+            if manifest["file"] != fingerprint:
+                raise DatalakeManagerException(
+                    str(ChangedFile(path, "its size or time differ"))
+                )
+            # Batches are matched by offset and rows, other sizes would
+            # not match the ones saved and upload their rows again
+            if manifest.get("chunksize") != chunksize:
+                raise DatalakeManagerException(
+                    f"File {path} was loaded in batches of "
+                    f"{manifest.get('chunksize') or 'all the'} rows, resume "
+                    "with the same chunk size"
+                )
+            return manifest
+        return {
+            "file": fingerprint,
+            "chunksize": chunksize,
+            "batches": [],
+            "complete": False,
+        }
+
+    def fetch(
+        self,
+        filters: Dict[str, str],
+        window: Optional[str] = None,
+        parallel: int = 1,
+        cache: Optional[DatalakeCache] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Yields the data matching the filters sorted by timestamp, one
+        dataframe per time window or one per shard of about a page.
+
+        Without a window the range is split in shards after the density of
+        its newest page, as a single request only returns that page. The
+        range starts at the oldest point when no from_timestamp is given.
+        """
+        if parallel <= 0:
+            raise DatalakeManagerException(
+                "Number of parallel queries must be positive"
+            )
+        filters = self._get_filters(filters)
+        if cache is not None:
+            yield from self._iter_cached(
+                filters,
+                cache,
+                None if window is None else self._to_timedelta(window),
+                parallel,
+            )
+        elif window is not None:
+            yield from self._iter_windows(
+                filters, self._to_timedelta(window), parallel
+            )
+        else:
+            if filters.get("from_timestamp") is None:
+                first = self._get_first_point(filters)
+                if first.empty:
+                    return
+                filters["from_timestamp"] = first.index[0]
+            yield from self._iter_shards(filters, parallel)
+
+    def _iter_windows(
+        self, filters: Dict[str, Any], window: pd.Timedelta, parallel: int = 1
+    ) -> Iterator[pd.DataFrame]:
+        """Yields the data in the filtered time range one window at a time,
+        so only the windows being fetched are held in memory.
+        """
+        filters = filters.copy()
+        start, end = self._pop_time_range(filters)
+        ranges = self._split_range(start, end, window)
+        yield from self._iter_ranges(ranges, filters, parallel)
+
+    def _iter_cached(
+        self,
+        filters: Dict[str, Any],
+        cache: DatalakeCache,
+        window: Optional[pd.Timedelta],
+        parallel: int,
+    ) -> Iterator[pd.DataFrame]:
+        """Yields the data in the filtered time range reading the cached
+        intervals from disk and fetching only the gaps between them.
+        """
+        filters = filters.copy()
+        start, end = self._pop_time_range(filters)
+        value_type = self._model.__name__
+        series = {
+            "asset": str(filters.get("asset")),
+            "attribute": str(filters.get("attribute")),
+        }
+        key = cache.key(value_type, filters)
+        segments = cache.plan(key, start, end)
+        for position, (segment_start, segment_end, interval) in enumerate(
+            segments
+        ):
+            include_end = position == len(segments) - 1
+            if interval is not None:
+                yield from cache.read(
+                    key, interval, segment_start, segment_end, include_end
+                )
+                continue
+
+            files = []
+            ranges = self._split_range(segment_start, segment_end, window)
+            for dataframe in self._iter_ranges(ranges, filters, parallel):
+                # The cached interval includes its end
+                files.append(cache.write_piece(key, dataframe, value_type))
+                if not include_end:
+                    dataframe = dataframe[dataframe.index < segment_end]
+                if not dataframe.empty:
+                    yield dataframe
+            cache.add_interval(key, segment_start, segment_end, files, series)
+
+    @staticmethod
+    def _split_range(
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        window: Optional[pd.Timedelta],
+    ) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        if window is None:
+            return [(start, end)]
+        ranges = []
+        while start < end:
+            ranges.append((start, min(start + window, end)))
+            start = ranges[-1][1]
+        return ranges
+
+    def _iter_shards(
+        self, filters: Dict[str, Any], parallel: int
+    ) -> Iterator[pd.DataFrame]:
+        """Yields the data in the filtered time range split in shards sized
+        after the point density of the most recent page of the range.
+        """
+        filters = filters.copy()
+        start, end = self._pop_time_range(filters)
+        yield from self._iter_pages(start, end, filters, parallel)
+
+    def _iter_pages(
+        self,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        filters: Dict[str, Any],
+        parallel: int,
+        page: Optional[pd.DataFrame] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Yields the points between start and end, both included, in
+        sorted chunks of at most a page.
+
+        A full page means the range holds more points. The rest of it is
+        split in shards a fraction of the span of that page, expected to
+        fit in a single request, and shards denser than that are split
+        again the same way, so only a page per shard is held in memory.
+        """
+        if page is None:
+            page = self._get_page(start, end, filters)
+        if len(page) < DATALAKE_PAGE_SIZE:
+            if not page.empty:
+                yield page.sort_index()
+            return
+        oldest = page.index.min()
+        if oldest >= end:
+            # The datalake can't page past a timestamp holding a full page
+            yield page.sort_index()
+            return
+
+        shard = max((end - oldest) * SHARD_PAGE_FILL, pd.Timedelta(seconds=1))
+        ranges = self._split_range(start, oldest, shard) or [(oldest, oldest)]
+
+        def fetch_page(bounds):
+            return self._get_page(*bounds, filters)
+
+        shards = iter(ranges)
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            pending = deque(
+                (bounds, executor.submit(fetch_page, bounds))
+                for bounds in islice(shards, parallel)
+            )
+            while pending:
+                (shard_start, shard_end), future = pending.popleft()
+                for bounds in islice(shards, 1):
+                    pending.append(
+                        (bounds, executor.submit(fetch_page, bounds))
+                    )
+                for dataframe in self._iter_pages(
+                    shard_start,
+                    shard_end,
+                    filters,
+                    parallel,
+                    page=future.result(),
+                ):
+                    # Points at the end of a shard belong to the next one
+                    if shard_end < oldest:
+                        dataframe = dataframe[dataframe.index < shard_end]
+                    if not dataframe.empty:
+                        yield dataframe
+        # Points at the oldest timestamp belong to the last shard
+        dataframe = page[page.index > oldest]
+        if not dataframe.empty:
+            yield dataframe.sort_index()
+
+    def _iter_ranges(
+        self,
+        ranges: List[Tuple[pd.Timestamp, pd.Timestamp]],
+        filters: Dict[str, Any],
+        parallel: int,
+    ) -> Iterator[pd.DataFrame]:
+        """Fetches consecutive time ranges with up to parallel concurrent
+        queries and yields them in order. Each range excludes its end except
+        for the last one.
+        """
+        if not ranges:
+            return
+        last_end = ranges[-1][1]
+
+        def fetch_range(bounds):
+            start, end = bounds
+            dataframe = self._fetch_range(start, end, filters)
+            if end < last_end and not dataframe.empty:
+                dataframe = dataframe[dataframe.index < end]
+            return dataframe
+
+        ranges = iter(ranges)
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            pending = deque(
+                executor.submit(fetch_range, bounds)
+                for bounds in islice(ranges, parallel)
+            )
+            while pending:
+                dataframe = pending.popleft().result()
+                for bounds in islice(ranges, 1):
+                    pending.append(executor.submit(fetch_range, bounds))
+                if not dataframe.empty:
+                    yield dataframe
+
+    def _pop_time_range(
+        self, filters: Dict[str, Any]
+    ) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        start = filters.pop("from_timestamp", None)
+        end = filters.pop("to_timestamp", None)
+        if start is None:
+            raise DatalakeManagerException(
+                "A from_timestamp filter is required to split the time range"
+            )
+        return (
+            self._to_utc(start),
+            self._to_utc(end or datetime.now(timezone.utc)),
+        )
+
+    def _get_page(
+        self,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        filters: Dict[str, Any],
+    ) -> pd.DataFrame:
+        dataframe = self._get_dataframe(
+            from_timestamp=start.to_pydatetime(),
+            to_timestamp=end.to_pydatetime(),
+            **filters,
+        )
+        if not dataframe.empty:
+            dataframe.index = pd.to_datetime(dataframe.index, utc=True).rename(
+                "timestamp"
+            )
+        return dataframe
+
+    def _get_first_point(self, filters: Dict[str, Any]) -> pd.DataFrame:
+        """Returns the oldest point matching the filters, selected in the
+        datalake.
+        """
+        dataframe = self._get_dataframe(
+            **{**filters, "extra_pipeline": FIRST_POINT_PIPELINE}
+        )
+        if dataframe.empty:
+            return dataframe
+        dataframe.index = pd.to_datetime(dataframe.index, utc=True)
+        return dataframe.sort_index().iloc[:1]
+
+    def _get_last_point(
+        self,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        filters: Dict[str, Any],
+    ) -> pd.DataFrame:
+        """Returns the newest point between start and end, selected in the
+        datalake as it ignores limits.
+        """
+        dataframe = self._get_page(
+            start, end, {**filters, "extra_pipeline": LAST_POINT_PIPELINE}
+        )
+        return dataframe.sort_index().iloc[-1:]
+
+    def _fetch_range(
+        self,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        filters: Dict[str, Any],
+    ) -> pd.DataFrame:
+        """Retrieves all the points between start and end paging backwards
+        when the datalake page size limit is reached.
+        """
+        pages = []
+        while True:
+            dataframe = self._get_page(start, end, filters)
+            if dataframe.empty:
+                break
+            if len(dataframe) < DATALAKE_PAGE_SIZE:
+                pages.append(dataframe)
+                break
+            oldest = dataframe.index.min()
+            if oldest >= end:
+                pages.append(dataframe)
+                break
+            # Points at the oldest timestamp are fetched again in the
+            # next page
+            pages.append(dataframe[dataframe.index > oldest])
+            end = oldest
+        if not pages:
+            return pd.DataFrame()
+        return pd.concat(pages).sort_index()
+
+    @staticmethod
+    def _to_utc(value: Any) -> pd.Timestamp:
+        timestamp = pd.Timestamp(value)
+        if timestamp.tz is None:
+            return timestamp.tz_localize("UTC")
+        return timestamp.tz_convert("UTC")
+
+    @staticmethod
+    def _to_timedelta(value: str) -> pd.Timedelta:
+        try:
+            timedelta = pd.Timedelta(value)
+        except ValueError:
+            raise DatalakeManagerException(f"Invalid time window {value}")
+        if timedelta <= pd.Timedelta(0):
+            raise DatalakeManagerException(
+                f"Time window {value} must be positive"
+            )
+        return timedelta
+
     @staticmethod
     def _to_list(key: str, elem: str):
         if "," not in elem and "__in" not in key:
@@ -247,7 +1560,8 @@ class DatalakeManager:
         ]
         parsed_filters = {}
         for key, value in filters.items():
-            if key == "limit_":
+            key = TIMESTAMP_FILTER_ALIASES.get(key, key)
+            if key == "limit_" or not isinstance(value, str):
                 parsed_filters[key] = value
                 continue
             for cast in to_cast:
@@ -260,13 +1574,483 @@ class DatalakeManager:
             parsed_filters[key] = value
         return parsed_filters
 
-    def _validate_csv(self, data: pd.DataFrame):
+    def _save_batch(self, dataframe: pd.DataFrame):
+        dataframe = dataframe.reset_index(drop=True)
+        dataframe["timestamp"] = pd.to_datetime(
+            dataframe["timestamp"], utc=True
+        )
+        if self._datalake is None:
+            self._model.save_dataframe(dataframe)
+        else:
+            self._datalake.save_dataframe(self._model, dataframe)
+
+    def _get_dataframe(self, **params: Any) -> pd.DataFrame:
+        if self._datalake is None:
+            return self._model.get_dataframe(**params)
+        return self._datalake.get_dataframe(self._model, **params)
+
+    @staticmethod
+    def _validate_columns(columns: List[str]):
         required_columns = REQUIRED_DATALAKE_COLUMNS
 
-        if not required_columns.issubset(set(data.columns)):
+        if not required_columns.issubset(set(columns)):
             raise InvalidCSVColumns(columns=required_columns)
 
 
+class DatalakeBatchManager:
+    """Runs datalake operations over many series of different types."""
+
+    def __init__(self, models: Dict[str, SplightDatalakeBaseModel]):
+        self._models = models
+        self._console = Console()
+
+    def dump(
+        self,
+        manifest_path: str,
+        path: str,
+        filters: Dict[str, str],
+        window: Optional[str] = None,
+        workers: int = 8,
+        combine: bool = False,
+        file_format: str = "csv",
+    ):
+        series = self._read_series(manifest_path, workers)
+        if not series:
+            raise DatalakeManagerException(
+                f"No series listed in {manifest_path}"
+            )
+
+        lock = Lock()
+        writer = None
+        if combine:
+            if os.path.exists(path) and not datalake_io.is_database(path):
+                raise DatalakeManagerException(f"File {path} already exists")
+            writer = self._open_combined_writer(path, series)
+        else:
+            if file_format not in datalake_io.EXTENSIONS:
+                raise DatalakeManagerException(
+                    f"Format {file_format} not supported"
+                )
+            # Series files would be appended to, so a re-run would repeat
+            # their points. Databases are appended to on purpose
+            existing = [
+                series_path
+                for series_path in (
+                    self._series_path(path, item, file_format)
+                    for item in series
+                )
+                if os.path.exists(series_path)
+                and not datalake_io.is_database(series_path)
+            ]
+            if existing:
+                raise DatalakeManagerException(
+                    f"File {existing[0]} already exists"
+                    + (
+                        f", along with {len(existing) - 1} other series files"
+                        if len(existing) > 1
+                        else ""
+                    )
+                )
+            os.makedirs(path, exist_ok=True)
+
+        failed = 0
+        with (
+            writer or nullcontext(),
+            ThreadPoolExecutor(max_workers=workers) as executor,
+        ):
+            futures = {
+                executor.submit(
+                    self._dump_series,
+                    item,
+                    filters,
+                    window,
+                    writer,
+                    lock,
+                    None
+                    if combine
+                    else self._series_path(path, item, file_format),
+                ): item
+                for item in series
+            }
+            for future in as_completed(futures):
+                item = futures[future]
+                name = f"{item['asset']}/{item['attribute']}"
+                try:
+                    rows = future.result()
+                except Exception as exc:
+                    failed += 1
+                    self._console.print(
+                        f"Failed to dump {name}: {exc}", style=error_style
+                    )
+                else:
+                    self._console.print(f"Dumped {rows} rows of {name}")
+
+        self._console.print(
+            f"Dumped {len(series) - failed} of {len(series)} series in {path}",
+            style=warning_style if failed else success_style,
+        )
+
+    @sync_datalake_client()
+    def load(
+        self,
+        path: str,
+        chunksize: Optional[int] = None,
+        workers: int = 3,
+        timestamp_format: Optional[str] = None,
+    ):
+        """Loads files whose rows may be of any type, saving each row with
+        the model of its output_format.
+        """
+        if chunksize is not None and chunksize <= 0:
+            raise DatalakeManagerException(
+                "Chunk size must be a positive number of rows"
+            )
+        if workers <= 0:
+            raise DatalakeManagerException(
+                "Number of workers must be positive"
+            )
+        paths = (
+            [path] if os.path.isfile(path) else datalake_io.expand_paths(path)
+        )
+        if not paths or not os.path.isfile(paths[0]):
+            raise DatalakeManagerException(
+                f"No datalake files found in {path}"
+            )
+        managers = {
+            name: DatalakeManager(model)
+            for name, model in self._models.items()
+        }
+        counts = {name: 0 for name in managers}
+
+        def save(dataframe: pd.DataFrame):
+            name = dataframe["output_format"].iloc[0]
+            managers[name]._save_batch(dataframe)
+
+        def commit(key: Tuple[str, int], dataframe: pd.DataFrame):
+            counts[dataframe["output_format"].iloc[0]] += len(dataframe)
+
+        uploader = AdaptiveUploader(
+            save, max_workers=workers, on_commit=commit
+        )
+        for file_path in paths:
+            # Rows of this file only
+            counts.update(dict.fromkeys(counts, 0))
+            try:
+                DatalakeManager._validate_columns(
+                    datalake_io.read_columns(file_path)
+                )
+                uploader.upload(
+                    self._route_batches(file_path, chunksize, timestamp_format)
+                )
+            except (
+                UnsupportedFileFormat,
+                MissingDependency,
+                InvalidDatalakeFile,
+                UploadError,
+            ) as exc:
+                raise DatalakeManagerException(str(exc))
+            self._console.print(
+                f"Succesfully loaded {file_path}: "
+                + ", ".join(
+                    f"{rows} {name}" for name, rows in counts.items() if rows
+                ),
+                style=success_style,
+            )
+
+    def _route_batches(
+        self,
+        path: str,
+        chunksize: Optional[int],
+        timestamp_format: Optional[str] = None,
+    ) -> Iterator[Tuple[Tuple[str, int], pd.DataFrame]]:
+        """Yields the rows of each chunk grouped by output_format, with
+        the values casted to the type of their model.
+        """
+        offset = 0
+        for dataframe in datalake_io.read_chunks(path, chunksize=chunksize):
+            # Values of many types can not be read with a single schema,
+            # so CSV timestamps are parsed here
+            if not pd.api.types.is_datetime64_any_dtype(
+                dataframe["timestamp"]
+            ):
+                try:
+                    dataframe["timestamp"] = datalake_io.parse_timestamps(
+                        dataframe["timestamp"], timestamp_format
+                    )
+                except ValueError as exc:
+                    raise DatalakeManagerException(
+                        f"Could not parse the timestamps of the batch at row "
+                        f"{offset} of {path}: {exc}"
+                    )
+            unknown = ~dataframe["output_format"].isin(list(self._models))
+            if unknown.any():
+                formats = dataframe.loc[unknown, "output_format"].unique()
+                raise DatalakeManagerException(
+                    f"Unknown output_format {', '.join(map(str, formats))} "
+                    f"in the batch at row {offset} of {path}"
+                )
+            for name, group in dataframe.groupby("output_format", sort=False):
+                issues = check_batch(group, name)
+                if any(issues.values()):
+                    report = ValidationReport(f"{path} ({name} rows)")
+                    report.add(len(group), issues)
+                    self._console.print(report.as_table())
+                    raise DatalakeManagerException(
+                        f"Invalid values in the batch at row {offset}, "
+                        "nothing was saved from it"
+                    )
+                yield (path, offset), self._cast_values(group, name)
+            offset += len(dataframe)
+
+    @staticmethod
+    def _cast_values(dataframe: pd.DataFrame, value_type: str) -> pd.DataFrame:
+        value = dataframe["value"]
+        if value_type == "Number":
+            value = pd.to_numeric(value)
+        elif value_type == "Boolean" and not pd.api.types.is_bool_dtype(value):
+            value = value.astype(str).str.lower() == "true"
+        elif value_type == "String":
+            value = value.astype(str)
+        return dataframe.assign(value=value)
+
+    def dump_wide(
+        self,
+        manifest_path: str,
+        path: str,
+        filters: Dict[str, str],
+        grid: str,
+        window: Optional[str] = None,
+        workers: int = 8,
+        tolerance: Optional[str] = None,
+    ):
+        """Writes the series as a wide table with one column per series on
+        a common time grid. Each grid point takes the last value of each
+        series at or before it, no older than tolerance if given.
+
+        The range is processed one window at a time, carrying the last
+        point of each series to the next window, so only a window of every
+        series is held in memory.
+        """
+        series = self._read_series(manifest_path, workers)
+        if not series:
+            raise DatalakeManagerException(
+                f"No series listed in {manifest_path}"
+            )
+        if os.path.exists(path):
+            raise DatalakeManagerException(f"File {path} already exists")
+        step = DatalakeManager._to_timedelta(grid)
+        window = (
+            DatalakeManager._to_timedelta(window)
+            if window is not None
+            else step * DATALAKE_PAGE_SIZE
+        )
+        if tolerance is not None:
+            tolerance = DatalakeManager._to_timedelta(tolerance)
+        managers = {
+            self._column(item): DatalakeManager(self._models[item["type"]])
+            for item in series
+        }
+        column_types = {self._column(item): item["type"] for item in series}
+        any_manager = next(iter(managers.values()))
+        filters = any_manager._get_filters(filters)
+        start, end = any_manager._pop_time_range(filters)
+        ranges = DatalakeManager._split_range(start, end, window)
+
+        def fetch(item, bounds, last_range):
+            range_start, range_end = bounds
+            manager = managers[self._column(item)]
+            series_filters = {
+                **filters,
+                "asset": item["asset"],
+                "attribute": item["attribute"],
+            }
+            dataframe = manager._fetch_range(
+                range_start, range_end, series_filters
+            )
+            if dataframe.empty:
+                return pd.Series(dtype=object)
+            if not last_range:
+                dataframe = dataframe[dataframe.index < range_end]
+            return dataframe["value"]
+
+        try:
+            writer = datalake_io.open_writer(
+                path, "Number", column_types=column_types
+            )
+        except (
+            UnsupportedFileFormat,
+            MissingDependency,
+            InvalidDatalakeFile,
+        ) as exc:
+            raise DatalakeManagerException(str(exc))
+        last_points = {column: pd.Series(dtype=object) for column in managers}
+        with writer, ThreadPoolExecutor(max_workers=workers) as executor:
+            # Seed each series with its last point before the range
+            seeds = executor.map(
+                lambda item: self._last_point(
+                    managers[self._column(item)], item, start, tolerance
+                ),
+                series,
+            )
+            for item, seed in zip(series, seeds):
+                last_points[self._column(item)] = seed
+            for index, bounds in enumerate(ranges):
+                last_range = index == len(ranges) - 1
+                grid_index = pd.date_range(
+                    bounds[0].ceil(step),
+                    bounds[1],
+                    freq=step,
+                    inclusive="both" if last_range else "left",
+                )
+                values = executor.map(
+                    lambda item: fetch(item, bounds, last_range), series
+                )
+                wide = pd.DataFrame(index=grid_index.rename("timestamp"))
+                for item, points in zip(series, values):
+                    column = self._column(item)
+                    previous = last_points[column]
+                    if points.empty:
+                        points = previous
+                    elif not previous.empty:
+                        points = pd.concat([previous, points])
+                    if not points.empty:
+                        points = points[~points.index.duplicated(keep="last")]
+                        last_points[column] = points.iloc[-1:]
+                    wide[column] = self._align(
+                        points, grid_index, tolerance, item["type"]
+                    )
+                writer.write(wide)
+                self._console.print(
+                    f"Dumped {writer.rows} rows up to {bounds[1]}"
+                )
+        self._console.print(
+            f"Dumped {len(series)} series on a {grid} grid in {path}",
+            style=success_style,
+        )
+
+    @staticmethod
+    def _column(item: Dict[str, str]) -> str:
+        return f"{item['asset']}/{item['attribute']}"
+
+    @staticmethod
+    def _last_point(
+        manager: "DatalakeManager",
+        item: Dict[str, str],
+        start: pd.Timestamp,
+        tolerance: Optional[pd.Timedelta],
+    ) -> pd.Series:
+        dataframe = manager._get_dataframe(
+            asset=item["asset"],
+            attribute=item["attribute"],
+            from_timestamp=(
+                None
+                if tolerance is None
+                else (start - tolerance).to_pydatetime()
+            ),
+            to_timestamp=start.to_pydatetime(),
+            extra_pipeline=LAST_POINT_PIPELINE,
+        )
+        if dataframe.empty:
+            return pd.Series(dtype=object)
+        dataframe.index = pd.to_datetime(dataframe.index, utc=True)
+        return dataframe["value"].sort_index().iloc[-1:]
+
+    @staticmethod
+    def _align(
+        points: pd.Series,
+        grid_index: pd.DatetimeIndex,
+        tolerance: Optional[pd.Timedelta],
+        value_type: str,
+    ) -> pd.Series:
+        """As-of join of the points onto the grid."""
+        if points.empty:
+            aligned = pd.Series(None, index=grid_index, dtype=object)
+        else:
+            points.index = pd.to_datetime(points.index, utc=True)
+            aligned = points.reindex(
+                grid_index, method="ffill", tolerance=tolerance
+            )
+        if value_type == "Number":
+            return aligned.astype("float64")
+        return aligned.astype(object).where(aligned.notna(), None)
+
+    def _read_series(
+        self, manifest_path: str, workers: int
+    ) -> List[Dict[str, str]]:
+        try:
+            series = datalake_io.read_manifest(manifest_path)
+        except InvalidManifest as exc:
+            raise DatalakeManagerException(str(exc))
+        for item in series:
+            if item["type"] not in self._models:
+                raise DatalakeManagerException(
+                    f"Type {item['type']} not supported"
+                )
+        if workers <= 0:
+            raise DatalakeManagerException(
+                "Number of workers must be positive"
+            )
+        return series
+
+    def _open_combined_writer(
+        self, path: str, series: List[Dict[str, str]]
+    ) -> datalake_io.DatalakeWriter:
+        types = {item["type"] for item in series}
+        try:
+            file_format = datalake_io.get_file_format(path)
+        except (UnsupportedFileFormat, MissingDependency) as exc:
+            raise DatalakeManagerException(str(exc))
+        if len(types) > 1 and file_format not in datalake_io.MIXED_FORMATS:
+            raise DatalakeManagerException(
+                "Series of different types can only be combined in a CSV "
+                "file or a SQLite database"
+            )
+        if len(series) > 1 and file_format == datalake_io.NPY_FORMAT:
+            raise DatalakeManagerException(
+                "An array holds a single series, dump one array per series "
+                "without --combine"
+            )
+        try:
+            return datalake_io.open_writer(path, types.pop())
+        except InvalidDatalakeFile as exc:
+            raise DatalakeManagerException(str(exc))
+
+    @staticmethod
+    def _series_path(path: str, item: Dict[str, str], file_format: str):
+        extension = datalake_io.EXTENSIONS[file_format]
+        return os.path.join(
+            path, f"{item['asset']}_{item['attribute']}{extension}"
+        )
+
+    def _dump_series(
+        self,
+        item: Dict[str, str],
+        filters: Dict[str, str],
+        window: Optional[str],
+        writer: Optional[datalake_io.DatalakeWriter],
+        lock: Lock,
+        path: Optional[str],
+    ) -> int:
+        manager = DatalakeManager(self._models[item["type"]])
+        filters = {
+            **filters,
+            "asset": item["asset"],
+            "attribute": item["attribute"],
+        }
+        if writer is None:
+            with datalake_io.open_writer(path, item["type"]) as series_writer:
+                for dataframe in manager.fetch(filters, window=window):
+                    series_writer.write(dataframe)
+            return series_writer.rows
+
+        rows = 0
+        for dataframe in manager.fetch(filters, window=window):
+            with lock:
+                writer.write(dataframe)
+            rows += len(dataframe)
+        return rows
+
+
 class ComponentUpgradeManager:
     def __init__(self, component_id: str):
         self.component_id = component_id
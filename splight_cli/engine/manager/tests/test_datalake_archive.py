@@ -0,0 +1,143 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from splight_cli.engine.manager import datalake_archive, datalake_io
+from splight_cli.engine.manager.datalake_archive import (
+    BLOCK_SIZE,
+    Archive,
+    decode_block,
+    encode_block,
+)
+from splight_cli.engine.manager.exceptions import InvalidArchive
+
+START = pd.Timestamp("2024-01-01", tz="UTC").value
+
+
+def _series(points: int, attribute: str = "attribute") -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "asset": "asset",
+            "attribute": attribute,
+            "output_format": "Number",
+            "value": np.round(np.cumsum(np.ones(points) * 0.1), 1),
+        },
+        index=pd.date_range("2024-01-01", periods=points, freq="s", tz="UTC"),
+    )
+
+
+@pytest.mark.parametrize(
+    "timestamps",
+    [
+        START + np.arange(1000) * 60 * 10**9,
+        START + np.cumsum(np.random.default_rng(1).integers(1, 10**12, 1000)),
+        np.array([START]),
+        np.array([START, START - 10**9, 2**62, -(2**62)]),
+    ],
+)
+def test_block_round_trip(timestamps):
+    values = np.random.default_rng(2).normal(size=len(timestamps))
+    values[: min(len(values), 4)] = [np.nan, np.inf, -0.0, 1e-300][
+        : len(values)
+    ]
+    block, entry = encode_block(timestamps, values)
+    decoded_timestamps, decoded_values = decode_block(block, entry)
+    assert (decoded_timestamps == timestamps).all()
+    # Lossless bit by bit, including NaN and the sign of zero
+    assert (decoded_values.view(np.uint64) == values.view(np.uint64)).all()
+
+
+def test_block_compresses_regular_series():
+    timestamps = START + np.arange(1000) * 60 * 10**9
+    values = np.repeat([20.5, 21.0], 500)
+    block, entry = encode_block(timestamps, values)
+    assert entry["unit"] == 10**9
+    # About one bit per timestamp and per value
+    assert len(block) < 300
+
+
+def test_archive_round_trip(tmp_path):
+    path = str(tmp_path / "dump.sla")
+    first, second = _series(BLOCK_SIZE + 10), _series(20, "other")
+    with datalake_io.open_writer(path, "Number") as writer:
+        for start in range(0, len(first), 1000):
+            writer.write(first.iloc[start : start + 1000])
+            writer.write(second.iloc[start // 100 : start // 100 + 10])
+
+    read = pd.concat(datalake_io.read_chunks(path, chunksize=1000))
+    read = read[read["attribute"] == "attribute"].reset_index(drop=True)
+    expected = first.rename_axis("timestamp").reset_index()
+    pd.testing.assert_frame_equal(read, expected[read.columns])
+    assert datalake_io.read_columns(path) == list(expected.columns)
+
+    with datalake_io.open_writer(path, "Number", append=True) as writer:
+        writer.write(_series(7, "appended"))
+    archive = Archive(path)
+    assert archive.rows == len(first) + len(second) + 7
+
+
+def test_archive_interrupted_append(tmp_path):
+    path = str(tmp_path / "dump.sla")
+    with datalake_io.open_writer(path, "Number") as writer:
+        writer.write(_series(10))
+
+    # Killed after writing a block, before writing the new index
+    writer = datalake_io.open_writer(path, "Number", append=True)
+    writer.write(_series(BLOCK_SIZE, "lost"))
+    writer._handle.close()
+    assert Archive(path).rows == 10
+
+    with datalake_io.open_writer(path, "Number", append=True) as writer:
+        writer.write(_series(7, "appended"))
+    archive = Archive(path)
+    assert archive.rows == 17
+    read = pd.concat(archive.read())
+    assert set(read["attribute"]) == {"attribute", "appended"}
+
+
+def test_archive_range_and_skip(tmp_path):
+    path = str(tmp_path / "dump.sla")
+    series = _series(3 * BLOCK_SIZE)
+    with datalake_io.open_writer(path, "Number") as writer:
+        writer.write(series)
+
+    archive = Archive(path)
+    start, end = series.index[BLOCK_SIZE + 5], series.index[BLOCK_SIZE + 9]
+    with patch.object(
+        datalake_archive, "decode_block", wraps=decode_block
+    ) as mock:
+        read = pd.concat(archive.read(start=start, end=end))
+    assert list(read["timestamp"]) == list(series.index[BLOCK_SIZE + 5 :][:5])
+    # Only the block holding the range is decoded
+    assert mock.call_count == 1
+
+    with patch.object(
+        datalake_archive, "decode_block", wraps=decode_block
+    ) as mock:
+        read = next(datalake_io.read_chunks(path, skip_rows=BLOCK_SIZE + 7))
+    assert read["timestamp"].iloc[0] == series.index[BLOCK_SIZE + 7]
+    assert len(read) == 2 * BLOCK_SIZE - 7
+    # The first block is skipped without decoding it
+    assert mock.call_count == 2
+
+    # Rows skipped across blocks count only the ones in the range
+    read = pd.concat(
+        archive.read(start=series.index[BLOCK_SIZE - 3], skip_rows=5)
+    )
+    assert read["timestamp"].iloc[0] == series.index[BLOCK_SIZE + 2]
+
+
+def test_archive_rejects(tmp_path):
+    path = str(tmp_path / "dump.sla")
+    with pytest.raises(InvalidArchive):
+        datalake_io.open_writer(path, "String")
+    with datalake_io.open_writer(path, "Number") as writer:
+        with pytest.raises(InvalidArchive):
+            writer.write(_series(5).assign(count=1))
+
+    with open(path, "r+b") as fid:
+        fid.truncate(10)
+    with pytest.raises(InvalidArchive):
+        Archive(path)
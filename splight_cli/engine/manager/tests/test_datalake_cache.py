@@ -0,0 +1,107 @@
+import os
+import time
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from splight_cli.engine.manager.datalake_cache import (
+    ORPHAN_AGE,
+    DatalakeCache,
+)
+
+pytest.importorskip("pyarrow")
+
+DATAFRAME = pd.DataFrame(
+    data={
+        "asset": "asset",
+        "attribute": "attribute",
+        "output_format": "Number",
+        "value": [float(i) for i in range(5)],
+    },
+    index=pd.date_range(
+        start="2020-01-01 00:00:00+00:00", periods=5, freq="h"
+    ),
+)
+START = DATAFRAME.index[0]
+END = DATAFRAME.index[-1]
+
+
+def _filters(attribute: str = "attribute") -> dict:
+    return {"asset": "asset", "attribute": attribute}
+
+
+def test_plan_gaps(tmp_path):
+    cache = DatalakeCache(str(tmp_path), workspace="test", max_size=10**9)
+    key = cache.key("Number", _filters())
+    name = cache.write_piece(key, DATAFRAME.iloc[1:3], "Number")
+    cache.add_interval(key, DATAFRAME.index[1], DATAFRAME.index[2], [name], {})
+
+    segments = cache.plan(key, START, END)
+    assert [(start, end) for start, end, _ in segments] == [
+        (START, DATAFRAME.index[1]),
+        (DATAFRAME.index[1], DATAFRAME.index[2]),
+        (DATAFRAME.index[2], END),
+    ]
+    assert [interval is None for _, _, interval in segments] == [
+        True,
+        False,
+        True,
+    ]
+
+
+def test_evict_least_recently_used(tmp_path):
+    cache = DatalakeCache(str(tmp_path), workspace="test", max_size=1)
+    first = cache.key("Number", _filters("first"))
+    second = cache.key("Number", _filters("second"))
+    for key in (first, second):
+        name = cache.write_piece(key, DATAFRAME, "Number")
+        cache.add_interval(key, START, END, [name], {})
+        # Directory times may have a coarse resolution
+        time.sleep(0.01)
+
+    assert cache.plan(first, START, END)[0][2] is None
+    assert cache.plan(second, START, END)[0][2] is not None
+    assert not (tmp_path / first).exists()
+
+
+def test_key_covers_filters(tmp_path):
+    cache = DatalakeCache(str(tmp_path), workspace="test", max_size=10**9)
+    key = cache.key("Number", _filters())
+    assert key == cache.key("Number", dict(reversed(_filters().items())))
+    assert key != cache.key("Number", {**_filters(), "limit_": 10})
+    assert key != cache.key("String", _filters())
+
+
+def test_read_does_not_rewrite_index(tmp_path):
+    cache = DatalakeCache(str(tmp_path), workspace="test", max_size=10**9)
+    key = cache.key("Number", _filters())
+    name = cache.write_piece(key, DATAFRAME, "Number")
+    cache.add_interval(key, START, END, [name], {})
+
+    with patch.object(DatalakeCache, "_write_index") as mock:
+        ((_, _, interval),) = cache.plan(key, START, END)
+        read = pd.concat(cache.read(key, interval, START, END, True))
+    mock.assert_not_called()
+    assert list(read.index) == list(DATAFRAME.index)
+
+
+def test_sweep_interrupted_pieces(tmp_path):
+    cache = DatalakeCache(str(tmp_path), workspace="test", max_size=10**9)
+    key = cache.key("Number", _filters())
+    kept = cache.write_piece(key, DATAFRAME, "Number")
+    cache.add_interval(key, START, END, [kept], {})
+    # Written by fetches interrupted before adding their interval
+    orphan = cache.write_piece(key, DATAFRAME, "Number")
+    running = cache.write_piece(key, DATAFRAME, "Number")
+    expired = time.time() - 2 * ORPHAN_AGE
+    os.utime(tmp_path / key / orphan, (expired, expired))
+    evicted = cache.key("Number", _filters("evicted"))
+    os.utime(
+        tmp_path / evicted / cache.write_piece(evicted, DATAFRAME, "Number"),
+        (expired, expired),
+    )
+
+    DatalakeCache(str(tmp_path), workspace="test", max_size=10**9)
+    assert sorted(os.listdir(tmp_path / key)) == sorted([kept, running])
+    assert not (tmp_path / evicted).exists()
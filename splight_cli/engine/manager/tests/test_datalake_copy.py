@@ -0,0 +1,229 @@
+import json
+import time
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from splight_lib.config import Workspace
+from splight_lib.models import Number
+from splight_lib.settings import SplightAPIVersion
+
+from splight_cli.engine.manager import (
+    DatalakeManager,
+    DatalakeManagerException,
+    datalake_copy,
+)
+from splight_cli.engine.manager.datalake_copy import (
+    WorkspaceDatalake,
+    prefetch,
+    read_remap,
+)
+from splight_cli.engine.manager.exceptions import InvalidManifest
+
+
+class FakeClient:
+    """Datalake of a workspace answering requests from a series in
+    memory, newest points first and at most page_size points per page
+    whatever the limit of the request.
+    """
+
+    def __init__(self, series: pd.Series = None, page_size: int = 10000):
+        self.series = pd.Series(dtype=float) if series is None else series
+        self.page_size = page_size
+        self.saved = []
+
+    def get(self, request: dict) -> dict:
+        start = pd.Timestamp(request["from_timestamp"] or 0, tz="UTC")
+        end = (
+            pd.Timestamp(request["to_timestamp"])
+            if request["to_timestamp"]
+            else self.series.index.max()
+        )
+        selected = self.series[
+            (self.series.index >= start) & (self.series.index <= end)
+        ]
+        (trace,) = request["traces"]
+        newest_first = True
+        for step in trace["pipeline"]:
+            if "$sort" in step:
+                newest_first = step["$sort"]["timestamp"] < 0
+            if "$limit" in step:
+                selected = (
+                    selected.iloc[-step["$limit"] :]
+                    if newest_first
+                    else selected.iloc[: step["$limit"]]
+                )
+        selected = selected.iloc[::-1][: self.page_size]
+        ref_id = trace["ref_id"]
+        return {
+            "results": [
+                {"timestamp": timestamp.isoformat(), ref_id: value}
+                for timestamp, value in selected.items()
+            ]
+        }
+
+    def save(self, records: dict):
+        self.saved.append(records)
+
+
+def _series(points: int) -> pd.Series:
+    return pd.Series(
+        [float(value) for value in range(points)],
+        index=pd.date_range("2020-01-01", periods=points, freq="s", tz="UTC"),
+    )
+
+
+def test_workspace_datalake_round_trip():
+    datalake = WorkspaceDatalake(FakeClient(_series(5)))
+    dataframe = datalake.get_dataframe(
+        Number,
+        asset="asset",
+        attribute="attribute",
+        to_timestamp=pd.Timestamp("2021-01-01", tz="UTC"),
+    )
+    assert list(dataframe.columns) == [
+        "asset",
+        "attribute",
+        "output_format",
+        "value",
+    ]
+    assert list(dataframe["value"]) == [4.0, 3.0, 2.0, 1.0, 0.0]
+
+    datalake.save_dataframe(
+        Number, dataframe.rename_axis("timestamp").reset_index()
+    )
+    (records,) = datalake._client.saved
+    assert records["collection"] == Number._collection_name
+    assert records["records"][0] == {
+        "timestamp": "2020-01-01T00:00:04Z",
+        "asset": "asset",
+        "attribute": "attribute",
+        "output_format": "Number",
+        "value": 4.0,
+    }
+
+
+def test_prefetch_bounds_the_queue():
+    produced = []
+
+    def items():
+        for item in range(10):
+            produced.append(item)
+            yield item
+
+    consumed = []
+    for item in prefetch(items(), maxsize=2):
+        time.sleep(0.01)
+        # The producer runs at most the queue and one item ahead
+        assert len(produced) - len(consumed) <= 4
+        consumed.append(item)
+    assert consumed == list(range(10))
+
+    def failing():
+        yield 1
+        raise ValueError("broken")
+
+    with pytest.raises(ValueError):
+        list(prefetch(failing(), maxsize=1))
+
+
+def test_read_remap(tmp_path):
+    path = tmp_path / "remap.csv"
+    path.write_text("source,target\na,b\nc,d\n")
+    assert read_remap(str(path)) == {"a": "b", "c": "d"}
+    path = tmp_path / "remap.json"
+    path.write_text(json.dumps({"a": "b"}))
+    assert read_remap(str(path)) == {"a": "b"}
+    path.write_text(json.dumps([{"source": "a"}]))
+    with pytest.raises(InvalidManifest):
+        read_remap(str(path))
+
+
+def test_copy_between_workspaces(tmp_path):
+    clients = {
+        "staging": FakeClient(_series(25000)),
+        "production": FakeClient(),
+    }
+    remap = tmp_path / "remap.csv"
+    remap.write_text("source,target\nasset,new-asset\n")
+
+    def from_workspace(cls, name):
+        if name not in clients:
+            raise datalake_copy.InvalidWorkspace(name, "workspace not found")
+        return cls(clients[name], name=name)
+
+    with patch.object(
+        WorkspaceDatalake, "from_workspace", classmethod(from_workspace)
+    ):
+        copied = DatalakeManager(Number).copy(
+            target="production",
+            source="staging",
+            filters={
+                "asset": "asset",
+                "attribute": "attribute",
+                "from_timestamp": "2020-01-01T00:00:00+0000",
+                "to_timestamp": "2020-01-01T12:00:00+0000",
+            },
+            window="2h",
+            workers=2,
+            queue_size=1,
+            remap=str(remap),
+        )
+        with pytest.raises(DatalakeManagerException):
+            DatalakeManager(Number).copy(target="missing", filters={})
+
+    records = [
+        record
+        for saved in clients["production"].saved
+        for record in saved["records"]
+    ]
+    assert copied == len(records) == 25000
+    assert {record["asset"] for record in records} == {"new-asset"}
+    assert sorted(record["value"] for record in records) == list(
+        clients["staging"].series
+    )
+
+
+@patch("splight_cli.engine.manager.manager.DATALAKE_PAGE_SIZE", 50)
+def test_copy_pages_without_window():
+    clients = {
+        "staging": FakeClient(_series(200), page_size=50),
+        "production": FakeClient(),
+    }
+
+    def from_workspace(cls, name):
+        return cls(clients[name], name=name)
+
+    with patch.object(
+        WorkspaceDatalake, "from_workspace", classmethod(from_workspace)
+    ):
+        copied = DatalakeManager(Number).copy(
+            target="production",
+            source="staging",
+            filters={"asset": "asset", "attribute": "attribute"},
+        )
+    records = [
+        record
+        for saved in clients["production"].saved
+        for record in saved["records"]
+    ]
+    assert copied == len(records) == 200
+    assert sorted(record["value"] for record in records) == list(
+        clients["staging"].series
+    )
+
+
+def test_from_workspace_credentials():
+    with patch.object(
+        datalake_copy.SplightConfigManager, "get", return_value=Workspace()
+    ):
+        with pytest.raises(datalake_copy.InvalidWorkspace):
+            WorkspaceDatalake.from_workspace("empty")
+
+
+def test_from_workspace_api_version():
+    with patch.object(
+        datalake_copy.api_settings, "API_VERSION", SplightAPIVersion.V4
+    ):
+        with pytest.raises(datalake_copy.InvalidWorkspace, match="v3"):
+            WorkspaceDatalake.from_workspace("production")
@@ -0,0 +1,69 @@
+import pytest
+from splight_lib.models import Number
+
+from splight_cli.engine.manager import (
+    DatalakeManager,
+    DatalakeManagerException,
+)
+from splight_cli.engine.manager.datalake_dump import (
+    DUMP_FILE_NAME,
+    DumpOptions,
+    dump_path,
+)
+from splight_cli.engine.manager.exceptions import (
+    ExistingOutput,
+    InvalidDumpOptions,
+)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        DumpOptions(resample="1h", incremental=True),
+        DumpOptions(resample="1h", server_side=True, window="1d"),
+        DumpOptions(server_side=True),
+        DumpOptions(sample=0),
+        DumpOptions(sample=10, sample_mode="systematic"),
+        DumpOptions(sample=10, incremental=True),
+        DumpOptions(max_file_size=0),
+        DumpOptions(hive=True, file_format="sqlite"),
+    ],
+)
+def test_check_rejects(options):
+    with pytest.raises(InvalidDumpOptions):
+        options.check()
+
+
+def test_check_accepts():
+    DumpOptions().check()
+    DumpOptions(resample="1h", server_side=True).check()
+    DumpOptions(sample=10, sample_mode="stratified", parallel=4).check()
+    DumpOptions(max_file_size=1024, file_format="sqlite").check()
+
+
+def test_dump_path(tmp_path):
+    path = tmp_path / "dump.csv"
+    assert dump_path(str(path), DumpOptions()) == str(path)
+    path.write_text("timestamp,value\n")
+    with pytest.raises(ExistingOutput, match="already exists"):
+        dump_path(str(path), DumpOptions())
+    assert dump_path(str(path), DumpOptions(incremental=True)) == str(path)
+    assert dump_path(str(tmp_path), DumpOptions(incremental=True)) == str(
+        tmp_path / DUMP_FILE_NAME
+    )
+
+    with pytest.raises(InvalidDumpOptions, match="is a file"):
+        dump_path(str(path), DumpOptions(hive=True))
+    with pytest.raises(ExistingOutput, match="not empty"):
+        dump_path(str(tmp_path), DumpOptions(hive=True))
+    partitions = tmp_path / "partitions"
+    assert dump_path(f"{partitions}/", DumpOptions(hive=True)) == str(
+        partitions
+    )
+
+
+def test_manager_reports_existing_output(tmp_path):
+    path = tmp_path / "dump.csv"
+    path.write_text("timestamp,value\n")
+    with pytest.raises(DatalakeManagerException, match="already exists"):
+        DatalakeManager(Number).dump(path=str(path), filters={})
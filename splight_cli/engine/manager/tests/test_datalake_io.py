@@ -0,0 +1,219 @@
+import os
+import random
+from unittest.mock import patch
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from splight_cli.engine.manager import datalake_io
+from splight_cli.engine.manager.exceptions import (
+    InvalidArrayFile,
+    MissingDependency,
+    UnsupportedFileFormat,
+)
+
+ASSET_ID = str(uuid4())
+ATTR_ID = str(uuid4())
+
+DATAFRAME = pd.DataFrame(
+    data={
+        "asset": [ASSET_ID for _ in range(5)],
+        "attribute": [ATTR_ID for _ in range(5)],
+        "output_format": ["Number" for _ in range(5)],
+        "value": [random.random() for _ in range(5)],
+    },
+    index=pd.date_range(
+        start="2020-01-01 00:00:00+00:00",
+        end="2020-01-01 04:00:00+00:00",
+        freq="h",
+        name="timestamp",
+    ),
+)
+
+
+def test_unsupported_format():
+    with pytest.raises(UnsupportedFileFormat):
+        datalake_io.get_file_format("dump.xlsx")
+
+
+def test_missing_dependency():
+    with patch.object(datalake_io, "pa", None):
+        with pytest.raises(MissingDependency, match=r"splight-cli\[arrow\]"):
+            datalake_io.get_file_format("dump.parquet")
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".feather"])
+def test_arrow_round_trip(tmp_path, extension):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / f"dump{extension}")
+    with datalake_io.open_writer(path, "Number") as writer:
+        writer.write(DATAFRAME.iloc[:2])
+        writer.write(DATAFRAME.iloc[2:])
+    assert writer.rows == 5
+
+    chunks = list(datalake_io.read_chunks(path, chunksize=2))
+    loaded = pd.concat(chunks, ignore_index=True)
+    assert loaded["value"].dtype == "float64"
+    assert list(loaded["timestamp"]) == list(DATAFRAME.index)
+    assert list(loaded["value"]) == list(DATAFRAME["value"])
+
+
+@pytest.mark.parametrize("extension", [".csv", ".parquet", ".feather"])
+def test_read_chunks_skip_rows(tmp_path, extension):
+    if extension != ".csv":
+        pytest.importorskip("pyarrow")
+    path = str(tmp_path / f"dump{extension}")
+    with datalake_io.open_writer(path, "Number") as writer:
+        writer.write(DATAFRAME.iloc[:2])
+        writer.write(DATAFRAME.iloc[2:])
+
+    chunks = list(datalake_io.read_chunks(path, chunksize=2, skip_rows=3))
+    loaded = pd.concat(chunks, ignore_index=True)
+    assert list(pd.to_datetime(loaded["timestamp"], utc=True)) == list(
+        DATAFRAME.index[3:]
+    )
+
+
+@pytest.mark.parametrize(
+    "extension", [".csv.gz", ".csv.bz2", ".csv.xz", ".csv.zst"]
+)
+def test_compressed_csv_append(tmp_path, extension):
+    if extension == ".csv.zst":
+        pytest.importorskip("pyzstd")
+    path = str(tmp_path / f"dump{extension}")
+    with datalake_io.open_writer(path, "Number") as writer:
+        writer.write(DATAFRAME.iloc[:2])
+    with datalake_io.open_writer(path, "Number", append=True) as writer:
+        writer.write(DATAFRAME.iloc[2:])
+
+    chunks = list(datalake_io.read_chunks(path, chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    loaded = pd.concat(chunks, ignore_index=True)
+    assert list(pd.to_datetime(loaded["timestamp"])) == list(DATAFRAME.index)
+
+
+def test_compressed_parquet_not_supported():
+    with pytest.raises(UnsupportedFileFormat):
+        datalake_io.get_file_format("dump.parquet.gz")
+
+
+@pytest.mark.parametrize("pyarrow", [True, False])
+def test_read_typed_csv(tmp_path, pyarrow):
+    if pyarrow:
+        pytest.importorskip("pyarrow")
+    path = str(tmp_path / "dump.csv.gz")
+    with datalake_io.open_writer(path, "Number") as writer:
+        writer.write(DATAFRAME)
+
+    with patch.object(datalake_io, "pa", datalake_io.pa if pyarrow else None):
+        chunks = list(
+            datalake_io.read_chunks(
+                path, chunksize=2, skip_rows=1, value_type="Number"
+            )
+        )
+    assert [len(chunk) for chunk in chunks] == [2, 2]
+    loaded = pd.concat(chunks, ignore_index=True)
+    assert str(loaded["timestamp"].dtype) == "datetime64[ns, UTC]"
+    assert loaded["value"].dtype == "float64"
+    assert list(loaded["timestamp"]) == list(DATAFRAME.index[1:])
+
+
+@pytest.mark.parametrize("pyarrow", [True, False])
+def test_read_csv_without_time_zone(tmp_path, pyarrow):
+    if pyarrow:
+        pytest.importorskip("pyarrow")
+    path = tmp_path / "dump.csv"
+    DATAFRAME.tz_localize(None).to_csv(path)
+
+    with patch.object(datalake_io, "pa", datalake_io.pa if pyarrow else None):
+        loaded = pd.concat(
+            datalake_io.read_chunks(
+                str(path), chunksize=2, value_type="Number"
+            )
+        )
+    # Timestamps without a zone offset are taken as UTC
+    assert list(loaded["timestamp"]) == list(DATAFRAME.index)
+
+
+def test_partitioned_writer(tmp_path):
+    dataframe = pd.DataFrame(
+        {
+            "asset": "asset",
+            "attribute": "attribute",
+            "output_format": "Number",
+            "value": [float(value) for value in range(6)],
+        },
+        index=pd.date_range(
+            "2020-01-01 20:00", periods=6, freq="2h", tz="UTC"
+        ).rename("timestamp"),
+    )
+    root = tmp_path / "dump"
+    with datalake_io.open_partitioned_writer(
+        str(root), "Number", hive=True, max_file_size=1
+    ) as writer:
+        writer.write(dataframe.iloc[:3])
+        writer.write(dataframe.iloc[3:])
+
+    partition = root / "asset=asset" / "attribute=attribute"
+    first_day = sorted(os.listdir(partition / "date=2020-01-01"))
+    second_day = sorted(os.listdir(partition / "date=2020-01-02"))
+    # Every write rolls over since the maximum size is a single byte
+    assert first_day == ["part-00000.csv"]
+    assert second_day == ["part-00000.csv", "part-00001.csv"]
+    read = pd.read_csv(partition / "date=2020-01-02" / "part-00000.csv")
+    assert "asset" not in read.columns
+    assert list(read["value"]) == [2.0]
+
+
+def test_sqlite_round_trip(tmp_path):
+    path = str(tmp_path / "datalake.sqlite")
+    other = DATAFRAME.assign(asset="other", value=DATAFRAME["value"] + 1)
+    with datalake_io.open_writer(path, "Number") as writer:
+        writer.write(DATAFRAME.iloc[3:])
+        writer.write(DATAFRAME.iloc[:3])
+    # Later writes append, replacing the points already stored
+    with datalake_io.open_writer(path, "Number") as writer:
+        writer.write(other)
+        writer.write(DATAFRAME.iloc[:1])
+
+    chunks = list(
+        datalake_io.read_chunks(
+            path, chunksize=4, skip_rows=1, value_type="Number"
+        )
+    )
+    assert [len(chunk) for chunk in chunks] == [4, 4, 1]
+    read = pd.concat(chunks, ignore_index=True)
+    expected = pd.concat([other, DATAFRAME]).sort_values(
+        ["asset", "attribute"], kind="stable"
+    )
+    assert list(read["timestamp"]) == list(expected.index[1:])
+    assert list(read["value"]) == pytest.approx(list(expected["value"][1:]))
+    assert set(datalake_io.read_columns(path)) >= {"timestamp", "value"}
+
+
+def test_npy_round_trip(tmp_path):
+    path = str(tmp_path / "series.npy")
+    with datalake_io.open_writer(path, "Number") as writer:
+        writer.write(DATAFRAME.iloc[:2])
+        writer.write(DATAFRAME.iloc[2:])
+        with pytest.raises(InvalidArrayFile):
+            writer.write(DATAFRAME.assign(attribute="other"))
+    later = DATAFRAME.set_axis(DATAFRAME.index + pd.Timedelta("1D"))
+    with datalake_io.open_writer(path, "Number", append=True) as writer:
+        writer.write(later)
+
+    records = np.load(path, mmap_mode="r")
+    assert isinstance(records, np.memmap)
+    assert records.dtype == datalake_io.NPY_DTYPE
+    expected = pd.concat([DATAFRAME, later])
+    assert list(records["timestamp"]) == list(expected.index.asi8)
+    assert list(records["value"]) == list(expected["value"])
+
+    chunks = list(datalake_io.read_chunks(path, chunksize=4, skip_rows=1))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 1]
+    read = pd.concat(chunks, ignore_index=True)
+    assert list(read["timestamp"]) == list(expected.index[1:])
+    assert set(read["attribute"]) == {ATTR_ID}
+    assert datalake_io.read_columns(path) == list(read.columns)
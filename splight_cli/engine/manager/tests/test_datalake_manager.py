@@ -1,12 +1,30 @@
+import json
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
 from unittest.mock import patch
 from uuid import uuid4
 
 import pandas as pd
 import pytest
-from splight_lib.models import Number
+from splight_lib.models import Boolean, Number, String
+from splight_lib.settings import DatalakeClientType, datalake_settings
 
-from splight_cli.engine.manager import DatalakeManager
+from splight_cli.component.exceptions import InvalidCSVColumns
+from splight_cli.engine.manager import (
+    DatalakeBatchManager,
+    DatalakeManager,
+    DatalakeManagerException,
+    DumpOptions,
+    datalake_io,
+)
+from splight_cli.engine.manager.datalake_ingest import parse_file
+from splight_cli.engine.manager.datalake_profile import SeriesProfile
+from splight_cli.engine.manager.datalake_validation import ValidationReport
+from splight_cli.engine.manager.manager import (
+    FIRST_POINT_PIPELINE,
+    LAST_POINT_PIPELINE,
+)
 
 ASSET_ID = str(uuid4())
 ATTR_ID = str(uuid4())
@@ -37,4 +55,1003 @@ def test_dump(mock_df, model):
             path="./test_dump.csv",
             filters={"asset": ASSET_ID, "attribute": ATTR_ID},
         )
-        mock.assert_called_with(asset=ASSET_ID, attribute=ATTR_ID)
+        # The range starts at the oldest point, then it is fetched by pages
+        mock.assert_any_call(
+            asset=ASSET_ID,
+            attribute=ATTR_ID,
+            extra_pipeline=FIRST_POINT_PIPELINE,
+        )
+        assert mock.call_args.kwargs["asset"] == ASSET_ID
+        assert mock.call_args.kwargs["attribute"] == ATTR_ID
+        assert mock.call_args.kwargs["from_timestamp"] == DATAFRAME.index[0]
+
+
+def _series_source(series: pd.DataFrame, limit: int = 10000):
+    # Like the datalake, pages hold up to limit points whatever the limit
+    # asked for in the query, only a $limit step of the pipeline cuts them
+    def get_dataframe(asset, attribute, from_timestamp=None, **params):
+        to_timestamp = params.get("to_timestamp")
+        selected = series
+        if to_timestamp is not None:
+            selected = selected[selected.index <= to_timestamp]
+        if from_timestamp is not None:
+            selected = selected[selected.index >= from_timestamp]
+        oldest_first = False
+        for step in params.get("extra_pipeline", []):
+            if "$sort" in step:
+                oldest_first = step["$sort"]["timestamp"] > 0
+            if "$limit" in step:
+                selected = (
+                    selected.iloc[: step["$limit"]]
+                    if oldest_first
+                    else selected.iloc[-step["$limit"] :]
+                )
+        return selected.iloc[::-1].iloc[:limit].copy()
+
+    return get_dataframe
+
+
+def test_dump_by_windows(tmp_path):
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "dump.csv")
+    with patch.object(
+        Number, "get_dataframe", side_effect=_series_source(DATAFRAME)
+    ) as mock:
+        manager.dump(
+            path=path,
+            filters={
+                "asset": ASSET_ID,
+                "attribute": ATTR_ID,
+                "from_timestamp": "2020-01-01T00:00:00+0000",
+                "to_timestamp": "2020-01-01T04:00:00+0000",
+            },
+            options=DumpOptions(window="1h"),
+        )
+    assert mock.call_count == 4
+    dumped = pd.read_csv(path, index_col="timestamp", parse_dates=True)
+    assert list(dumped.index) == list(DATAFRAME.index)
+    assert list(dumped["value"]) == pytest.approx(list(DATAFRAME["value"]))
+
+
+def test_load_by_chunks(tmp_path):
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "load.csv")
+    DATAFRAME.rename_axis("timestamp").to_csv(path)
+    with patch.object(Number, "save_dataframe") as mock:
+        manager.load(path=path, chunksize=2)
+    assert mock.call_count == 3
+    batches = [call.args[0] for call in mock.call_args_list]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    loaded = pd.concat(batches)
+    assert list(loaded["timestamp"]) == list(DATAFRAME.index)
+    assert list(loaded["asset"]) == list(DATAFRAME["asset"])
+
+
+def test_dump_manifest(tmp_path):
+    manifest = tmp_path / "manifest.json"
+    series = [
+        {"asset": str(uuid4()), "attribute": str(uuid4()), "type": "Number"}
+        for _ in range(3)
+    ]
+    manifest.write_text(json.dumps(series))
+    manager = DatalakeBatchManager(models={"Number": Number})
+    with patch.object(Number, "get_dataframe", return_value=DATAFRAME):
+        manager.dump(
+            manifest_path=str(manifest),
+            path=str(tmp_path / "dump"),
+            filters={},
+            workers=2,
+        )
+    for item in series:
+        dumped = pd.read_csv(
+            tmp_path / "dump" / f"{item['asset']}_{item['attribute']}.csv"
+        )
+        assert len(dumped) == len(DATAFRAME)
+
+    # A re-run does not append the points again to the series files
+    with patch.object(Number, "get_dataframe", return_value=DATAFRAME):
+        with pytest.raises(DatalakeManagerException, match="already exists"):
+            manager.dump(
+                manifest_path=str(manifest),
+                path=str(tmp_path / "dump"),
+                filters={},
+            )
+    for item in series:
+        dumped = pd.read_csv(
+            tmp_path / "dump" / f"{item['asset']}_{item['attribute']}.csv"
+        )
+        assert len(dumped) == len(DATAFRAME)
+
+    combined = str(tmp_path / "combined.csv")
+    with patch.object(Number, "get_dataframe", return_value=DATAFRAME):
+        manager.dump(
+            manifest_path=str(manifest),
+            path=combined,
+            filters={},
+            combine=True,
+        )
+    assert len(pd.read_csv(combined)) == 3 * len(DATAFRAME)
+
+    manifest.write_text(json.dumps([]))
+    with pytest.raises(DatalakeManagerException, match="No series"):
+        manager.dump(
+            manifest_path=str(manifest),
+            path=str(tmp_path / "empty.csv"),
+            filters={},
+            combine=True,
+        )
+    assert not os.path.exists(tmp_path / "empty.csv")
+
+
+@patch("splight_cli.engine.manager.manager.DATALAKE_PAGE_SIZE", 4)
+def test_dump_by_shards(tmp_path):
+    series = pd.DataFrame(
+        data={
+            "asset": ASSET_ID,
+            "attribute": ATTR_ID,
+            "output_format": "Number",
+            "value": [float(i) for i in range(30)],
+        },
+        index=pd.date_range(
+            start="2020-01-01 00:00:00+00:00", periods=30, freq="h"
+        ),
+    )
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "dump.csv")
+    with patch.object(
+        Number, "get_dataframe", side_effect=_series_source(series, limit=4)
+    ):
+        manager.dump(
+            path=path,
+            filters={
+                "asset": ASSET_ID,
+                "attribute": ATTR_ID,
+                "timestamp__gte": "2020-01-01T00:00:00+0000",
+                "timestamp__lte": "2020-01-02T05:00:00+0000",
+            },
+            options=DumpOptions(parallel=3),
+        )
+    dumped = pd.read_csv(path, index_col="timestamp", parse_dates=True)
+    assert list(dumped.index) == list(series.index)
+    assert list(dumped["value"]) == list(series["value"])
+
+
+def test_incremental_dump(tmp_path):
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "dump.csv")
+    filters = {"asset": ASSET_ID, "attribute": ATTR_ID}
+    with patch.object(
+        Number, "get_dataframe", return_value=DATAFRAME.iloc[:3]
+    ):
+        manager.dump(
+            path=path, filters=filters, options=DumpOptions(incremental=True)
+        )
+    with patch.object(
+        Number, "get_dataframe", side_effect=_series_source(DATAFRAME)
+    ) as mock:
+        manager.dump(
+            path=path,
+            filters={**filters, "to_timestamp": "2020-01-01T04:00:00+0000"},
+            options=DumpOptions(incremental=True),
+        )
+    assert mock.call_args.kwargs["from_timestamp"] == DATAFRAME.index[2]
+
+    dumped = pd.read_csv(path, index_col="timestamp", parse_dates=True)
+    assert list(dumped.index) == list(DATAFRAME.index)
+    watermarks = datalake_io.read_watermarks(path)
+    assert (
+        pd.Timestamp(watermarks[f"{ASSET_ID}/{ATTR_ID}"])
+        == (DATAFRAME.index[-1])
+    )
+
+
+@patch("splight_cli.engine.manager.manager.DATALAKE_PAGE_SIZE", 50)
+def test_incremental_dump_pages(tmp_path):
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "dump.csv")
+    series = pd.DataFrame(
+        {
+            "asset": ASSET_ID,
+            "attribute": ATTR_ID,
+            "value": [float(value) for value in range(200)],
+        },
+        index=pd.date_range("2020-01-01", periods=200, freq="min", tz="UTC"),
+    )
+    filters = {"asset": ASSET_ID, "attribute": ATTR_ID}
+    with patch.object(
+        Number,
+        "get_dataframe",
+        side_effect=_series_source(series.iloc[:20], limit=50),
+    ):
+        manager.dump(
+            path=path, filters=filters, options=DumpOptions(incremental=True)
+        )
+    # More new points than a page, without a window
+    with patch.object(
+        Number, "get_dataframe", side_effect=_series_source(series, limit=50)
+    ):
+        manager.dump(
+            path=path, filters=filters, options=DumpOptions(incremental=True)
+        )
+
+    dumped = pd.read_csv(path, index_col="timestamp", parse_dates=True)
+    assert list(dumped.index) == list(series.index)
+    watermarks = datalake_io.read_watermarks(path)
+    assert (
+        pd.Timestamp(watermarks[f"{ASSET_ID}/{ATTR_ID}"]) == (series.index[-1])
+    )
+
+
+@pytest.mark.parametrize("name", ["dump.csv.gz", "dump.npy", "dump.sla"])
+def test_incremental_dump_watermark_follows_disk(tmp_path, name):
+    path = str(tmp_path / name)
+    series = DATAFRAME.drop(columns=["instance_id", "instance_type"])
+    write_watermarks = datalake_io.write_watermarks
+    on_disk = []
+
+    def check_on_disk(path, watermarks):
+        # A resumed dump starts after the watermark, so every row up to it
+        # must already be readable from the file
+        watermark = pd.Timestamp(watermarks[f"{ASSET_ID}/{ATTR_ID}"])
+        dumped = pd.concat(datalake_io.read_chunks(path, chunksize=100))
+        assert pd.to_datetime(dumped["timestamp"], utc=True).max() >= (
+            watermark
+        )
+        on_disk.append(watermark)
+        write_watermarks(path, watermarks)
+
+    with (
+        patch.object(
+            Number, "get_dataframe", side_effect=_series_source(series)
+        ),
+        patch.object(
+            datalake_io, "write_watermarks", side_effect=check_on_disk
+        ),
+    ):
+        DatalakeManager(Number).dump(
+            path=path,
+            filters={
+                "asset": ASSET_ID,
+                "attribute": ATTR_ID,
+                "from_timestamp": "2020-01-01T00:00:00+0000",
+                "to_timestamp": "2020-01-01T04:00:00+0000",
+            },
+            options=DumpOptions(window="1h", incremental=True),
+        )
+    assert on_disk[-1] == series.index[-1]
+
+
+def test_resume_load(tmp_path):
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "load.csv")
+    DATAFRAME.rename_axis("timestamp").to_csv(path)
+    with patch.object(
+        Number, "save_dataframe", side_effect=[None, Exception("timeout")]
+    ):
+        with pytest.raises(Exception, match="timeout"):
+            manager.load(path=path, chunksize=2)
+
+    with patch.object(Number, "save_dataframe") as mock:
+        manager.load(path=path, chunksize=2, resume=True)
+    loaded = pd.concat([call.args[0] for call in mock.call_args_list])
+    assert list(loaded["timestamp"]) == list(DATAFRAME.index[2:])
+
+    manifest = datalake_io.read_upload_manifest(path)
+    assert manifest["complete"]
+    assert [batch["offset"] for batch in manifest["batches"]] == [0, 2, 4]
+
+
+def test_resume_load_skips_saved_prefix(tmp_path):
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "load.csv")
+    DATAFRAME.rename_axis("timestamp").to_csv(path)
+    with patch.object(
+        Number,
+        "save_dataframe",
+        side_effect=[None, None, Exception("timeout")],
+    ):
+        with pytest.raises(Exception, match="timeout"):
+            manager.load(path=path, chunksize=2)
+
+    with (
+        patch.object(Number, "save_dataframe") as mock,
+        patch.object(
+            datalake_io, "read_chunks", wraps=datalake_io.read_chunks
+        ) as mock_read,
+    ):
+        manager.load(path=path, chunksize=2, resume=True)
+    # Only the last saved batch is read again, to check it
+    assert mock_read.call_args.kwargs["skip_rows"] == 2
+    loaded = pd.concat([call.args[0] for call in mock.call_args_list])
+    assert list(loaded["timestamp"]) == list(DATAFRAME.index[4:])
+
+
+def test_resume_load_checks_batches(tmp_path):
+    manager = DatalakeManager(Number)
+    path = tmp_path / "load.csv"
+    DATAFRAME.rename_axis("timestamp").to_csv(path)
+    with patch.object(
+        Number, "save_dataframe", side_effect=[None, Exception("timeout")]
+    ):
+        with pytest.raises(Exception, match="timeout"):
+            manager.load(path=str(path), chunksize=2)
+
+    # Other batch sizes would not match the ones saved
+    with patch.object(Number, "save_dataframe") as mock:
+        with pytest.raises(DatalakeManagerException, match="chunk size"):
+            manager.load(path=str(path), chunksize=3, resume=True)
+    mock.assert_not_called()
+
+    # Same size and time, but a value saved before is different now
+    stat = os.stat(path)
+    content = path.read_text()
+    first_value = f"{DATAFRAME['value'].iloc[0]}"
+    path.write_text(content.replace(first_value, "9" * len(first_value), 1))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    with patch.object(Number, "save_dataframe") as mock:
+        with pytest.raises(DatalakeManagerException, match="row 0 differs"):
+            manager.load(path=str(path), chunksize=2, resume=True)
+    mock.assert_not_called()
+
+
+def test_dump_with_cache(tmp_path):
+    pytest.importorskip("pyarrow")
+    manager = DatalakeManager(Number)
+    filters = {
+        "asset": ASSET_ID,
+        "attribute": ATTR_ID,
+        "from_timestamp": "2020-01-01T00:00:00+0000",
+    }
+    cache_path = str(tmp_path / "cache")
+    with (
+        patch(
+            "splight_cli.engine.manager.manager.DATALAKE_CACHE_PATH",
+            cache_path,
+        ),
+        patch.object(
+            Number, "get_dataframe", side_effect=_series_source(DATAFRAME)
+        ) as mock,
+    ):
+        manager.dump(
+            path=str(tmp_path / "first.csv"),
+            filters={**filters, "to_timestamp": "2020-01-01T02:00:00+0000"},
+            options=DumpOptions(cache_size=1024 * 1024),
+        )
+        manager.dump(
+            path=str(tmp_path / "second.csv"),
+            filters={**filters, "to_timestamp": "2020-01-01T04:00:00+0000"},
+            options=DumpOptions(cache_size=1024 * 1024),
+        )
+    assert mock.call_count == 2
+    assert mock.call_args.kwargs["from_timestamp"] == DATAFRAME.index[2]
+    dumped = pd.read_csv(
+        tmp_path / "second.csv", index_col="timestamp", parse_dates=True
+    )
+    assert list(dumped.index) == list(DATAFRAME.index)
+
+
+@patch("splight_cli.engine.manager.datalake_upload.time.sleep")
+def test_concurrent_load_with_retries(mock_sleep, tmp_path):
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "load.csv")
+    DATAFRAME.rename_axis("timestamp").to_csv(path)
+    with patch.object(
+        Number,
+        "save_dataframe",
+        side_effect=[Exception("throttled"), None, None, None],
+    ) as mock:
+        manager.load(path=path, chunksize=2, workers=3)
+    assert mock.call_count == 4
+    assert mock_sleep.call_count == 1
+    manifest = datalake_io.read_upload_manifest(path)
+    assert sorted(batch["offset"] for batch in manifest["batches"]) == [
+        0,
+        2,
+        4,
+    ]
+
+
+def test_load_saves_through_a_sync_client(tmp_path):
+    path = str(tmp_path / "load.csv")
+    DATAFRAME.rename_axis("timestamp").to_csv(path)
+    client_type = datalake_settings.DL_CLIENT_TYPE
+    with patch(
+        "splight_lib.models._v3.datalake.DatalakeClientBuilder.build"
+    ) as mock_build:
+        DatalakeManager(Number).load(path=path, chunksize=2, workers=2)
+    # Saves return once the records are stored, not when they are buffered
+    assert {
+        call.kwargs["dl_client_type"] for call in mock_build.call_args_list
+    } == {DatalakeClientType.SYNC}
+    assert mock_build.return_value.save.call_count == 3
+    assert datalake_settings.DL_CLIENT_TYPE == client_type
+
+
+def test_load_dry_run(tmp_path):
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "load.csv")
+    invalid = DATAFRAME.astype({"value": object}).rename_axis("timestamp")
+    invalid.iloc[1, invalid.columns.get_loc("value")] = "not a number"
+    invalid.to_csv(path)
+    with (
+        patch.object(Number, "save_dataframe") as mock,
+        patch.object(ValidationReport, "add", autospec=True) as mock_add,
+    ):
+        manager.load(path=path, chunksize=2, dry_run=True)
+    mock.assert_not_called()
+    issues = [call.args[2] for call in mock_add.call_args_list]
+    assert [batch["non Number value"] for batch in issues] == [1, 0, 0]
+    assert not os.path.exists(datalake_io.upload_manifest_path(path))
+
+
+def test_load_invalid_batch(tmp_path):
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "load.csv")
+    invalid = DATAFRAME.rename_axis("timestamp").reset_index()
+    invalid.loc[3, "output_format"] = "String"
+    invalid.to_csv(path, index=False)
+    with patch.object(Number, "save_dataframe") as mock:
+        with pytest.raises(DatalakeManagerException, match="row 2"):
+            manager.load(path=path, chunksize=2)
+    assert mock.call_count == 1
+
+
+@pytest.mark.parametrize("pyarrow", [True, False])
+def test_load_unparsable_batch(tmp_path, pyarrow):
+    if pyarrow:
+        pytest.importorskip("pyarrow")
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "load.csv")
+    invalid = DATAFRAME.astype({"value": object}).rename_axis("timestamp")
+    invalid.iloc[1, invalid.columns.get_loc("value")] = "not a number"
+    invalid.to_csv(path)
+    with (
+        patch.object(Number, "save_dataframe") as mock,
+        patch.object(datalake_io, "pa", datalake_io.pa if pyarrow else None),
+    ):
+        with pytest.raises(DatalakeManagerException, match="--dry-run"):
+            manager.load(path=path, chunksize=2)
+    mock.assert_not_called()
+
+
+def test_load_missing_columns(tmp_path):
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "load.csv")
+    DATAFRAME.drop(columns="value").rename_axis("timestamp").to_csv(path)
+    with patch("pandas.read_csv", wraps=pd.read_csv) as mock:
+        with pytest.raises(InvalidCSVColumns):
+            manager.load(path=path, chunksize=2)
+    assert mock.call_args.kwargs["nrows"] == 0
+
+
+def test_load_many_files(tmp_path):
+    manager = DatalakeManager(Number)
+    data = DATAFRAME.rename_axis("timestamp")
+    data.iloc[:2].to_csv(tmp_path / "day1.csv")
+    data.iloc[2:].to_csv(tmp_path / "day2.csv")
+    invalid = data.reset_index()
+    invalid.loc[0, "output_format"] = "String"
+    invalid.to_csv(tmp_path / "day3.csv", index=False)
+    (tmp_path / "notes.txt").write_text("not a datalake file")
+
+    with (
+        patch.object(Number, "save_dataframe") as mock,
+        patch(
+            "splight_cli.engine.manager.manager.ProcessPoolExecutor",
+            wraps=ProcessPoolExecutor,
+        ) as mock_pool,
+    ):
+        manager.load(path=str(tmp_path), workers=2, processes=2)
+    # Parse workers are not forked from the running upload threads
+    mp_context = mock_pool.call_args.kwargs["mp_context"]
+    assert mp_context.get_start_method() == "spawn"
+    loaded = pd.concat([call.args[0] for call in mock.call_args_list])
+    assert sorted(loaded["timestamp"]) == list(DATAFRAME.index)
+    for name in ["day1.csv", "day2.csv"]:
+        manifest = datalake_io.read_upload_manifest(str(tmp_path / name))
+        assert manifest["complete"]
+    assert not os.path.exists(
+        datalake_io.upload_manifest_path(str(tmp_path / "day3.csv"))
+    )
+
+    # Files already loaded are skipped when resuming a glob
+    with patch.object(Number, "save_dataframe") as mock:
+        manager.load(path=str(tmp_path / "day*.csv"), resume=True, processes=1)
+    mock.assert_not_called()
+
+
+def test_load_reports_unreadable_files(tmp_path):
+    path = tmp_path / "load.csv"
+    DATAFRAME.rename_axis("timestamp").to_csv(path)
+    path.write_bytes(path.read_bytes().replace(b"Component", b"\xff", 1))
+    parsed = parse_file(str(path), "Number", None, {})
+    assert parsed.batches == []
+    assert "decode" in parsed.error
+
+    with pytest.raises(DatalakeManagerException, match="not found"):
+        DatalakeManager(Number).load(path=str(tmp_path / "missing.csv"))
+
+
+def test_merge_load(tmp_path):
+    manager = DatalakeManager(Number)
+    data = DATAFRAME.rename_axis("timestamp")
+    data.iloc[[0, 2, 4]].to_csv(tmp_path / "first.csv")
+    data.iloc[[1, 2, 3]].to_csv(tmp_path / "second.csv")
+
+    with patch.object(Number, "save_dataframe") as mock:
+        manager.load(path=str(tmp_path), chunksize=1, merge=True)
+    loaded = pd.concat([call.args[0] for call in mock.call_args_list])
+    assert list(loaded["timestamp"]) == list(DATAFRAME.index)
+
+    with pytest.raises(DatalakeManagerException, match="concurrent"):
+        manager.load(path=str(tmp_path), merge=True, workers=2)
+
+
+def test_dump_resampled(tmp_path):
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "dump.csv")
+    series = pd.DataFrame(
+        {
+            "asset": ASSET_ID,
+            "attribute": ATTR_ID,
+            "output_format": "Number",
+            "value": [float(value) for value in range(240)],
+        },
+        index=pd.date_range("2020-01-01", periods=240, freq="min", tz="UTC"),
+    )
+    with patch.object(
+        Number, "get_dataframe", side_effect=_series_source(series)
+    ):
+        manager.dump(
+            path=path,
+            filters={
+                "asset": ASSET_ID,
+                "attribute": ATTR_ID,
+                "from_timestamp": "2020-01-01T00:00:00+0000",
+                "to_timestamp": "2020-01-01T03:59:00+0000",
+            },
+            options=DumpOptions(
+                window="25min", resample="1h", aggregations=["mean"]
+            ),
+        )
+    dumped = pd.read_csv(path, index_col="timestamp", parse_dates=True)
+    expected = series["value"].resample("1h").mean()
+    assert list(dumped.index) == list(expected.index)
+    assert list(dumped["value"]) == list(expected)
+
+
+def test_dump_resampled_server_side(tmp_path):
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "dump.csv")
+    buckets = pd.DataFrame(
+        {
+            "asset": ASSET_ID,
+            "attribute": ATTR_ID,
+            "output_format": "Number",
+            "value": [float(value) for value in range(5)],
+        },
+        index=pd.date_range("2020-01-01", periods=5, freq="h", tz="UTC"),
+    )
+    with (
+        patch("splight_cli.engine.manager.manager.DATALAKE_PAGE_SIZE", 2),
+        patch.object(
+            Number,
+            "get_dataframe",
+            side_effect=_series_source(buckets, limit=2),
+        ) as mock,
+    ):
+        manager.dump(
+            path=path,
+            filters={
+                "asset": ASSET_ID,
+                "attribute": ATTR_ID,
+                "from_timestamp": "2020-01-01T00:00:00+0000",
+                "to_timestamp": "2020-01-01T04:00:00+0000",
+            },
+            options=DumpOptions(
+                resample="1h", aggregations=["max", "count"], server_side=True
+            ),
+        )
+    pipelines = [call.kwargs["extra_pipeline"] for call in mock.call_args_list]
+    assert {str(pipeline[1]["$group"]["value"]) for pipeline in pipelines} == {
+        "{'$max': '$value'}",
+        "{'$sum': 1}",
+    }
+    dumped = pd.read_csv(path, index_col="timestamp", parse_dates=True)
+    assert list(dumped.index) == list(buckets.index)
+    assert list(dumped["value"]) == list(buckets["value"])
+
+    with pytest.raises(DatalakeManagerException, match="last"):
+        manager.dump(
+            path=str(tmp_path / "other.csv"),
+            filters={"asset": ASSET_ID, "attribute": ATTR_ID},
+            options=DumpOptions(
+                resample="1h", aggregations=["last"], server_side=True
+            ),
+        )
+
+
+def test_dump_wide(tmp_path):
+    first, second = str(uuid4()), str(uuid4())
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(
+        json.dumps(
+            [
+                {"asset": first, "attribute": ATTR_ID, "type": "Number"},
+                {"asset": second, "attribute": ATTR_ID, "type": "Number"},
+            ]
+        )
+    )
+    sources = {
+        # The first series has a point before the range to carry forward
+        first: _series_source(
+            pd.DataFrame(
+                {"value": [1.0, 2.0, 3.0]},
+                index=pd.to_datetime(
+                    [
+                        "2019-12-31 23:50",
+                        "2020-01-01 00:40",
+                        "2020-01-01 02:10",
+                    ],
+                    utc=True,
+                ),
+            )
+        ),
+        second: _series_source(
+            pd.DataFrame(
+                {"value": [10.0, 20.0]},
+                index=pd.to_datetime(
+                    ["2020-01-01 00:00", "2020-01-01 01:00"], utc=True
+                ),
+            )
+        ),
+    }
+    manager = DatalakeBatchManager(models={"Number": Number})
+    path = str(tmp_path / "wide.csv")
+    with patch.object(
+        Number,
+        "get_dataframe",
+        side_effect=lambda asset, **params: sources[asset](asset, **params),
+    ) as mock:
+        manager.dump_wide(
+            manifest_path=str(manifest),
+            path=path,
+            filters={
+                "from_timestamp": "2020-01-01T00:00:00+0000",
+                "to_timestamp": "2020-01-01T03:00:00+0000",
+            },
+            grid="30min",
+            window="1h",
+            tolerance="90min",
+        )
+    # The points before the range are seeded with the newest one only
+    seeds = [
+        call for call in mock.call_args_list if "extra_pipeline" in call.kwargs
+    ]
+    assert len(seeds) == 2
+    assert all(
+        call.kwargs["extra_pipeline"] == LAST_POINT_PIPELINE for call in seeds
+    )
+    wide = pd.read_csv(path, index_col="timestamp", parse_dates=True)
+    assert len(wide) == 7
+    assert list(wide[f"{first}/{ATTR_ID}"]) == [1, 1, 2, 2, 2, 3, 3]
+    # The last grid point is further than the tolerance from 01:00
+    second_values = wide[f"{second}/{ATTR_ID}"]
+    assert second_values.tolist()[:6] == [10, 10, 20, 20, 20, 20]
+    assert second_values.isna().tolist()[6:] == [True]
+
+    # Database tables are keyed on asset and attribute, not wide columns
+    with patch.object(Number, "get_dataframe") as mock:
+        with pytest.raises(DatalakeManagerException):
+            manager.dump_wide(
+                manifest_path=str(manifest),
+                path=str(tmp_path / "wide.sqlite"),
+                filters={"from_timestamp": "2020-01-01T00:00:00+0000"},
+                grid="30min",
+            )
+    mock.assert_not_called()
+    assert not os.path.exists(tmp_path / "wide.sqlite")
+
+
+def test_partitioned_dump(tmp_path):
+    pytest.importorskip("pyarrow")
+    manager = DatalakeManager(Number)
+    path = tmp_path / "dump"
+    with patch.object(
+        Number, "get_dataframe", side_effect=_series_source(DATAFRAME)
+    ):
+        manager.dump(
+            path=str(path),
+            filters={
+                "asset": ASSET_ID,
+                "attribute": ATTR_ID,
+                "from_timestamp": "2020-01-01T00:00:00+0000",
+                "to_timestamp": "2020-01-01T04:00:00+0000",
+            },
+            options=DumpOptions(window="2h", hive=True, file_format="parquet"),
+        )
+    partition = path / f"asset={ASSET_ID}" / f"attribute={ATTR_ID}"
+    files = os.listdir(partition / "date=2020-01-01")
+    assert files == ["part-00000.parquet"]
+    dumped = pd.read_parquet(partition / "date=2020-01-01" / files[0])
+    assert list(dumped["value"]) == pytest.approx(list(DATAFRAME["value"]))
+
+
+def test_load_routed_by_output_format(tmp_path):
+    path = str(tmp_path / "mixed.csv")
+    mixed = DATAFRAME.rename_axis("timestamp").reset_index()
+    mixed["output_format"] = [
+        "Number",
+        "String",
+        "Boolean",
+        "Number",
+        "Boolean",
+    ]
+    mixed["value"] = [1.5, "on", "true", 2.5, "False"]
+    mixed.to_csv(path, index=False)
+
+    manager = DatalakeBatchManager(
+        models={"Number": Number, "String": String, "Boolean": Boolean}
+    )
+    with (
+        patch.object(Number, "save_dataframe") as number,
+        patch.object(String, "save_dataframe") as string,
+        patch.object(Boolean, "save_dataframe") as boolean,
+    ):
+        manager.load(path=path, chunksize=3)
+    numbers = pd.concat([call.args[0] for call in number.call_args_list])
+    assert list(numbers["value"]) == [1.5, 2.5]
+    assert string.call_args.args[0]["value"].tolist() == ["on"]
+    booleans = pd.concat([call.args[0] for call in boolean.call_args_list])
+    assert booleans["value"].tolist() == [True, False]
+
+    mixed.loc[1, "output_format"] = "Unknown"
+    mixed.to_csv(path, index=False)
+    with pytest.raises(DatalakeManagerException, match="Unknown"):
+        manager.load(path=path)
+
+
+def test_load_routed_files(tmp_path, capsys):
+    rows = DATAFRAME.rename_axis("timestamp").reset_index()
+    rows["timestamp"] = rows["timestamp"].dt.strftime("%d/%m/%Y %H:%M")
+    rows.iloc[:2].to_csv(tmp_path / "day1.csv", index=False)
+    rows.iloc[2:].to_csv(tmp_path / "day2.csv", index=False)
+
+    manager = DatalakeBatchManager(models={"Number": Number})
+    with patch.object(Number, "save_dataframe") as mock:
+        manager.load(
+            path=str(tmp_path / "day*.csv"),
+            timestamp_format="%d/%m/%Y %H:%M",
+        )
+    loaded = pd.concat([call.args[0] for call in mock.call_args_list])
+    assert list(loaded["timestamp"]) == list(DATAFRAME.index)
+    # Each file reports its own rows
+    output = capsys.readouterr().out
+    assert "day1.csv: 2 Number" in output
+    assert "day2.csv: 3 Number" in output
+
+
+@patch("splight_cli.engine.manager.manager.time.sleep")
+def test_tail(mock_sleep, tmp_path, capsys):
+    manager = DatalakeManager(Number)
+    now = pd.Timestamp.now(tz="UTC").floor("s")
+    first = pd.DataFrame(
+        {"asset": ASSET_ID, "attribute": ATTR_ID, "value": [1.0, 2.0]},
+        index=[now - pd.Timedelta("2s"), now - pd.Timedelta("1s")],
+    )
+    second = pd.DataFrame(
+        {"asset": ASSET_ID, "attribute": ATTR_ID, "value": [3.0]},
+        index=[now + pd.Timedelta("1s")],
+    )
+    responses = [first, first.iloc[1:], first.iloc[1:], second]
+    with patch.object(Number, "get_dataframe", side_effect=responses) as mock:
+        manager.tail(
+            filters={"asset": ASSET_ID, "attribute": ATTR_ID},
+            since="1min",
+            interval=1,
+            max_interval=3,
+            output="ndjson",
+            max_polls=4,
+        )
+    printed = [
+        json.loads(line) for line in capsys.readouterr().out.splitlines()
+    ]
+    assert [point["value"] for point in printed] == [1.0, 2.0, 3.0]
+    # The watermark moves to the last printed point
+    assert mock.call_args_list[1].kwargs["from_timestamp"] == (
+        now - pd.Timedelta("1s")
+    )
+    # Waits double without new data and reset when it arrives
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [1, 2, 3]
+
+
+@patch("splight_cli.engine.manager.manager.time.sleep")
+def test_tail_table_shows_markup_as_text(mock_sleep, capsys):
+    now = pd.Timestamp.now(tz="UTC").floor("s")
+    points = pd.DataFrame(
+        {"asset": ASSET_ID, "attribute": ATTR_ID, "value": ["[b]on[/b]"]},
+        index=[now - pd.Timedelta("1s")],
+    )
+    with patch.object(String, "get_dataframe", return_value=points):
+        DatalakeManager(String).tail(
+            filters={"asset": ASSET_ID, "attribute": ATTR_ID},
+            since="1min",
+            max_polls=1,
+        )
+    assert "[b]on[/b]" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("mode", ["reservoir", "stratified"])
+def test_dump_sample(tmp_path, mode):
+    manager = DatalakeManager(Number)
+    path = str(tmp_path / "sample.csv")
+    series = pd.DataFrame(
+        {
+            "asset": ASSET_ID,
+            "attribute": ATTR_ID,
+            "value": [float(value) for value in range(600)],
+        },
+        index=pd.date_range("2020-01-01", periods=600, freq="min", tz="UTC"),
+    )
+    with patch.object(
+        Number, "get_dataframe", side_effect=_series_source(series)
+    ) as mock:
+        manager.dump(
+            path=path,
+            filters={
+                "asset": ASSET_ID,
+                "attribute": ATTR_ID,
+                "from_timestamp": "2020-01-01T00:00:00+0000",
+                "to_timestamp": "2020-01-01T09:59:00+0000",
+            },
+            options=DumpOptions(sample=20, sample_mode=mode, seed=1),
+        )
+    dumped = pd.read_csv(path, index_col="timestamp", parse_dates=True)
+    assert len(dumped) == 20
+    assert dumped.index.is_monotonic_increasing
+    assert set(dumped["value"]) <= set(series["value"])
+    if mode == "stratified":
+        assert mock.call_count == 20
+        # Each probe asks the datalake for its newest point only
+        assert all(
+            call.kwargs["extra_pipeline"] == LAST_POINT_PIPELINE
+            for call in mock.call_args_list
+        )
+
+
+@patch("splight_cli.engine.manager.manager.DATALAKE_PAGE_SIZE", 50)
+def test_dump_sample_pages(tmp_path, capsys):
+    series = _uneven_series()
+    with patch.object(
+        Number, "get_dataframe", side_effect=_series_source(series, limit=50)
+    ):
+        DatalakeManager(Number).dump(
+            path=str(tmp_path / "sample.csv"),
+            filters={"asset": ASSET_ID, "attribute": ATTR_ID},
+            options=DumpOptions(sample=20, seed=1),
+        )
+    assert f"Sampled 20 of {len(series)} points" in capsys.readouterr().out
+
+
+def test_dump_and_load_sqlite(tmp_path):
+    path = str(tmp_path / "datalake.db")
+    other = DATAFRAME.assign(attribute=str(uuid4()))
+    for series in [DATAFRAME, other]:
+        with patch.object(Number, "get_dataframe", return_value=series):
+            DatalakeManager(Number).dump(
+                path=path,
+                filters={
+                    "asset": ASSET_ID,
+                    "attribute": series["attribute"].iloc[0],
+                },
+            )
+
+    with patch.object(Number, "save_dataframe") as mock:
+        DatalakeManager(Number).load(path=path, chunksize=4)
+    loaded = pd.concat([call.args[0] for call in mock.call_args_list])
+    assert len(loaded) == 2 * len(DATAFRAME)
+    assert set(loaded["attribute"]) == {ATTR_ID, other["attribute"].iloc[0]}
+
+
+def test_dump_and_load_archive(tmp_path):
+    path = str(tmp_path / "dump.sla")
+    series = DATAFRAME.drop(columns=["instance_id", "instance_type"])
+    with patch.object(Number, "get_dataframe", return_value=series):
+        DatalakeManager(Number).dump(
+            path=path, filters={"asset": ASSET_ID, "attribute": ATTR_ID}
+        )
+
+    with patch.object(Number, "save_dataframe") as mock:
+        DatalakeManager(Number).load(path=path, chunksize=2)
+    loaded = pd.concat(
+        [call.args[0] for call in mock.call_args_list], ignore_index=True
+    )
+    expected = series.rename_axis("timestamp").reset_index()
+    pd.testing.assert_frame_equal(loaded[expected.columns], expected)
+
+    with pytest.raises(DatalakeManagerException):
+        with patch.object(String, "get_dataframe", return_value=series):
+            DatalakeManager(String).dump(
+                path=str(tmp_path / "string.sla"),
+                filters={"asset": ASSET_ID, "attribute": ATTR_ID},
+            )
+
+
+def _uneven_series() -> pd.DataFrame:
+    """Returns a series a second apart followed by one a minute apart, so
+    shards sized after its newest page overflow in the older part.
+    """
+    index = pd.date_range(
+        "2020-01-01", periods=500, freq="s", tz="UTC"
+    ).append(
+        pd.date_range("2020-01-01 01:00", periods=100, freq="min", tz="UTC")
+    )
+    return pd.DataFrame(
+        {
+            "asset": ASSET_ID,
+            "attribute": ATTR_ID,
+            "value": [float(value % 7) for value in range(len(index))],
+        },
+        index=index,
+    )
+
+
+@patch("splight_cli.engine.manager.manager.DATALAKE_PAGE_SIZE", 50)
+def test_profile_pages():
+    series = _uneven_series()
+    chunks = []
+    add = SeriesProfile.add
+
+    def record(profile, dataframe):
+        chunks.append(dataframe)
+        add(profile, dataframe)
+
+    with (
+        patch.object(
+            Number,
+            "get_dataframe",
+            side_effect=_series_source(series, limit=50),
+        ),
+        patch.object(SeriesProfile, "add", record),
+    ):
+        report = DatalakeManager(Number).profile(
+            filters={"asset": ASSET_ID, "attribute": ATTR_ID}, output="json"
+        )
+    assert report["rows"] == len(series)
+    # Profiled at most a page at a time, in order
+    assert max(len(chunk) for chunk in chunks) <= 50
+    assert list(pd.concat(chunks).index) == list(series.index)
+
+
+def test_profile(capsys):
+    series = pd.DataFrame(
+        {
+            "asset": ASSET_ID,
+            "attribute": ATTR_ID,
+            "value": [float(value % 7) for value in range(600)],
+        },
+        index=pd.date_range("2020-01-01", periods=600, freq="min", tz="UTC"),
+    ).drop(pd.Timestamp("2020-01-01 05:00", tz="UTC"))
+    with patch.object(
+        Number, "get_dataframe", side_effect=_series_source(series)
+    ) as mock:
+        report = DatalakeManager(Number).profile(
+            filters={
+                "asset": ASSET_ID,
+                "attribute": ATTR_ID,
+                "from_timestamp": "2020-01-01T00:00:00+0000",
+                "to_timestamp": "2020-01-01T09:59:00+0000",
+            },
+            window="1h",
+            gap="90s",
+            output="json",
+        )
+    # One query per window, each profiled as it arrives
+    assert mock.call_count == 10
+    assert report["rows"] == len(series)
+    assert report["gaps"] == 1
+    assert report["nominal_interval"] == str(pd.Timedelta("1min"))
+    assert json.loads(capsys.readouterr().out.splitlines()[-1]) == report
+
+    with pytest.raises(DatalakeManagerException):
+        DatalakeManager(Number).profile(filters={}, output="csv")
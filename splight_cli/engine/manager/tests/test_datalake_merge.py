@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from splight_cli.engine.manager.datalake_merge import SortedMerge
+from splight_cli.engine.manager.exceptions import UnsortedFile
+
+
+def _frame(minutes, attribute="attr", value=0.0):
+    return pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(minutes, unit="m", utc=True),
+            "asset": "asset",
+            "attribute": attribute,
+            "value": value,
+        }
+    )
+
+
+def _chunks(dataframe, size):
+    return (
+        dataframe.iloc[start : start + size]
+        for start in range(0, len(dataframe), size)
+    )
+
+
+def test_merge_sorts_and_drops_duplicates():
+    first = _frame([0, 2, 4, 6, 8], value=1.0)
+    second = pd.concat(
+        [_frame([1, 2, 3, 8, 9], value=2.0), _frame([2], attribute="other")]
+    ).sort_values("timestamp", kind="stable")
+    merge = SortedMerge(
+        [("first", _chunks(first, 2)), ("second", _chunks(second, 4))]
+    )
+    merged = pd.concat(list(merge), ignore_index=True)
+
+    assert merged["timestamp"].is_monotonic_increasing
+    assert not merged.duplicated(["timestamp", "asset", "attribute"]).any()
+    assert merge.rows == len(merged) == 9
+    assert merge.duplicates == 2
+    # The first input wins for the points in both
+    at_two = merged[
+        (merged["timestamp"] == pd.Timestamp(2, unit="m", tz="UTC"))
+        & (merged["attribute"] == "attr")
+    ]
+    assert list(at_two["value"]) == [1.0]
+
+
+def test_merge_drops_duplicates_across_batches():
+    first = _frame([0, 1, 1, 1, 2])
+    merge = SortedMerge([("first", _chunks(first, 2))])
+    merged = pd.concat(list(merge), ignore_index=True)
+    assert len(merged) == 3
+    assert merge.duplicates == 2
+
+
+def test_merge_unsorted_input():
+    merge = SortedMerge([("first", _chunks(_frame([0, 3, 1, 4]), 2))])
+    with pytest.raises(UnsortedFile, match="row 2"):
+        list(merge)
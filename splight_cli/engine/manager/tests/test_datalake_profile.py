@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from splight_cli.engine.manager.datalake_profile import SeriesProfile
+
+
+def _series() -> pd.DataFrame:
+    index = pd.date_range("2020-01-01", periods=1000, freq="min", tz="UTC")
+    values = np.random.default_rng(1).normal(size=len(index))
+    values[300:320] = 1.5
+    values[600] = 40.0
+    values[700] = np.nan
+    series = pd.DataFrame({"value": values}, index=index)
+    # A gap of an hour and a repeated timestamp
+    series = series.drop(index[100:160])
+    return pd.concat(
+        [series.iloc[:500], series.iloc[499:500], series.iloc[500:]]
+    )
+
+
+def _profile(series: pd.DataFrame, chunk: int) -> dict:
+    profile = SeriesProfile()
+    for start in range(0, len(series), chunk):
+        profile.add(series.iloc[start : start + chunk])
+    return profile.as_dict()
+
+
+def test_profile_report():
+    series = _series()
+    report = _profile(series, len(series))
+    assert report["rows"] == len(series)
+    assert report["nulls"] == 1
+    assert report["duplicates"] == 1
+    assert report["nominal_interval"] == str(pd.Timedelta("1min"))
+    assert report["sampling_rate_hz"] == pytest.approx(1 / 60)
+    assert report["gaps"] == 1
+    assert report["largest_gaps"] == [
+        {
+            "start": "2020-01-01T01:39:00+00:00",
+            "duration": str(pd.Timedelta("61min")),
+        }
+    ]
+    assert report["intervals"]["< 10min"] == len(series) - 3
+    assert report["flatlines"] == 1
+    assert report["longest_flatline"]["points"] == 20
+    assert report["outliers"] >= 1
+    values = series["value"].dropna()
+    assert report["max"] == 40.0
+    assert report["mean"] == pytest.approx(values.mean())
+    assert report["std"] == pytest.approx(values.std())
+
+
+@pytest.mark.parametrize("chunk", [3, 7, 310])
+def test_profile_chunks(chunk):
+    series = _series()
+    # Chunk borders inside the flat run and the gap give the same report
+    chunked, whole = _profile(series, chunk), _profile(series, len(series))
+    for key in ("mean", "std"):
+        assert chunked.pop(key) == pytest.approx(whole.pop(key))
+    assert chunked == whole
+
+
+def test_profile_non_numeric():
+    series = pd.DataFrame(
+        {"value": ["on"] * 12 + ["off", None, "on"]},
+        index=pd.date_range("2020-01-01", periods=15, freq="s", tz="UTC"),
+    )
+    report = _profile(series, 5)
+    assert report["flatlines"] == 1
+    assert report["nulls"] == 1
+    assert report["outliers"] is None and report["mean"] is None
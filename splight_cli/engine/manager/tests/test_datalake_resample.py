@@ -0,0 +1,103 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from splight_cli.engine.manager.datalake_resample import (
+    Resampler,
+    server_pipeline,
+)
+
+SERIES = pd.DataFrame(
+    {
+        "asset": "asset",
+        "attribute": "attribute",
+        "output_format": "Number",
+        "value": np.arange(100, dtype=float),
+    },
+    index=pd.date_range(
+        "2020-01-01", periods=100, freq="7min", tz="UTC", name="timestamp"
+    ),
+)
+
+
+@pytest.mark.parametrize("size", [1, 13, 100])
+def test_resample_across_chunks(size):
+    resampler = Resampler(pd.Timedelta("1h"), ["mean", "max", "count"])
+    chunks = (
+        SERIES.iloc[start : start + size]
+        for start in range(0, len(SERIES), size)
+    )
+    resampled = pd.concat(resampler.resample(chunks))
+
+    expected = SERIES["value"].resample("1h").agg(["mean", "max", "count"])
+    assert list(resampled.index) == list(expected.index)
+    assert list(resampled["value_mean"]) == list(expected["mean"])
+    assert list(resampled["value_max"]) == list(expected["max"])
+    assert list(resampled["count"]) == list(expected["count"])
+    assert set(resampled["output_format"]) == {"Number"}
+
+
+def test_resample_single_aggregation_keeps_value():
+    resampler = Resampler(pd.Timedelta("1h"), ["last"])
+    resampled = pd.concat(resampler.resample([SERIES]))
+    assert list(resampled.columns) == [
+        "asset",
+        "attribute",
+        "value",
+        "output_format",
+    ]
+    expected = SERIES["value"].resample("1h").last()
+    assert list(resampled["value"]) == list(expected)
+
+
+def _evaluate(expression, timestamp: pd.Timestamp):
+    """Evaluates a pipeline expression on a point as the datalake does."""
+    if expression == "$timestamp":
+        return timestamp
+    if not isinstance(expression, dict):
+        return expression
+    ((operator, arguments),) = expression.items()
+    if operator == "$toLong":
+        return _evaluate(arguments, timestamp).value // 10**6
+    if operator == "$toDate":
+        return pd.Timestamp(
+            _evaluate(arguments, timestamp), unit="ms", tz="UTC"
+        )
+    first, second = (_evaluate(argument, timestamp) for argument in arguments)
+    if operator == "$add":
+        return first + second
+    if operator == "$subtract":
+        return first - second
+    # $mod keeps the sign of the dividend
+    return int(math.fmod(first, second))
+
+
+def test_server_pipeline():
+    pipeline = server_pipeline(pd.Timedelta("15min"), "mean")
+    truncate = pipeline[0]["$addFields"]["timestamp"]
+    assert _evaluate(
+        truncate, pd.Timestamp("2020-01-01 10:44:59.999", tz="UTC")
+    ) == pd.Timestamp("2020-01-01 10:30", tz="UTC")
+    assert pipeline[1]["$group"]["value"] == {"$avg": "$value"}
+    assert server_pipeline(pd.Timedelta("1h"), "last") is None
+    assert server_pipeline(pd.Timedelta("1500us"), "mean") is None
+
+
+@pytest.mark.parametrize("interval", ["7D", "5h", "1500ms"])
+def test_server_bins_match_resampler(interval):
+    interval = pd.Timedelta(interval)
+    series = SERIES.set_axis(
+        pd.date_range(
+            "2020-01-01", periods=100, freq="37h", tz="UTC", name="timestamp"
+        )
+    )
+    truncate = server_pipeline(interval, "count")[0]["$addFields"]["timestamp"]
+    server = pd.Series(
+        [_evaluate(truncate, timestamp) for timestamp in series.index]
+    ).value_counts()
+
+    resampled = pd.concat(Resampler(interval, ["count"]).resample([series]))
+    assert list(resampled.index) == sorted(server.index)
+    assert list(resampled["count"]) == list(server.sort_index())
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from splight_cli.engine.manager.datalake_sample import Reservoir, strata
+
+SERIES = pd.DataFrame(
+    {"value": np.arange(1000, dtype=float)},
+    index=pd.date_range("2020-01-01", periods=1000, freq="s", tz="UTC"),
+)
+
+
+def test_reservoir_keeps_a_sorted_sample():
+    reservoir = Reservoir(50, seed=1)
+    for start in range(0, len(SERIES), 64):
+        reservoir.add(SERIES.iloc[start : start + 64])
+    sample = reservoir.sample()
+    assert reservoir.seen == len(SERIES)
+    assert len(sample) == 50
+    assert sample.index.is_monotonic_increasing
+    assert not sample.index.duplicated().any()
+
+
+def test_reservoir_is_uniform():
+    counts = np.zeros(10)
+    for seed in range(300):
+        reservoir = Reservoir(1, seed=seed)
+        for start in range(0, 10, 3):
+            reservoir.add(SERIES.iloc[start : min(start + 3, 10)])
+        counts[int(reservoir.sample()["value"].iloc[0])] += 1
+    # Each of the 10 rows is expected 30 times
+    assert counts.min() > 10 and counts.max() < 55
+
+
+def test_reservoir_smaller_stream():
+    reservoir = Reservoir(50, seed=1)
+    reservoir.add(SERIES.iloc[:10])
+    assert len(reservoir.sample()) == 10
+
+
+def test_strata():
+    start = pd.Timestamp("2020-01-01", tz="UTC")
+    end = start + pd.Timedelta("10h")
+    bounds = strata(start, end, 10, seed=1)
+    assert [stratum for stratum, _ in bounds] == list(
+        pd.date_range(start, periods=10, freq="h")
+    )
+    assert all(
+        stratum <= instant < stratum + pd.Timedelta("1h")
+        for stratum, instant in bounds
+    )
@@ -0,0 +1,33 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from splight_cli.engine.manager.datalake_upload import AdaptiveUploader
+from splight_cli.engine.manager.exceptions import UploadError
+
+BATCHES = [(offset, pd.DataFrame({"value": [offset]})) for offset in range(8)]
+
+
+def test_concurrency_grows_on_success():
+    committed = []
+    uploader = AdaptiveUploader(
+        lambda dataframe: None,
+        max_workers=4,
+        on_commit=lambda offset, dataframe: committed.append(offset),
+    )
+    uploader.upload(BATCHES)
+    assert sorted(committed) == list(range(8))
+    assert uploader.limit > 2
+
+
+@patch("splight_cli.engine.manager.datalake_upload.time.sleep")
+def test_stops_after_retries(mock_sleep):
+    def save(dataframe):
+        raise Exception("unavailable")
+
+    uploader = AdaptiveUploader(save, max_workers=4, retries=2)
+    with pytest.raises(UploadError):
+        uploader.upload(BATCHES)
+    assert mock_sleep.call_count == 2
+    assert uploader.limit == 1